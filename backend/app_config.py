@@ -32,6 +32,8 @@ APP_SETTINGS = {
     'streaming_batch_size': 10000,  # Process in batches of 10k
     'enable_memory_monitoring': True,
     'max_rows_in_memory': 200000,  # Maximum rows to load in memory
+    'file_cache': True,  # Cache uploaded / loaded CSV and Excel files as Feather (FILE_PATHS 'large_file_cache', needs pyarrow)
+    'file_cache_min_mb': 1,  # Only files at least this large are cached
     'use_config_file': os.environ.get('DQ_USE_CONFIG_FILE', 'false').lower() == 'true' 
     }
 
@@ -45,6 +47,43 @@ QUALITY_THRESHOLDS = {
     'growth_rate_threshold': 20
 }
 
+# Source-Target Comparison Engine
+COMPARISON_SETTINGS = {
+    'normalization_cache_size': 200000,  # Distinct values kept in the normalization LRU (shared source/target)
+    'max_detailed_mismatches': 5000,     # Out-of-core / pushdown comparisons: mismatched rows sampled for paging
+    'out_of_core_mode': 'auto',          # 'auto' (when a side did not fit in memory), 'always' or 'never'
+    'spill_partitions': 64,              # Hash buckets spilled to disk by the out-of-core comparison
+    'spill_chunk_size': 200000,          # Rows streamed per chunk while spilling
+    'spill_directory': 'temp/comparison_spill',
+    'out_of_core_strategy': 'streaming',     # Unkeyed data: 'streaming' (hash -> count table) or 'partitioned' (bucket files)
+    'position_index_memory_rows': 2000000,   # (hash, position) records kept in memory before the index spills to disk
+    'checksum_pushdown': 'auto',             # DB-to-DB with keys: 'auto' lets the databases checksum rows, 'never' disables
+    'checksum_pushdown_max_differing': 0.2,  # Share of differing checksums above which the rows are streamed and compared once instead of fetched by key
+    'checksum_bisection': 'auto',            # Single integer key: compare range checksums first ('auto' = table too large to load, 'always', 'never')
+    'bisection_fanout': 16,                  # Key segments per differing range and level
+    'bisection_leaf_rows': 2000,             # Ranges with at most this many rows are diffed row by row
+    'hash_snapshots': 'never',               # 'auto' persists row hashes per source and reuses unchanged chunks next run (opt-in; ui_data['incremental'] per run)
+    'snapshot_directory': 'temp/hash_snapshots',
+    'snapshot_max_count': 50,                # Most recent snapshots kept on disk (older ones are deleted)
+    'snapshot_chunk_rows': 100000,           # Rows per chunk whose raw digest decides reuse vs rehash
+    'snapshot_watermark_column': None,       # Database column whose MAX() proves a table unchanged (e.g. 'updated_at')
+    'mismatch_sessions': 10,                 # Comparisons whose mismatch positions are kept for paging
+    'mismatch_session_rows': 50000,          # Mismatched rows per side held for paging; larger sessions re-read pages from the file / table
+    'mismatch_page_size': 100,               # Mismatches diffed and logged while the comparison runs (first page); later pages are diffed on request
+    'mismatch_page_cache': 8,                # Detailed pages cached per comparison
+    'near_match_pairing': True,              # Pair source-only / target-only rows differing in a few columns as "modified"
+    'near_match_min_similarity': 0.6,        # Share of columns a modified pair must agree on
+    'near_match_max_bucket': 50,             # Blocking buckets with more rows than this are paired directly (all pairs)
+    'near_match_max_bucket_pairs': 1000000,  # Pair budget for those buckets; beyond it they are skipped and pairing is approximate
+    'near_match_max_rows': 200000,           # Skip pairing when a side has more unmatched rows
+    'composite_key_discovery': True,         # No single unique column: search unique column combinations
+    'composite_key_join': False,             # Join on a discovered composite key (otherwise it is only suggested)
+    'composite_key_max_size': 3,             # Most columns in a discovered key
+    'composite_key_max_columns': 12,         # Columns (best identifier-like first) the search combines
+    'projected_loading': True,               # Read the schema first, then load only the selected (and key) columns (keyed DB-to-DB: checksum pushdown reads the tables instead)
+    'projection_sample_rows': 1000           # Rows read with the schema to find key candidates
+}
+
 # File Paths
 FILE_PATHS = {
     'log_directory': 'logs',
@@ -0,0 +1,2 @@
+# benchmarks - performance measurements for the DQ backend
+# Run from the backend directory, e.g.: python -m benchmarks.bench_key_inference
@@ -0,0 +1,225 @@
+# bench_comparison.py
+"""
+End-to-end comparison benchmark on synthetic data (benchmarks.synthetic_data), offline:
+CSV files or a SQLite database, no MySQL needed (error/audit logging falls back to files
+in the work directory).
+
+Every case runs run_comparison_analysis_ui - loading plus generate_comparison_report -
+with the functions of each stage wrapped by a timer. Stage times are exclusive (time in a
+nested stage counts only there); 'other' is the rest of the wall time (scoring, metadata,
+report assembly).
+
+The reported counts are checked against the injected changes (expected / deltas /
+counts_match_truth per case); the run exits with status 1 when a case diverges.
+
+  load            load_projected_comparison_sources
+  normalization   normalize_columns
+  hashing         compute_row_hashes, match_row_hashes, parallel_normalize_and_hash
+                  (parallel workers normalize too), snapshot reuse, out-of-core spills
+  checksum        database-side checksums and keyed row fetches (DB-to-DB pushdown)
+  near_match      find_modified_rows
+  detailed_diff   build_mismatch_details, compare_rows_detailed
+  logging         ErrorLogger / BufferedMismatchWriter / DataQualityAudit
+
+    python -m benchmarks.bench_comparison --rows 10000 100000 --formats csv sqlite --output bench.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+from functools import wraps
+
+BACKEND_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIRECTORY not in sys.path:
+    sys.path.insert(0, BACKEND_DIRECTORY)
+
+import dq_comparison
+import dq_error_log
+import dq_audit
+from benchmarks.synthetic_data import write_comparison_pair
+
+COMPARISON_STAGES = {
+    'load': ['load_projected_comparison_sources'],
+    'normalization': ['normalize_columns'],
+    'hashing': ['compute_row_hashes', 'match_row_hashes', 'parallel_normalize_and_hash', 'reuse_snapshot_hashes',
+                'spill_partitioned_hashes', 'aggregate_row_hashes'],
+    'checksum': ['fetch_key_checksums', 'bisect_differing_key_ranges', 'fetch_rows_by_keys'],
+    'near_match': ['find_modified_rows'],
+    'detailed_diff': ['build_mismatch_details', 'compare_rows_detailed']
+}
+LOGGING_CLASSES = [
+    (dq_error_log.ErrorLogger, ['log_error', 'log_batch_errors', 'log_comparison_mismatch_immediate']),
+    (dq_error_log.BufferedMismatchWriter, ['add', 'flush', 'close']),
+    (dq_audit.DataQualityAudit, ['log_audit_record'])
+]
+
+class StageTimer:
+    """Wraps functions / methods so their exclusive run time is added to a named stage"""
+
+    def __init__(self):
+        self.seconds = {}
+        self.calls = {}
+        self._stack = []
+        self._originals = []
+
+    def _wrap(self, stage, function):
+        @wraps(function)
+        def timed(*args, **kwargs):
+            self._stack.append(0.0)
+            start_time = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start_time
+                nested = self._stack.pop()
+                if self._stack:
+                    self._stack[-1] += elapsed
+                self.seconds[stage] = self.seconds.get(stage, 0.0) + elapsed - nested
+                self.calls[stage] = self.calls.get(stage, 0) + 1
+        return timed
+
+    def patch(self, owner, name, stage):
+        original = getattr(owner, name)
+        self._originals.append((owner, name, original))
+        setattr(owner, name, self._wrap(stage, original))
+
+    def restore(self):
+        for owner, name, original in reversed(self._originals):
+            setattr(owner, name, original)
+        self._originals = []
+
+    def __enter__(self):
+        for stage, names in COMPARISON_STAGES.items():
+            for name in names:
+                self.patch(dq_comparison, name, stage)
+        for owner, names in LOGGING_CLASSES:
+            for name in names:
+                self.patch(owner, name, 'logging')
+        return self
+
+    def __exit__(self, *exc_info):
+        self.restore()
+        return False
+
+def build_ui_data(written):
+    """run_comparison_analysis_ui input for a written pair (all columns, key auto-detection)"""
+    if written['format'] == 'csv':
+        sides = {side: {'source_type': 'csv', 'file_path': written['paths'][side]} for side in ('source', 'target')}
+    else:
+        sides = {side: {'source_type': 'database', 'db_config': {
+            'type': 'sqlite', 'file_path': written['paths']['database'], 'table': written['tables'][side],
+            'database': 'benchmark', 'schema': 'main'}} for side in ('source', 'target')}
+    return dict(sides, selected_columns='all')
+
+def expected_counts(truth):
+    """Counts a correct comparison reports for the injected changes (duplicates count once as common)"""
+    common_rows = truth['source_rows'] - truth['duplicate_rows'] - truth['modified_rows'] - truth['missing_rows']
+    return {
+        'common_rows': common_rows,
+        'unique_to_source': truth['source_rows'] - common_rows,
+        'unique_to_target': truth['target_rows'] - common_rows
+    }
+
+def run_case(rows, file_format, work_directory, options, quiet=True):
+    """Generate one pair, compare it and return the timings and counts"""
+    case_directory = os.path.join(work_directory, f"{file_format}_{rows}")
+    start_time = time.perf_counter()
+    written = write_comparison_pair(case_directory, rows, file_format, **options)
+    generate_seconds = time.perf_counter() - start_time
+
+    # Fallback error / audit logs are written relative to the working directory
+    previous_directory = os.getcwd()
+    os.chdir(case_directory)
+    output = io.StringIO()
+    try:
+        with StageTimer() as timer, contextlib.redirect_stdout(output if quiet else sys.stdout):
+            start_time = time.perf_counter()
+            results = dq_comparison.run_comparison_analysis_ui(build_ui_data(written))
+            total_seconds = time.perf_counter() - start_time
+    finally:
+        os.chdir(previous_directory)
+
+    stages = {stage: round(timer.seconds.get(stage, 0.0), 3) for stage in list(COMPARISON_STAGES) + ['logging']}
+    stages['other'] = round(max(total_seconds - sum(timer.seconds.values()), 0.0), 3)
+    hash_summary = results.get('hash_summary') or {}
+    counts = {name: results.get(name) for name in ('common_rows', 'unique_to_source', 'unique_to_target')}
+    expected = expected_counts(written['truth'])
+    deltas = {name: counts[name] - expected[name] if counts[name] is not None else None for name in expected}
+    return {
+        'rows': rows,
+        'format': file_format,
+        'status': results.get('status'),
+        'error': results.get('error'),
+        'generate_seconds': round(generate_seconds, 2),
+        'total_seconds': round(total_seconds, 3),
+        'rows_per_second': round((written['truth']['source_rows'] + written['truth']['target_rows']) / total_seconds, 1)
+                           if total_seconds else None,
+        'stages': stages,
+        'stage_calls': timer.calls,
+        'comparison_mode': hash_summary.get('comparison_mode'),
+        'results': dict(counts, overall_score=results.get('overall_score')),
+        'truth': written['truth'],
+        'expected': expected,
+        'deltas': deltas,
+        'counts_match_truth': all(delta == 0 for delta in deltas.values())
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000],
+                        help='row counts to run (10k - 10M)')
+    parser.add_argument('--formats', nargs='+', choices=['csv', 'sqlite'], default=['csv', 'sqlite'])
+    parser.add_argument('--mismatch-rate', type=float, default=0.01)
+    parser.add_argument('--duplicate-rate', type=float, default=0.0)
+    parser.add_argument('--null-rate', type=float, default=0.02)
+    parser.add_argument('--missing-rate', type=float, default=0.001)
+    parser.add_argument('--extra-rate', type=float, default=0.001)
+    parser.add_argument('--clean', action='store_true', help='canonical formats on both sides (no messy source)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--work-directory', help='where data is generated (default: a temporary directory, removed afterwards)')
+    parser.add_argument('--output', help='write the JSON results to this file as well')
+    parser.add_argument('--verbose', action='store_true', help='show the comparison log output')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.ERROR)
+    if not args.verbose:
+        logging.getLogger().setLevel(logging.ERROR)
+
+    options = {
+        'mismatch_rate': args.mismatch_rate,
+        'duplicate_rate': args.duplicate_rate,
+        'null_rate': args.null_rate,
+        'missing_rate': args.missing_rate,
+        'extra_rate': args.extra_rate,
+        'messy_formats': not args.clean,
+        'seed': args.seed
+    }
+    work_directory = args.work_directory or tempfile.mkdtemp(prefix='dq_bench_')
+    try:
+        cases = [run_case(rows, file_format, os.path.abspath(work_directory), options, quiet=not args.verbose)
+                 for rows in args.rows for file_format in args.formats]
+    finally:
+        if not args.work_directory:
+            shutil.rmtree(work_directory, ignore_errors=True)
+
+    report = json.dumps({'options': options, 'cases': cases}, indent=2, default=str)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as handle:
+            handle.write(report)
+    print(report)
+
+    diverged = [case for case in cases if not case['counts_match_truth']]
+    for case in diverged:
+        print(f"⚠️ {case['format']} {case['rows']:,} rows ({case['comparison_mode']}): counts differ from the truth "
+              f"{case['deltas']}" + (f" - {case['error']}" if case['error'] else ''), file=sys.stderr)
+    if diverged:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+# bench_key_inference.py
+"""
+Key inference benchmark: staged inference (infer_key_fields_from_data) against the
+previous full scan, which ran isnull().sum() and nunique() over every column.
+
+    python -m benchmarks.bench_key_inference --rows 1000000 --columns 100
+"""
+
+import argparse
+import json
+import logging
+import time
+
+import numpy as np
+import pandas as pd
+
+from dq_comparison import infer_key_fields_from_data, find_unique_columns
+
+def build_wide_frame(rows, columns, seed=42):
+    """Mostly non-key columns (low/high cardinality numbers and codes) plus a few unique ones"""
+    rng = np.random.default_rng(seed)
+    codes = np.array([f"CODE_{i:04d}" for i in range(1000)], dtype=object)
+    data = {'record_id': np.arange(rows, dtype=np.int64),
+            'order_ref': np.array([f"ORD{i:09d}" for i in rng.permutation(rows)], dtype=object)}
+    for i in range(columns - len(data)):
+        kind = i % 5
+        if kind == 0:
+            data[f"amount_{i}"] = (rng.random(rows) * 10000).round(2)
+        elif kind == 1:
+            data[f"quantity_{i}"] = rng.integers(0, 500, rows)
+        elif kind == 2:
+            data[f"category_{i}"] = codes[rng.integers(0, len(codes), rows)]
+        elif kind == 3:
+            # Nearly unique - only a sample can rule these out cheaply
+            data[f"customer_num_{i}"] = rng.integers(0, rows * 20, rows)
+        else:
+            values = rng.random(rows)
+            values[rng.random(rows) < 0.02] = np.nan
+            data[f"score_{i}"] = values
+    return pd.DataFrame(data)
+
+def full_scan_key_columns(df):
+    """Previous behaviour: every column is null-counted and distinct-counted in full"""
+    unique_columns = []
+    for column in df.columns:
+        null_pct = df[column].isnull().sum() / len(df)
+        if null_pct > 0.1:
+            continue
+        if df[column].nunique() / len(df) == 1.0:
+            unique_columns.append(column)
+    return unique_columns
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--columns', type=int, default=100)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    start_time = time.time()
+    df = build_wide_frame(args.rows, args.columns)
+    build_seconds = time.time() - start_time
+
+    start_time = time.time()
+    full_scan = full_scan_key_columns(df)
+    full_scan_seconds = time.time() - start_time
+
+    start_time = time.time()
+    staged, stats = find_unique_columns(df)
+    staged_seconds = time.time() - start_time
+
+    start_time = time.time()
+    key_fields = infer_key_fields_from_data(df)
+    inference_seconds = time.time() - start_time
+
+    print(json.dumps({
+        'rows': args.rows,
+        'columns': args.columns,
+        'build_seconds': round(build_seconds, 2),
+        'full_scan_seconds': round(full_scan_seconds, 3),
+        'staged_seconds': round(staged_seconds, 3),
+        'speedup': round(full_scan_seconds / staged_seconds, 1) if staged_seconds else None,
+        'same_unique_columns': sorted(full_scan) == sorted(staged),
+        'unique_columns': staged,
+        'staged_stats': stats,
+        'inferred_key_fields': key_fields,
+        'inference_seconds': round(inference_seconds, 3)
+    }, indent=2, default=str))
+
+if __name__ == '__main__':
+    main()
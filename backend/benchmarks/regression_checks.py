@@ -0,0 +1,337 @@
+# regression_checks.py
+"""
+Offline regression checks for comparison behaviour that is easy to break silently.
+Each check builds a small input (SQLite / in-memory frames, no MySQL needed), runs the
+code path and raises AssertionError with a description when the result is wrong.
+
+    python -m benchmarks.regression_checks            # every check
+    python -m benchmarks.regression_checks bisection  # checks whose name contains 'bisection'
+"""
+
+import logging
+import os
+import sqlite3
+import sys
+import tempfile
+
+BACKEND_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIRECTORY not in sys.path:
+    sys.path.insert(0, BACKEND_DIRECTORY)
+
+def _sqlite_config(path, table):
+    return {'type': 'sqlite', 'file_path': path, 'table': table, 'database': 'regression', 'schema': 'main'}
+
+def check_bisection_detects_swapped_and_rekeyed_rows():
+    """Segment checksums must change when values swap between keys or a row changes its key"""
+    from dq_checksum import bisect_differing_key_ranges
+
+    rows = [(key, f"name_{key}", key * 1.5) for key in range(1, 101)]
+    swapped = {row[0]: row for row in rows}
+    # Values of keys 5 and 6 swapped
+    swapped[5], swapped[6] = (5,) + rows[5][1:], (6,) + rows[4][1:]
+    # Key 34 re-keyed to 35 (35 missing from the source)
+    source_rows = [row for row in rows if row[0] != 35]
+    target_rows = [swapped[key] for key in sorted(swapped) if key not in (34, 35)] + [(35,) + rows[33][1:]]
+
+    with tempfile.TemporaryDirectory(prefix='dq_regression_') as directory:
+        path = os.path.join(directory, 'bisection.db')
+        with sqlite3.connect(path) as conn:
+            for table, table_rows in (('source_data', source_rows), ('target_data', target_rows)):
+                conn.execute(f"CREATE TABLE {table} (id INTEGER, name TEXT, amt REAL)")
+                conn.executemany(f"INSERT INTO {table} VALUES (?, ?, ?)", table_rows)
+        key_ranges, _ = bisect_differing_key_ranges(
+            _sqlite_config(path, 'source_data'), _sqlite_config(path, 'target_data'), 'id', 'id',
+            ['name', 'amt'], ['name', 'amt'], fanout=4, leaf_rows=2)
+
+    covered = {key for low, high in key_ranges for key in range(low, high + 1)}
+    for key in (5, 6, 34, 35):
+        assert key in covered, f"key {key} not inside any differing range: {key_ranges}"
+
+def check_near_match_pairs_rows_in_oversized_buckets():
+    """Rows that agree only on a very common group value must still be paired as modified"""
+    import numpy as np
+    from dq_comparison import pair_near_matches
+
+    rows = 300
+    # Columns a and b hold one value for every row; only c differs between the sides
+    source_values = np.array([['A', 'B', f"s{row}"] for row in range(rows)], dtype=object)
+    target_values = np.array([['A', 'B', f"t{row}"] for row in range(rows)], dtype=object)
+    source_idx, target_idx, differences, coverage = pair_near_matches(
+        source_values, target_values, 1, max_bucket=50)
+    assert len(source_idx) == rows, f"{len(source_idx)} of {rows} rows paired: {coverage}"
+    assert (source_idx == target_idx).all() and (differences == 1).all(), "rows paired with the wrong partner"
+    assert coverage['skipped_buckets'] == 0, f"pairing reported as approximate: {coverage}"
+
+    # Over the pair budget the bucket is skipped - and reported, not dropped silently
+    source_idx, _, _, coverage = pair_near_matches(
+        source_values, target_values, 1, max_bucket=50, max_bucket_pairs=1000)
+    assert len(source_idx) == 0 and coverage['skipped_buckets'] == 1, f"budget not applied: {coverage}"
+    assert coverage['skipped_source_rows'] == rows, f"skipped rows not reported: {coverage}"
+
+def check_mismatch_sessions_reread_pages_from_source():
+    """Sessions keep positions (not frames); pages re-read from the CSV match pages of held rows"""
+    import numpy as np
+    import pandas as pd
+    import dq_comparison as dc
+
+    rows = 1000
+    source = pd.DataFrame({'id': np.arange(rows), 'amt': np.arange(rows) * 1.5, 'name': [f"n{row}" for row in range(rows)]})
+    target = source.copy()
+    target.loc[::10, 'amt'] += 1
+    columns = list(source.columns)
+    common_cols = [{'lowercase': col, 'source_original': col, 'target_original': col} for col in columns]
+    segments = [dc.mismatch_segment('modified', np.arange(0, rows, 10), np.arange(0, rows, 10))]
+
+    session_rows = dc.COMPARISON_SETTINGS.get('mismatch_session_rows', 50000)
+    with tempfile.TemporaryDirectory(prefix='dq_regression_') as directory:
+        frames = {}
+        for side, df in (('source', source), ('target', target)):
+            path = os.path.join(directory, f"{side}.csv")
+            df.to_csv(path, index=False)
+            frames[side] = pd.read_csv(path)
+            frames[side].attrs['comparison_source'] = {'type': 'csv', 'path': path, 'truncated': False}
+        pages = {}
+        try:
+            for name, limit in (('held', session_rows), ('reread', 0)):
+                dc.COMPARISON_SETTINGS['mismatch_session_rows'] = limit
+                dc.register_mismatch_session(f"CHECK_{name}", frames['source'], frames['target'], columns, columns,
+                                             common_cols, segments)
+                pages[name] = dc.get_mismatch_details_page(f"CHECK_{name}", page=2, page_size=30)
+        finally:
+            dc.COMPARISON_SETTINGS['mismatch_session_rows'] = session_rows
+
+        session = dc.mismatch_sessions['CHECK_reread']
+        assert 'frame' not in session['source'] and 'frame' not in session['target'], "re-read session holds rows"
+        assert len(dc.mismatch_sessions['CHECK_held']['source']['frame']) == 100, "held session keeps more than its mismatched rows"
+        held = [(m['row_index'], m['differences']) for m in pages['held']['mismatches']]
+        reread = [(m['row_index'], m['differences']) for m in pages['reread']['mismatches']]
+        assert len(held) == 30 and held == reread, f"re-read page differs: {held[:2]} vs {reread[:2]}"
+
+        # A changed file is not read again - the page falls back (None)
+        target.iloc[:10].to_csv(os.path.join(directory, 'target.csv'), index=False)
+        assert dc.get_mismatch_details_page('CHECK_reread', page=3, page_size=30) is None, "page read from a changed file"
+
+def check_keyed_database_comparison_checksums_tables_in_place():
+    """Keyed DB-to-DB loads keep the schema samples; mostly differing checksums fall back instead of fetching every row"""
+    import dq_comparison as dc
+    from dq_checksum import fetch_rows_by_keys
+
+    rows = 3000
+    with tempfile.TemporaryDirectory(prefix='dq_regression_') as directory:
+        configs = {}
+        for side, render in (('source', lambda value: value), ('target', lambda value: f"{value:.3f}")):
+            path = os.path.join(directory, f"{side}.db")
+            with sqlite3.connect(path) as conn:
+                # 'unused' is not a common column, so it is not loaded
+                conn.execute(f"CREATE TABLE data (id INTEGER, amt TEXT, unused_{side} TEXT)")
+                conn.executemany("INSERT INTO data VALUES (?, ?, ?)",
+                                 [(row, render(row * 0.25), 'x' * 50) for row in range(rows)])
+            configs[side] = _sqlite_config(path, 'data')
+
+        ui_data = {side: {'source_type': 'database', 'db_config': config} for side, config in configs.items()}
+        ui_data['key_fields'] = 'id'
+        loaded = dc.load_projected_comparison_sources(ui_data, {'selected_columns': 'all'})
+        source_df, target_df, selected_columns, common_cols = loaded[0], loaded[1], loaded[6], loaded[7]
+        assert len(source_df) < rows and dc.is_deferred_source(source_df) and dc.is_deferred_source(target_df), \
+            f"tables were loaded ({len(source_df):,} rows) although the databases checksum them"
+        assert list(source_df.columns) == ['id', 'amt'], f"sample not projected: {list(source_df.columns)}"
+
+        # Every rendered checksum differs (12.5 vs '12.500'): no per-key fetch of the whole table
+        result = dc.checksum_pushdown_comparison(source_df, target_df, selected_columns, common_cols, [('id', 'id')],
+                                                 None, 'CHECK_PUSHDOWN', 'source', 'target', {})
+        assert result is None, "pushdown fetched rows for (nearly) every key"
+
+        fetched = fetch_rows_by_keys(configs['target'], ['id'], [(1,), (2,)], columns=['amt'])
+        assert list(fetched.columns) == ['id', 'amt'] and len(fetched) == 2, f"fetched {list(fetched.columns)}"
+
+def check_composite_keys_skip_measures_and_are_only_suggested():
+    """Amounts / timestamps / target-only floats never form a discovered key, which is only suggested"""
+    import numpy as np
+    import pandas as pd
+    from dq_comparison import discover_composite_keys, validate_primary_key_fields
+
+    rows = np.arange(1000)
+    # (account_id, business_date) is the real key; (amount, posted_at) is unique only by coincidence
+    source = pd.DataFrame({
+        'account_id': rows % 100,
+        'business_date': pd.Timestamp('2024-01-01') + pd.to_timedelta(rows // 100, unit='D'),
+        'amount': rows % 500,
+        'posted_at': pd.Timestamp('2024-01-01 09:00') + pd.to_timedelta(rows // 2, unit='min'),
+        'batch': rows % 250,
+    })
+    target = source.copy()
+    target['batch'] = target['batch'].astype(float)
+
+    keys, stats = discover_composite_keys(source, target)
+    assert [key['source_columns'] for key in keys] == [['account_id', 'business_date']], f"discovered {keys}"
+    assert stats['columns_excluded'].get('batch') == 'float', f"target float not excluded: {stats['columns_excluded']}"
+    assert stats['columns_excluded'].get('posted_at') == 'timestamp', f"timestamp not excluded: {stats['columns_excluded']}"
+
+    validation = validate_primary_key_fields(source, target)
+    assert not validation['key_fields_found'], f"discovered key used for the join: {validation['key_fields_found']}"
+    assert validation['details'].get('suggested_key_fields') == ['account_id', 'business_date'], validation['details']
+
+def check_multi_chunk_excel_load_matches_read_excel():
+    """A sheet read in several row batches gets the dtypes pd.read_excel infers for the whole sheet"""
+    import datetime
+    import openpyxl
+    import pandas as pd
+    from dq_unified import LargeDatasetHandler
+
+    with tempfile.TemporaryDirectory(prefix='dq_regression_') as directory:
+        path = os.path.join(directory, 'chunks.xlsx')
+        workbook = openpyxl.Workbook()
+        worksheet = workbook.active
+        worksheet.append(['id', 'qty', 'code', 'flag', 'dt', 'mixed'])
+        # Blank / text cells only in later batches: per-batch parsing infers other dtypes there
+        for row in range(250):
+            worksheet.append([row, None if row == 180 else row * 2, 'X1' if row == 150 else row,
+                              None if row == 220 else bool(row % 2),
+                              None if row == 230 else datetime.datetime(2024, 1, 1) + datetime.timedelta(days=row),
+                              'a' if row >= 120 else row + 0.5])
+        workbook.save(path)
+
+        pd.testing.assert_frame_equal(LargeDatasetHandler.read_excel_rows(path, chunk_size=100), pd.read_excel(path))
+        pd.testing.assert_frame_equal(LargeDatasetHandler.read_excel_rows(path, max_rows=120, chunk_size=50),
+                                      pd.read_excel(path, nrows=120))
+
+def check_parallel_hashing_shares_text_by_length():
+    """Text columns go to the pool as UTF-8 bytes: one long cell must not size every row, hashes stay identical"""
+    import numpy as np
+    import pandas as pd
+    from dq_comparison import _close_blocks, _share_column, compute_row_hashes, normalize_columns, \
+        parallel_normalize_and_hash
+
+    rows = 20000
+    df = pd.DataFrame({
+        'id': np.arange(rows),
+        'name': [f"név_{row % 97}" if row % 13 else None for row in range(rows)],
+        'mixed': [row if row % 2 else f"{row}.0" for row in range(rows)],
+        'dt': pd.date_range('2024-01-01', periods=rows, freq='min'),
+    })
+    df.loc[7, 'name'] = 'x' * 5000
+
+    blocks = []
+    try:
+        spec = _share_column(df['name'], 'name', blocks)
+        shared_bytes = sum(block.size for block in blocks)
+    finally:
+        _close_blocks(blocks, unlink=True)
+    text_bytes = int(df['name'].dropna().str.len().sum())
+    assert shared_bytes < 2 * text_bytes + 10 * rows, \
+        f"{shared_bytes:,} shared bytes for {text_bytes:,} characters of text ({spec})"
+
+    columns = list(df.columns)
+    expected = compute_row_hashes(normalize_columns(df, columns, {}, 'source'))
+    cache = {}
+    result = parallel_normalize_and_hash(df, columns, cache, 'source', workers=2, chunk_rows=6000)
+    assert result is not None, "process pool could not be used"
+    assert np.array_equal(result[0], expected), "parallel row hashes differ from single-process hashes"
+    single = normalize_columns(df, columns, {}, 'source')
+    for col in columns:
+        assert list(cache['columns'][('source', col)]) == list(single[col]), f"normalized '{col}' differs"
+
+def check_file_cache_builds_off_the_load_path():
+    """Loads never hash a file or cache a truncated read; an upload cache reads pandas' NA strings as nulls"""
+    import threading
+    import numpy as np
+    import pandas as pd
+    import dq_file_cache
+    from app_config import APP_SETTINGS, FILE_PATHS
+    from dq_unified import LargeDatasetHandler
+
+    if not dq_file_cache.HAS_PYARROW:
+        return
+    rows = 5000
+    frame = pd.DataFrame({'id': np.arange(rows), 'amt': np.arange(rows) * 0.1,
+                          'name': ['None' if row % 7 == 0 else f"n{row}" for row in range(rows)]})
+    settings = {'file_cache': APP_SETTINGS.get('file_cache'), 'file_cache_min_mb': APP_SETTINGS.get('file_cache_min_mb')}
+    cache_directory = FILE_PATHS.get('large_file_cache')
+    hashing_threads = []
+    content_hash = dq_file_cache.get_content_hash
+
+    def recording_content_hash(path):
+        hashing_threads.append(threading.current_thread() is threading.main_thread())
+        return content_hash(path)
+
+    with tempfile.TemporaryDirectory(prefix='dq_regression_') as directory:
+        APP_SETTINGS.update({'file_cache': True, 'file_cache_min_mb': 0})
+        FILE_PATHS['large_file_cache'] = os.path.join(directory, 'cache')
+        dq_file_cache.get_content_hash = recording_content_hash
+        try:
+            loaded_path, uploaded_path = os.path.join(directory, 'loaded.csv'), os.path.join(directory, 'uploaded.csv')
+            frame.to_csv(loaded_path, index=False)
+            frame.assign(extra=1).to_csv(uploaded_path, index=False)
+            expected = pd.read_csv(loaded_path)
+
+            def wait_for_builds():
+                for thread in threading.enumerate():
+                    if thread.name.startswith('file-cache-'):
+                        thread.join()
+
+            LargeDatasetHandler.load_large_csv(loaded_path, max_rows=100, engine='c')
+            wait_for_builds()
+            assert not hashing_threads and dq_file_cache.find_cached_file(loaded_path) is None, \
+                "a truncated load built the cache"
+            LargeDatasetHandler.load_large_csv(loaded_path, engine='c')
+            wait_for_builds()
+            assert hashing_threads and not any(hashing_threads), "a load hashed the file synchronously"
+            entry = dq_file_cache.find_cached_file(loaded_path)
+            assert entry is not None, "full load was not cached"
+            pd.testing.assert_frame_equal(LargeDatasetHandler.load_large_csv(loaded_path, engine='c'), expected)
+
+            dq_file_cache.build_file_cache(uploaded_path, 'csv', background=False)
+            cached = dq_file_cache.read_cached_file(dq_file_cache.find_cached_file(uploaded_path))
+            assert cached['name'].isna().sum() == expected['name'].isna().sum() > 0, "'None' not read as null"
+            assert np.allclose(cached['amt'], expected['amt'], rtol=0, atol=1e-12), "floats differ beyond the last bit"
+        finally:
+            dq_file_cache.get_content_hash = content_hash
+            APP_SETTINGS.update(settings)
+            FILE_PATHS['large_file_cache'] = cache_directory
+
+def check_batched_database_rows_match_one_read():
+    """Batches with an all-NULL column concatenate to the dtypes of one from_records over all rows, without warnings"""
+    import datetime
+    import warnings
+    import pandas as pd
+    from dq_unified import LargeDatasetHandler
+
+    columns = ['id', 'amt', 'dt', 'qty', 'name', 'empty']
+    rows = [(row, row * 1.5 if row < 4 else None, datetime.datetime(2024, 1, 1 + row) if row < 4 else None,
+             7 if row < 4 else None, 'a' if row < 4 else None, None) for row in range(8)]
+    expected = pd.DataFrame.from_records(rows, columns=columns, coerce_float=True)
+    batches = [pd.DataFrame.from_records(rows[start:start + 4], columns=columns, coerce_float=True) for start in (0, 4)]
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        combined = LargeDatasetHandler._concat_record_chunks(batches)
+    pd.testing.assert_frame_equal(combined, expected)
+
+CHECKS = [
+    check_bisection_detects_swapped_and_rekeyed_rows,
+    check_near_match_pairs_rows_in_oversized_buckets,
+    check_mismatch_sessions_reread_pages_from_source,
+    check_keyed_database_comparison_checksums_tables_in_place,
+    check_composite_keys_skip_measures_and_are_only_suggested,
+    check_multi_chunk_excel_load_matches_read_excel,
+    check_parallel_hashing_shares_text_by_length,
+    check_file_cache_builds_off_the_load_path,
+    check_batched_database_rows_match_one_read,
+]
+
+def main():
+    logging.basicConfig(level=logging.ERROR)
+    pattern = sys.argv[1] if len(sys.argv) > 1 else ''
+    failures = 0
+    for check in CHECKS:
+        if pattern not in check.__name__:
+            continue
+        try:
+            check()
+            print(f"PASS  {check.__name__}")
+        except AssertionError as e:
+            failures += 1
+            print(f"FAIL  {check.__name__}: {e}")
+    sys.exit(1 if failures else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,276 @@
+# synthetic_data.py
+"""
+Reproducible synthetic source / target pairs for comparison benchmarks.
+
+Both sides are rendered from the same base records (customers), chunk by chunk so even
+10M-row pairs are written without holding them in memory:
+
+  source   values in mixed, messy formats ('$1,234.50', '(555) 123-4567', '2024/01/05',
+           'yes', ' JOHN  SMITH') - formats the comparison normalization reconciles
+  target   the same values in one canonical format, with
+             mismatch_rate   rows changed in one column (balance, segment or email)
+             missing_rate    rows dropped
+             extra_rate      rows that exist only in the target
+           and the rows of every chunk shuffled
+  source also gets duplicate_rate exact duplicate rows; null_rate of the non-key cells
+  are empty on both sides (the source writes some of them as 'NULL').
+
+    python -m benchmarks.synthetic_data --rows 100000 --format csv --directory temp/bench
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+SYNTHETIC_COLUMNS = ['customer_id', 'full_name', 'email', 'phone', 'signup_date',
+                     'balance', 'score', 'is_active', 'segment', 'notes']
+NULLABLE_COLUMNS = ['full_name', 'phone', 'signup_date', 'score', 'segment', 'notes']
+MISMATCH_COLUMNS = ['balance', 'segment', 'email']
+
+FIRST_NAMES = np.array(['James', 'Mary', 'Robert', 'Patricia', 'John', 'Jennifer', 'Michael', 'Linda',
+                        'David', 'Elizabeth', 'Priya', 'Rahul', 'Anita', 'Wei', 'Fatima', 'Carlos'], dtype=object)
+LAST_NAMES = np.array(['Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller', 'Davis',
+                       'Sharma', 'Patel', 'Chen', 'Khan', 'Lopez', 'Wilson', 'Taylor', 'Singh'], dtype=object)
+SEGMENTS = np.array(['Retail', 'Corporate', 'Wealth', 'SME', 'Private'], dtype=object)
+NOTES = np.array(['', 'VIP customer', 'Prefers email contact', 'Address verified', 'KYC pending review'], dtype=object)
+EPOCH = pd.Timestamp('2000-01-01')
+SIGNUP_DAYS = 9000
+
+@lru_cache(maxsize=None)
+def _date_texts(date_format):
+    """Every possible signup date in one format (strftime per row is the slowest part otherwise)"""
+    return pd.date_range(EPOCH, periods=SIGNUP_DAYS, freq='D').strftime(date_format).to_numpy(dtype=object)
+
+def _pick(rng, options, size):
+    return options[rng.integers(0, len(options), size)]
+
+def build_base_records(customer_ids, rng):
+    """Typed base values of the given customers - both sides are rendered from these"""
+    size = len(customer_ids)
+    return pd.DataFrame({
+        'customer_id': customer_ids,
+        'first_name': _pick(rng, FIRST_NAMES, size),
+        'last_name': _pick(rng, LAST_NAMES, size),
+        'email_domain': 'example.com',
+        'phone_area': rng.integers(200, 1000, size),
+        'phone_exchange': rng.integers(200, 1000, size),
+        'phone_line': rng.integers(0, 10000, size),
+        'signup_days': rng.integers(0, SIGNUP_DAYS, size),
+        'balance_cents': rng.integers(0, 50000000, size),
+        'score': (rng.random(size) * 1000).round(3),
+        'is_active': rng.random(size) < 0.8,
+        'segment': _pick(rng, SEGMENTS, size),
+        'notes': _pick(rng, NOTES, size)
+    })
+
+def _by_variant(variants, choices):
+    """Row i takes variants[choices[i]] (variants: equally long string Series)"""
+    result = variants[0].copy()
+    for position, variant in enumerate(variants[1:], 1):
+        mask = choices == position
+        result[mask] = variant[mask]
+    return result
+
+def render_records(base, messy, rng):
+    """Output frame (SYNTHETIC_COLUMNS) of base records - canonical or in mixed formats"""
+    size = len(base)
+    first = pd.Series(base['first_name'].to_numpy(), dtype=object)
+    last = pd.Series(base['last_name'].to_numpy(), dtype=object)
+    area = pd.Series(base['phone_area'].to_numpy()).astype(str)
+    exchange = pd.Series(base['phone_exchange'].to_numpy()).astype(str)
+    line = pd.Series(base['phone_line'].to_numpy()).astype(str).str.zfill(4)
+    days = base['signup_days'].to_numpy()
+    balance = base['balance_cents'].to_numpy() / 100.0
+    email = (first + '.' + last + '.' + pd.Series(base['customer_id'].to_numpy()).astype(str) + '@'
+             + pd.Series(base['email_domain'].to_numpy(), dtype=object)).str.lower()
+    active = base['is_active'].to_numpy()
+
+    if not messy:
+        return pd.DataFrame({
+            'customer_id': base['customer_id'].to_numpy(),
+            'full_name': (first + ' ' + last).to_numpy(),
+            'email': email.to_numpy(),
+            'phone': (area + exchange + line).to_numpy(),
+            'signup_date': _date_texts('%Y-%m-%d')[days],
+            'balance': balance,
+            'score': base['score'].to_numpy(),
+            'is_active': np.where(active, 'True', 'False'),
+            'segment': base['segment'].to_numpy(),
+            'notes': base['notes'].to_numpy()
+        })
+
+    choices = rng.integers(0, 3, size)
+    name = _by_variant([first + ' ' + last, ' ' + (first + '  ' + last).str.upper(), (first + ' ' + last).str.lower() + '  '], choices)
+    phone = _by_variant(['(' + area + ') ' + exchange + '-' + line, area + '-' + exchange + '-' + line, area + exchange + line],
+                        rng.integers(0, 3, size))
+    signup = _by_variant([pd.Series(_date_texts(date_format)[days]) for date_format in ('%Y-%m-%d', '%Y/%m/%d', '%Y-%m-%d 00:00:00')],
+                         rng.integers(0, 3, size))
+    balance_text = pd.Series(balance).map('{:,.2f}'.format)
+    balance_messy = _by_variant(['$' + balance_text, balance_text, pd.Series(balance).map('{:.2f}'.format)],
+                                rng.integers(0, 3, size))
+    flags = _by_variant([pd.Series(np.where(active, 'Y', 'N')), pd.Series(np.where(active, 'yes', 'no')),
+                         pd.Series(np.where(active, 'TRUE', 'FALSE'))], rng.integers(0, 3, size))
+    upper_email = rng.random(size) < 0.3
+
+    return pd.DataFrame({
+        'customer_id': base['customer_id'].to_numpy(),
+        'full_name': name.to_numpy(),
+        'email': np.where(upper_email, email.str.upper(), email),
+        'phone': phone.to_numpy(),
+        'signup_date': signup.to_numpy(),
+        'balance': balance_messy.to_numpy(),
+        'score': base['score'].to_numpy(),
+        'is_active': flags.to_numpy(),
+        'segment': np.where(rng.random(size) < 0.3, pd.Series(base['segment'].to_numpy()).str.upper(), base['segment'].to_numpy()),
+        'notes': base['notes'].to_numpy()
+    })
+
+def _apply_nulls(df, null_mask, null_token=None, rng=None):
+    """Blank the masked cells (a share of them as null_token when given)"""
+    for position, column in enumerate(NULLABLE_COLUMNS):
+        mask = null_mask[:, position]
+        if not mask.any():
+            continue
+        values = df[column].astype(object).to_numpy()
+        values[mask] = None
+        if null_token is not None:
+            values[mask & (rng.random(len(df)) < 0.5)] = null_token
+        df[column] = values
+    return df
+
+def _modify_base(base, rows, rng):
+    """Change one MISMATCH_COLUMNS value in each of the given base rows"""
+    modified_column = rng.integers(0, len(MISMATCH_COLUMNS), len(rows))
+    for position, column in enumerate(MISMATCH_COLUMNS):
+        selected = rows[modified_column == position]
+        if column == 'balance':
+            base.loc[selected, 'balance_cents'] += 725
+        elif column == 'segment':
+            base.loc[selected, 'segment'] = 'Closed'
+        else:
+            base.loc[selected, 'email_domain'] = 'example.org'
+    return base
+
+def iter_comparison_pair(rows, mismatch_rate=0.01, duplicate_rate=0.0, null_rate=0.02, missing_rate=0.001,
+                         extra_rate=0.001, messy_formats=True, chunk_rows=500000, seed=42):
+    """
+    Yield (source_chunk, target_chunk, truth) per chunk of at most chunk_rows base records.
+    truth counts what was injected: modified / missing / extra / duplicate rows, null cells.
+    Every chunk has its own random stream, so the output only depends on the arguments.
+    """
+    extra_id = rows
+    for chunk_index, start in enumerate(range(0, rows, chunk_rows)):
+        rng = np.random.default_rng([seed, chunk_index])
+        size = min(chunk_rows, rows - start)
+        base = build_base_records(np.arange(start, start + size, dtype=np.int64), rng)
+
+        modified = np.flatnonzero(rng.random(size) < mismatch_rate)
+        missing = rng.random(size) < missing_rate
+        missing[modified] = False
+        extra_count = int(rng.binomial(size, extra_rate)) if extra_rate else 0
+        duplicates = np.flatnonzero(rng.random(size) < duplicate_rate)
+        null_mask = rng.random((size, len(NULLABLE_COLUMNS))) < null_rate
+        # A blanked cell would hide the change of a modified row
+        null_mask[modified, NULLABLE_COLUMNS.index('segment')] = False
+
+        source = _apply_nulls(render_records(base, messy_formats, rng), null_mask,
+                              'NULL' if messy_formats else None, rng)
+        if len(duplicates):
+            source = pd.concat([source, source.iloc[duplicates]], ignore_index=True)
+
+        target_base = _modify_base(base.copy(), modified, rng)
+        target = _apply_nulls(render_records(target_base, False, rng), null_mask)
+        target = target[~missing]
+        if extra_count:
+            extra_base = build_base_records(np.arange(extra_id, extra_id + extra_count, dtype=np.int64), rng)
+            extra_id += extra_count
+            target = pd.concat([target, render_records(extra_base, False, rng)], ignore_index=True)
+        target = target.iloc[rng.permutation(len(target))].reset_index(drop=True)
+
+        yield source, target, {
+            'source_rows': len(source),
+            'target_rows': len(target),
+            'modified_rows': len(modified),
+            'missing_rows': int(missing.sum()),
+            'extra_rows': extra_count,
+            'duplicate_rows': len(duplicates),
+            'null_cells': int(null_mask.sum())
+        }
+
+def generate_comparison_pair(rows, **options):
+    """Whole source and target DataFrames plus the truth counts (small sizes only)"""
+    sources, targets, truth = [], [], {}
+    for source, target, chunk_truth in iter_comparison_pair(rows, **options):
+        sources.append(source)
+        targets.append(target)
+        for name, count in chunk_truth.items():
+            truth[name] = truth.get(name, 0) + count
+    return pd.concat(sources, ignore_index=True), pd.concat(targets, ignore_index=True), truth
+
+def write_comparison_pair(directory, rows, file_format='csv', **options):
+    """
+    Write a pair to directory as source.csv / target.csv or as the tables source_data /
+    target_data of comparison.db (SQLite). Returns paths, table names and the truth counts.
+    """
+    os.makedirs(directory, exist_ok=True)
+    if file_format == 'csv':
+        paths = {'source': os.path.join(directory, 'source.csv'), 'target': os.path.join(directory, 'target.csv')}
+        for path in paths.values():
+            if os.path.exists(path):
+                os.remove(path)
+    elif file_format == 'sqlite':
+        paths = {'database': os.path.join(directory, 'comparison.db')}
+        if os.path.exists(paths['database']):
+            os.remove(paths['database'])
+        conn = sqlite3.connect(paths['database'])
+    else:
+        raise ValueError(f"Unsupported benchmark format: {file_format}")
+
+    truth = {}
+    try:
+        for chunk_index, (source, target, chunk_truth) in enumerate(iter_comparison_pair(rows, **options)):
+            if file_format == 'csv':
+                source.to_csv(paths['source'], mode='a', header=chunk_index == 0, index=False)
+                target.to_csv(paths['target'], mode='a', header=chunk_index == 0, index=False)
+            else:
+                source.to_sql('source_data', conn, if_exists='append', index=False)
+                target.to_sql('target_data', conn, if_exists='append', index=False)
+            for name, count in chunk_truth.items():
+                truth[name] = truth.get(name, 0) + count
+        if file_format == 'sqlite':
+            # Indexed like a real customer table - keyed lookups must not scan
+            for table in ('source_data', 'target_data'):
+                conn.execute(f"CREATE INDEX idx_{table}_customer_id ON {table} (customer_id)")
+            conn.commit()
+    finally:
+        if file_format == 'sqlite':
+            conn.close()
+
+    return {'format': file_format, 'rows': rows, 'paths': paths,
+            'tables': {'source': 'source_data', 'target': 'target_data'} if file_format == 'sqlite' else None,
+            'options': options, 'truth': truth}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--format', choices=['csv', 'sqlite'], default='csv')
+    parser.add_argument('--directory', default=os.path.join('temp', 'benchmark_data'))
+    parser.add_argument('--mismatch-rate', type=float, default=0.01)
+    parser.add_argument('--duplicate-rate', type=float, default=0.0)
+    parser.add_argument('--null-rate', type=float, default=0.02)
+    parser.add_argument('--clean', action='store_true', help='canonical formats on both sides')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    written = write_comparison_pair(args.directory, args.rows, args.format, mismatch_rate=args.mismatch_rate,
+                                    duplicate_rate=args.duplicate_rate, null_rate=args.null_rate,
+                                    messy_formats=not args.clean, seed=args.seed)
+    print(json.dumps(written, indent=2, default=str))
+
+if __name__ == '__main__':
+    main()
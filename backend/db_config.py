@@ -46,5 +46,15 @@ PERFORMANCE_CONFIG = {
     'default_batch_size': 50000,  # Process in batches of 50k rows
     'max_memory_mb': 1024,  # Try to stay under 1GB memory usage
     'sample_size_large_dataset': 10000,  # Sample size for preview
-    'enable_sampling': True  # Enable sampling for very large datasets
+    'enable_sampling': True,  # Enable sampling for very large datasets
+    'comparison_workers': 0,  # Processes for comparison normalization/hashing (0 = one per CPU core, 1 = no pool)
+    'parallel_min_rows': 500000,  # Use the process pool only when a side has at least this many rows
+    'parallel_chunk_rows': 250000,  # Rows handed to a worker per task
+    'mismatch_log_batch_size': 500,  # Comparison mismatches inserted per multi-row INSERT
+    'mismatch_log_flush_seconds': 5,  # Flush buffered mismatches at least this often
+    'approximate_profiling': 'auto',  # Sketch-based distinct counts / quantiles / top values ('auto' = large inputs, 'always', 'never')
+    'approximate_min_rows': 2000000,  # 'auto' switches to sketches from this many rows
+    'sketch_chunk_rows': 500000,  # Rows fed to a sketch per update
+    'csv_engine': 'c',  # CSV parser: 'c' (pandas), 'pyarrow' (multithreaded, Arrow-backed text columns) or 'auto' (pyarrow when installed)
+    'csv_block_size_mb': 16  # pyarrow CSV block size (column types are inferred from the first block)
 }
\ No newline at end of file
@@ -12,6 +12,7 @@ from collections import defaultdict
 from dq_unified import select_data_source, load_data_from_source
 from app_config import APP_SETTINGS, QUALITY_THRESHOLDS, DATA_PATTERNS
 from dq_error_log import ErrorLogger
+from dq_sketches import use_approximate_profiling, approximate_distinct_count, approximate_quantiles
 
 # Import the dual-mode input handler
 try:
@@ -130,13 +131,14 @@ def get_optimal_batch_size(df: pd.DataFrame, available_memory_mb: int = None) ->
 # CORE COLUMN ANALYSIS ENGINE
 # ============================================================================
 
-def analyze_column(df: pd.DataFrame, column_name: str) -> Dict[str, Any]:
+def analyze_column(df: pd.DataFrame, column_name: str, approximate: bool = False) -> Dict[str, Any]:
     """
     Dynamically analyze a column to infer characteristics and suggest validations.
     
     Args:
         df: DataFrame containing the data
         column_name: Name of column to analyze
+        approximate: Estimate distinct count and median with sketches (large inputs)
         
     Returns:
         Dictionary with column analysis including:
@@ -160,13 +162,13 @@ def analyze_column(df: pd.DataFrame, column_name: str) -> Dict[str, Any]:
         'total_values': total_count,
         'non_null_count': non_null_count,
         'null_percentage': (total_count - non_null_count) / total_count * 100 if total_count > 0 else 0,
-        'unique_values': column_data.nunique(),
+        'unique_values': round(approximate_distinct_count(column_data)) if approximate else column_data.nunique(),
         'data_type': str(column_data.dtype),
         'inferred_type': None,
         'suggested_checks': [],
         'patterns': [],
         'statistics': {},
-        'metadata': {}
+        'metadata': {'approximate': approximate} if approximate else {}
     }
     
     # Skip analysis if no data
@@ -196,7 +198,7 @@ def analyze_column(df: pd.DataFrame, column_name: str) -> Dict[str, Any]:
                     'min': float(valid_numeric.min()),
                     'max': float(valid_numeric.max()),
                     'mean': float(valid_numeric.mean()),
-                    'median': float(valid_numeric.median()),
+                    'median': float(approximate_quantiles(valid_numeric, [0.5])[0] if approximate else valid_numeric.median()),
                     'std': float(valid_numeric.std()),
                     'has_negative': (valid_numeric < 0).any(),
                     'has_zero': (valid_numeric == 0).any(),
@@ -904,6 +906,9 @@ def analyze_all_columns(df: pd.DataFrame, ui_data: Dict = None) -> Dict[str, Dic
     
     column_analyses = {}
     total_columns = len(df.columns)
+    approximate = use_approximate_profiling(len(df), ui_data.get('approximate') if ui_data else None)
+    if approximate:
+        logger.info(f"Using approximate sketches for distinct counts and medians ({len(df):,} rows)")
     
     for idx, col in enumerate(df.columns, 1):
         # Show progress in CLI mode
@@ -914,7 +919,7 @@ def analyze_all_columns(df: pd.DataFrame, ui_data: Dict = None) -> Dict[str, Dic
                 print(f".", end='', flush=True)
         
         # Analyze column
-        analysis = analyze_column(df, col)
+        analysis = analyze_column(df, col, approximate)
         column_analyses[col] = analysis
         if verbose:
             inferred_type = analysis.get('inferred_type', 'unknown')
@@ -0,0 +1,392 @@
+# dq_checksum.py
+"""
+Database-side row checksums for DB-to-DB comparisons.
+
+Instead of pulling every row with SELECT *, each database computes one checksum per
+row and only (key, checksum) pairs travel over the network. Full rows are fetched
+afterwards just for the keys whose checksums differ.
+
+Dialects:
+  MySQL / PostgreSQL : MD5(CONCAT_WS(...))
+  SQL Server         : HASHBYTES('MD5', CONCAT_WS(...))   (SQL Server 2017+)
+  Oracle             : STANDARD_HASH(... || ..., 'MD5')
+  SQLite             : registered Python function (dq_row_checksum)
+"""
+
+import os
+import hashlib
+import logging
+
+import pandas as pd
+
+# Setup logger
+logger = logging.getLogger(__name__)
+
+CHECKSUM_NULL_TOKEN = '<NULL>'
+CHECKSUM_SEPARATOR = '|'
+CHECKSUM_COLUMN = 'row_checksum'
+SQLITE_CHECKSUM_FUNCTION = 'dq_row_checksum'
+SQLITE_CHECKSUM_PREFIX_FUNCTION = 'dq_row_checksum_prefix'
+
+def sqlite_row_checksum(*values):
+    """MD5 over the '|' joined text of the values (NULL -> '<NULL>'), registered in SQLite"""
+    parts = [CHECKSUM_NULL_TOKEN if value is None else str(value) for value in values]
+    return hashlib.md5(CHECKSUM_SEPARATOR.join(parts).encode('utf-8')).hexdigest()
+
+def sqlite_row_checksum_prefix(*values):
+    """First 8 hex digits of sqlite_row_checksum as an unsigned 32-bit integer (summable per segment)"""
+    return int(sqlite_row_checksum(*values)[:8], 16)
+
+def quote_identifier(db_type, name):
+    """Quote a column name for the given dialect"""
+    if db_type == 'mysql':
+        return f"`{name}`"
+    if db_type == 'sqlserver':
+        return f"[{name}]"
+    return f'"{name}"'
+
+def get_table_reference(db_config):
+    """Table reference in the same form the loaders of dq_unified use"""
+    db_type = db_config['type']
+    table = db_config['table']
+    if db_type == 'postgresql':
+        return f"{db_config.get('schema', 'public')}.{table}"
+    if db_type == 'oracle':
+        return f'"{db_config.get("schema", db_config.get("user", ""))}"."{table}"'
+    if db_type == 'sqlserver':
+        return f"[{db_config.get('schema', 'dbo')}].[{table}]"
+    return table
+
+def get_parameter_marker(db_type, position):
+    """Bind parameter placeholder (position is 1-based, only Oracle uses it)"""
+    if db_type in ('postgresql', 'mysql'):
+        return '%s'
+    if db_type == 'oracle':
+        return f":{position}"
+    return '?'
+
+def open_database_connection(db_config):
+    """
+    Open a DB-API connection for a comparison db_config.
+    SQLite connections get the checksum function registered.
+    """
+    from dq_unified import normalize_db_schema
+    db_config = normalize_db_schema(db_config.copy())
+    db_type = db_config['type']
+
+    if db_type == 'postgresql':
+        import psycopg2
+        return psycopg2.connect(
+            host=db_config['host'],
+            port=db_config['port'],
+            database=db_config['database'],
+            user=db_config['user'],
+            password=db_config['password']
+        )
+    elif db_type == 'mysql':
+        import mysql.connector
+        return mysql.connector.connect(
+            host=db_config['host'],
+            port=db_config['port'],
+            database=db_config['database'],
+            user=db_config['user'],
+            password=db_config['password']
+        )
+    elif db_type == 'oracle':
+        try:
+            import cx_Oracle
+        except ImportError:
+            import oracledb as cx_Oracle
+        dsn = cx_Oracle.makedsn(db_config['host'], db_config['port'], service_name=db_config['service_name'])
+        return cx_Oracle.connect(
+            user=db_config['user'],
+            password=db_config['password'],
+            dsn=dsn,
+            encoding=db_config.get('encoding', 'UTF-8')
+        )
+    elif db_type == 'sqlserver':
+        import pyodbc
+        conn_str = f"DRIVER={{ODBC Driver 17 for SQL Server}};SERVER={db_config['host']},{db_config['port']};DATABASE={db_config['database']};UID={db_config['user']};PWD={db_config['password']}"
+        return pyodbc.connect(conn_str)
+    elif db_type == 'sqlite':
+        import sqlite3
+        if not os.path.exists(db_config['file_path']):
+            raise FileNotFoundError(f"SQLite file not found: {db_config['file_path']}")
+        conn = sqlite3.connect(db_config['file_path'])
+        conn.create_function(SQLITE_CHECKSUM_FUNCTION, -1, sqlite_row_checksum)
+        conn.create_function(SQLITE_CHECKSUM_PREFIX_FUNCTION, -1, sqlite_row_checksum_prefix)
+        return conn
+    else:
+        raise ValueError(f"Unsupported database type: {db_type}")
+
+def build_checksum_expression(db_type, columns):
+    """SQL expression returning a 32 character hex MD5 over the text of the given columns"""
+    quoted = [quote_identifier(db_type, col) for col in columns]
+    null_token = f"'{CHECKSUM_NULL_TOKEN}'"
+    separator = f"'{CHECKSUM_SEPARATOR}'"
+
+    if db_type == 'sqlite':
+        return f"{SQLITE_CHECKSUM_FUNCTION}({', '.join(quoted)})"
+    if db_type == 'postgresql':
+        parts = [f"COALESCE(CAST({col} AS TEXT), {null_token})" for col in quoted]
+        return f"MD5(CONCAT_WS({separator}, {', '.join(parts)}))"
+    if db_type == 'mysql':
+        parts = [f"COALESCE(CAST({col} AS CHAR), {null_token})" for col in quoted]
+        return f"MD5(CONCAT_WS({separator}, {', '.join(parts)}))"
+    if db_type == 'sqlserver':
+        parts = [f"COALESCE(CAST({col} AS NVARCHAR(MAX)), {null_token})" for col in quoted]
+        return f"LOWER(CONVERT(VARCHAR(32), HASHBYTES('MD5', CONCAT_WS({separator}, {', '.join(parts)})), 2))"
+    if db_type == 'oracle':
+        parts = [f"NVL(TO_CHAR({col}), {null_token})" for col in quoted]
+        return f"LOWER(RAWTOHEX(STANDARD_HASH({f' || {separator} || '.join(parts)}, 'MD5')))"
+    raise ValueError(f"Unsupported database type: {db_type}")
+
+def build_checksum_prefix_expression(db_type, columns):
+    """Unsigned 32-bit integer from the first 8 hex digits of the row checksum - identical in every dialect"""
+    if db_type == 'sqlite':
+        return f"{SQLITE_CHECKSUM_PREFIX_FUNCTION}({', '.join(quote_identifier(db_type, col) for col in columns)})"
+
+    checksum = build_checksum_expression(db_type, columns)
+    if db_type == 'postgresql':
+        return f"('x' || SUBSTR({checksum}, 1, 8))::bit(32)::bigint"
+    if db_type == 'mysql':
+        return f"CAST(CONV(SUBSTRING({checksum}, 1, 8), 16, 10) AS UNSIGNED)"
+    if db_type == 'sqlserver':
+        return f"CONVERT(BIGINT, CONVERT(VARBINARY(4), SUBSTRING({checksum}, 1, 8), 2))"
+    if db_type == 'oracle':
+        return f"TO_NUMBER(SUBSTR({checksum}, 1, 8), 'xxxxxxxx')"
+    raise ValueError(f"Unsupported database type: {db_type}")
+
+def build_range_filter(db_type, key_column, key_ranges):
+    """(key BETWEEN lo AND hi) OR ... for integer key ranges (values are inlined as integers)"""
+    key = quote_identifier(db_type, key_column)
+    return ' OR '.join(f"({key} BETWEEN {int(low)} AND {int(high)})" for low, high in key_ranges)
+
+def build_checksum_query(db_config, key_columns, value_columns, key_ranges=None):
+    """SELECT <keys>, <checksum> FROM <table> for one side of the comparison (optionally only some key ranges)"""
+    db_type = db_config['type']
+    keys = ', '.join(quote_identifier(db_type, col) for col in key_columns)
+    checksum = build_checksum_expression(db_type, value_columns)
+    query = f"SELECT {keys}, {checksum} AS {CHECKSUM_COLUMN} FROM {get_table_reference(db_config)}"
+    if key_ranges:
+        query += f" WHERE {build_range_filter(db_type, key_columns[0], key_ranges)}"
+    return query
+
+def _fetch_query(conn, db_type, query, params=None, batch_size=50000):
+    """Run a query and collect the result in fetchmany batches"""
+    cursor = conn.cursor()
+    try:
+        if db_type == 'oracle':
+            cursor.arraysize = 10000
+        if params:
+            cursor.execute(query, params)
+        else:
+            cursor.execute(query)
+        columns = [desc[0] for desc in cursor.description]
+        chunks = []
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            chunks.append(pd.DataFrame.from_records([tuple(row) for row in rows], columns=columns))
+    finally:
+        cursor.close()
+
+    if chunks:
+        return pd.concat(chunks, ignore_index=True)
+    return pd.DataFrame(columns=columns)
+
+def fetch_key_checksums(db_config, key_columns, value_columns, batch_size=50000, key_ranges=None, range_batch=200):
+    """
+    Pull (key..., row_checksum) for every row of a table, or only for the rows inside
+    key_ranges [(low, high), ...] of the first key column.
+    Returns a DataFrame with the key columns and CHECKSUM_COLUMN.
+    """
+    from dq_unified import normalize_db_schema
+    db_config = normalize_db_schema(db_config.copy())
+    if key_ranges is not None and len(key_ranges) == 0:
+        return pd.DataFrame(columns=list(key_columns) + [CHECKSUM_COLUMN])
+    if key_ranges is not None:
+        range_batches = [key_ranges[start:start + range_batch] for start in range(0, len(key_ranges), range_batch)]
+    else:
+        range_batches = [None]
+    queries = [build_checksum_query(db_config, key_columns, value_columns, ranges) for ranges in range_batches]
+    logger.info(f"Checksum pushdown query ({db_config['type']}): {queries[0][:200]}{'...' if len(queries[0]) > 200 else ''}")
+
+    conn = open_database_connection(db_config)
+    try:
+        result = pd.concat([_fetch_query(conn, db_config['type'], query, batch_size=batch_size) for query in queries],
+                           ignore_index=True)
+    finally:
+        conn.close()
+
+    # Drivers may report different case for the selected names - keep the requested ones
+    result.columns = list(key_columns) + [CHECKSUM_COLUMN]
+    result[CHECKSUM_COLUMN] = result[CHECKSUM_COLUMN].astype(str).str.lower()
+    logger.info(f"Fetched {len(result):,} key checksums from {db_config['type']} table {db_config['table']}")
+    return result
+
+def build_key_filter(db_type, key_columns, key_rows):
+    """
+    WHERE clause matching the given key tuples: (k1 = ? AND k2 = ?) OR ...
+    NULL key parts are matched with IS NULL. Returns (sql, params).
+    """
+    clauses = []
+    params = []
+    for key_row in key_rows:
+        parts = []
+        for col, value in zip(key_columns, key_row):
+            if value is None or (isinstance(value, float) and value != value):
+                parts.append(f"{quote_identifier(db_type, col)} IS NULL")
+            else:
+                params.append(value)
+                parts.append(f"{quote_identifier(db_type, col)} = {get_parameter_marker(db_type, len(params))}")
+        clauses.append(f"({' AND '.join(parts)})")
+    return ' OR '.join(clauses), params
+
+def fetch_rows_by_keys(db_config, key_columns, key_rows, batch_size=200, columns=None):
+    """
+    Fetch the rows of the given key tuples (raw values as returned by fetch_key_checksums).
+    Only the key columns plus `columns` are selected when columns are given (all otherwise).
+    Keys are sent in batches of batch_size.
+    """
+    from dq_unified import normalize_db_schema
+    db_config = normalize_db_schema(db_config.copy())
+    db_type = db_config['type']
+    key_rows = [tuple(key_row) for key_row in key_rows]
+    if not key_rows:
+        return pd.DataFrame()
+
+    select_list = '*'
+    if columns:
+        selected = list(dict.fromkeys(list(key_columns) + list(columns)))
+        select_list = ', '.join(quote_identifier(db_type, col) for col in selected)
+
+    conn = open_database_connection(db_config)
+    chunks = []
+    try:
+        for start in range(0, len(key_rows), batch_size):
+            where_sql, params = build_key_filter(db_type, key_columns, key_rows[start:start + batch_size])
+            query = f"SELECT {select_list} FROM {get_table_reference(db_config)} WHERE {where_sql}"
+            chunks.append(_fetch_query(conn, db_type, query, params))
+    finally:
+        conn.close()
+
+    result = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
+    logger.info(f"Fetched {len(result):,} rows for {len(key_rows):,} keys from {db_config['table']}")
+    return result
+
+def fetch_segment_checksums(conn, db_config, key_column, value_columns, origin, width, key_ranges=None, range_batch=200):
+    """
+    Aggregate checksum per key segment: segment = FLOOR((key - origin) / width).
+    Returns {segment: (row_count, checksum_sum)} - restricted to key_ranges when given.
+
+    The per-row checksum covers the key as well as the values. A sum over value-only
+    checksums cannot tell which key holds which values, so rows swapping values or
+    changing keys inside a segment would leave its aggregate unchanged.
+    """
+    db_type = db_config['type']
+    key = quote_identifier(db_type, key_column)
+    if db_type == 'sqlite':
+        segment = f"CAST(({key} - {int(origin)}) / {int(width)} AS INTEGER)"
+    else:
+        segment = f"FLOOR(({key} - {int(origin)}) / {int(width)})"
+    prefix = build_checksum_prefix_expression(db_type, [key_column] + [col for col in value_columns if col != key_column])
+
+    segments = {}
+    range_batches = [key_ranges[start:start + range_batch] for start in range(0, len(key_ranges), range_batch)] if key_ranges else [None]
+    for ranges in range_batches:
+        query = (f"SELECT {segment} AS segment_id, COUNT(*) AS row_count, SUM({prefix}) AS checksum_sum "
+                 f"FROM {get_table_reference(db_config)} WHERE {key} IS NOT NULL")
+        if ranges:
+            query += f" AND ({build_range_filter(db_type, key_column, ranges)})"
+        query += f" GROUP BY {segment}"
+        for segment_id, row_count, checksum_sum in _fetch_query(conn, db_type, query).itertuples(index=False, name=None):
+            segments[int(segment_id)] = (int(row_count), int(checksum_sum or 0))
+    return segments
+
+def fetch_key_bounds(conn, db_config, key_column):
+    """(MIN(key), MAX(key), COUNT(*), COUNT(key)) of a table"""
+    db_type = db_config['type']
+    key = quote_identifier(db_type, key_column)
+    query = f"SELECT MIN({key}), MAX({key}), COUNT(*), COUNT({key}) FROM {get_table_reference(db_config)}"
+    low, high, total_rows, keyed_rows = _fetch_query(conn, db_type, query).iloc[0].tolist()
+    return low, high, int(total_rows), int(keyed_rows)
+
+def _merge_key_ranges(key_ranges):
+    """Merge adjacent / overlapping (low, high) integer ranges"""
+    merged = []
+    for low, high in sorted(key_ranges):
+        if merged and low <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], high))
+        else:
+            merged.append((low, high))
+    return merged
+
+def bisect_differing_key_ranges(source_config, target_config, source_key, target_key, source_columns, target_columns,
+                                fanout=16, leaf_rows=2000):
+    """
+    Recursive segment-checksum diff over an integer key.
+    Both tables are cut into `fanout` key segments, (count, checksum sum) are compared per
+    segment in SQL and only differing segments are cut further - until a segment holds at
+    most leaf_rows rows (or one key). Identical segments are never looked at again.
+
+    Returns (differing_key_ranges, stats). stats carries the row counts of both tables and
+    the number of rows inside the differing ranges.
+    """
+    from dq_unified import normalize_db_schema
+    source_config = normalize_db_schema(source_config.copy())
+    target_config = normalize_db_schema(target_config.copy())
+    fanout = max(2, int(fanout))
+
+    source_conn = open_database_connection(source_config)
+    target_conn = open_database_connection(target_config)
+    try:
+        source_low, source_high, source_rows, source_keyed = fetch_key_bounds(source_conn, source_config, source_key)
+        target_low, target_high, target_rows, target_keyed = fetch_key_bounds(target_conn, target_config, target_key)
+        stats = {'source_rows': source_rows, 'target_rows': target_rows, 'levels': 0, 'segment_queries': 0,
+                 'segments_compared': 0, 'source_rows_in_ranges': 0, 'target_rows_in_ranges': 0}
+        if source_keyed != source_rows or target_keyed != target_rows:
+            raise ValueError("NULL keys cannot be bisected")
+
+        bounds = [int(value) for value in (source_low, source_high, target_low, target_high) if value is not None]
+        if not bounds:
+            return [], stats
+        origin, upper = min(bounds), max(bounds)
+
+        width = upper - origin + 1
+        pending = None  # None = whole key space
+        leaves = []
+        while True:
+            child_width = max(1, -(-width // fanout))
+            source_segments = fetch_segment_checksums(source_conn, source_config, source_key, source_columns, origin, child_width, pending)
+            target_segments = fetch_segment_checksums(target_conn, target_config, target_key, target_columns, origin, child_width, pending)
+            stats['levels'] += 1
+            stats['segment_queries'] += 2
+            stats['segments_compared'] += len(set(source_segments) | set(target_segments))
+
+            next_ranges = []
+            for segment in sorted(set(source_segments) | set(target_segments)):
+                source_stats = source_segments.get(segment, (0, 0))
+                target_stats = target_segments.get(segment, (0, 0))
+                if source_stats == target_stats:
+                    continue
+                segment_range = (origin + segment * child_width, origin + (segment + 1) * child_width - 1)
+                if child_width == 1 or max(source_stats[0], target_stats[0]) <= leaf_rows:
+                    leaves.append(segment_range)
+                    stats['source_rows_in_ranges'] += source_stats[0]
+                    stats['target_rows_in_ranges'] += target_stats[0]
+                else:
+                    next_ranges.append(segment_range)
+
+            logger.info(f"   Bisection level {stats['levels']}: segment width {child_width:,}, "
+                        f"{len(next_ranges):,} segments to split, {len(leaves):,} differing leaf ranges")
+            if not next_ranges:
+                break
+            pending = _merge_key_ranges(next_ranges)
+            width = child_width
+    finally:
+        source_conn.close()
+        target_conn.close()
+
+    return _merge_key_ranges(leaves), stats
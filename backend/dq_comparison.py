@@ -3,18 +3,27 @@ import pandas as pd
 import os,time
 import logging
 import re
-import hashlib
+import warnings
+import itertools
+from collections import OrderedDict
+from multiprocessing import shared_memory
 from datetime import datetime
 import sys
 from dq_unified import select_data_source, load_data_from_source, get_config_file_database_config
-from app_config import APP_SETTINGS, QUALITY_THRESHOLDS
+from app_config import APP_SETTINGS, QUALITY_THRESHOLDS, COMPARISON_SETTINGS
+from db_config import PERFORMANCE_CONFIG
 from dq_error_log import ErrorLogger
+from dq_checksum import (open_database_connection, get_table_reference, fetch_key_checksums, fetch_rows_by_keys,
+                         bisect_differing_key_ranges, CHECKSUM_COLUMN)
+from dq_hash_snapshot import (get_source_identity, get_source_fingerprint, get_chunk_digests,
+                              load_hash_snapshot, save_hash_snapshot)
+from dq_sketches import use_approximate_profiling, sketch_column, approximate_quantiles, hash_values
 # Add this import
 from database_navigator import navigate_database, get_database_hierarchy
 
 # Try to import app_config with better error handling
 try:
-    from app_config import APP_SETTINGS, QUALITY_THRESHOLDS
+    from app_config import APP_SETTINGS, QUALITY_THRESHOLDS, COMPARISON_SETTINGS
 except ImportError as e:
     logger = logging.getLogger(__name__)
     logger.warning(f"Could not import app_config: {e}")
@@ -30,6 +39,41 @@ except ImportError as e:
         'good_score': 70,
         'fair_score': 50
     }
+    COMPARISON_SETTINGS = {
+        'normalization_cache_size': 200000,
+        'max_detailed_mismatches': 5000,
+        'out_of_core_mode': 'auto',
+        'spill_partitions': 64,
+        'spill_chunk_size': 200000,
+        'spill_directory': 'temp/comparison_spill',
+        'out_of_core_strategy': 'streaming',
+        'position_index_memory_rows': 2000000,
+        'checksum_pushdown': 'auto',
+        'checksum_pushdown_max_differing': 0.2,
+        'checksum_bisection': 'auto',
+        'bisection_fanout': 16,
+        'bisection_leaf_rows': 2000,
+        'hash_snapshots': 'never',
+        'snapshot_directory': 'temp/hash_snapshots',
+        'snapshot_max_count': 50,
+        'snapshot_chunk_rows': 100000,
+        'snapshot_watermark_column': None,
+        'mismatch_sessions': 10,
+        'mismatch_session_rows': 50000,
+        'mismatch_page_size': 100,
+        'mismatch_page_cache': 8,
+        'near_match_pairing': True,
+        'near_match_min_similarity': 0.6,
+        'near_match_max_bucket': 50,
+        'near_match_max_bucket_pairs': 1000000,
+        'near_match_max_rows': 200000,
+        'composite_key_discovery': True,
+        'composite_key_join': False,
+        'composite_key_max_size': 3,
+        'composite_key_max_columns': 12,
+        'projected_loading': True,
+        'projection_sample_rows': 1000
+    }
 
 # Import the dual-mode input handler
 try:
@@ -47,31 +91,17 @@ logger = logging.getLogger(__name__)
 import numpy as np
 
 # ========== ADD THIS NEW FUNCTION AFTER IMPORTS ==========
-def load_data_in_chunks(source_type, source_config, max_rows=None, chunk_size=50000):
+def load_data_in_chunks(source_type, source_config, max_rows=None, chunk_size=50000, columns=None, sheet_name=None, engine=None):
     """
     Load data in chunks for memory efficiency with large datasets
-    Supports CSV, Excel, and Database sources
+    Supports CSV, Excel, and Database sources (only `columns` when given;
+    engine = CSV parser, PERFORMANCE_CONFIG 'csv_engine' by default)
     """
     logger.info(f"Loading {source_type.upper()} data in chunks of {chunk_size:,} rows")
     
     if source_type == "csv":
-        chunks = []
-        total_rows = 0
-        
-        for chunk in pd.read_csv(source_config, chunksize=chunk_size, low_memory=False):
-            chunks.append(chunk)
-            total_rows += len(chunk)
-            
-            if max_rows and total_rows >= max_rows:
-                # Trim last chunk if needed
-                if total_rows > max_rows:
-                    excess = total_rows - max_rows
-                    chunks[-1] = chunk.iloc[:-excess]
-                break
-            
-            # Log progress for large files
-            if total_rows % 200000 == 0:
-                logger.info(f"Loaded {total_rows:,} rows...")
+        chunks = list(iter_data_chunks(source_type, source_config, max_rows=max_rows, chunk_size=chunk_size, columns=columns,
+                                       engine=engine))
         
         if chunks:
             df = pd.concat(chunks, ignore_index=True)
@@ -91,7 +121,7 @@ def load_data_in_chunks(source_type, source_config, max_rows=None, chunk_size=50
             logger.warning(f"Large Excel file ({file_size_mb:.1f}MB), loading first {max_rows or 100000} rows")
         
         # Use existing handler with max_rows limit
-        result = LargeDatasetHandler.load_large_excel(source_config, max_rows=max_rows or 100000)
+        result = LargeDatasetHandler.load_large_excel(source_config, sheet_name=sheet_name, max_rows=max_rows or 100000, columns=columns)
         
         if isinstance(result, tuple):
             df, sheet_name = result
@@ -109,6 +139,8 @@ def load_data_in_chunks(source_type, source_config, max_rows=None, chunk_size=50
             logger.info(f"Large database table, limiting to {max_rows:,} rows")
             if 'sample_size' not in source_config:
                 source_config['sample_size'] = max_rows
+        if columns:
+            source_config['columns'] = columns
         
         return LargeDatasetHandler.load_large_database(source_config, max_rows=max_rows)
     
@@ -304,8 +336,32 @@ def safe_bool_check(value):
             return False
         raise
 
+def iter_data_chunks(source_type, source_config, max_rows=None, chunk_size=50000, columns=None, engine=None, sheet_name=None):
+    """
+    Yield a CSV source (or an .xlsx sheet) chunk by chunk (at most max_rows rows) without keeping earlier chunks.
+    Used by load_data_in_chunks and by the streaming comparison. columns limits the read (usecols);
+    engine 'pyarrow' streams record batches with Arrow-backed text columns (see LargeDatasetHandler.iter_csv_chunks).
+    """
+    from dq_unified import LargeDatasetHandler
+
+    if source_type == "excel" and LargeDatasetHandler.is_streamable_excel(source_config):
+        for chunk in LargeDatasetHandler.iter_excel_chunks(source_config, sheet_name, chunk_size, max_rows=max_rows, columns=columns):
+            yield chunk
+        return
+    if source_type != "csv":
+        raise ValueError(f"Streaming not supported for source type: {source_type}")
+
+    total_rows = 0
+    for chunk in LargeDatasetHandler.iter_csv_chunks(source_config, chunk_size, columns, max_rows=max_rows, engine=engine):
+        total_rows += len(chunk)
+        yield chunk
+
+        # Log progress for large files
+        if total_rows % 200000 == 0:
+            logger.info(f"Loaded {total_rows:,} rows...")
+
 # Update the load_single_comparison_source function (around line 40)
-def load_single_comparison_source(source_type_label, ui_data=None):
+def load_single_comparison_source(source_type_label, ui_data=None, schema_only=False):
     """Load a single source for comparison with enhanced UI - DUAL MODE"""
     
     # If UI data provided, use it
@@ -378,17 +434,63 @@ def load_single_comparison_source(source_type_label, ui_data=None):
             source_choice = input(f"Enter {source_type_label} type (1-3): ").strip()
     
     if source_choice == "1":
-        return load_csv_source(source_type_label, ui_data)
+        return load_csv_source(source_type_label, ui_data, schema_only)
     elif source_choice == "2":
-        return load_excel_source(source_type_label, ui_data)
+        return load_excel_source(source_type_label, ui_data, schema_only)
     elif source_choice == "3":
-        return load_database_source(source_type_label, ui_data)
+        return load_database_source(source_type_label, ui_data, schema_only)
     else:
         logger.error(f"Invalid selection for {source_type_label}: {source_choice}")
         return None, None, None
     
-def load_csv_source(source_type_label, ui_data=None):
-    """Load CSV source with chunking for large files"""
+def read_csv_source(file_path, columns=None):
+    """Read a CSV file (only `columns` when given), chunked and capped at 500,000 rows for large files"""
+    from dq_file_cache import find_cached_file, read_cached_file, build_file_cache
+    
+    # Check file size
+    file_size_mb = os.path.getsize(file_path) / (1024 * 1024)
+    cache_entry = find_cached_file(file_path)
+    
+    if cache_entry:
+        # Columnar cache of an earlier upload / load of the same content
+        df = read_cached_file(cache_entry, max_rows=500000 if file_size_mb > 50 else None, columns=columns)
+        total_rows = cache_entry['rows']
+    elif file_size_mb > 50:  # For files > 50MB, use chunking
+        logger.info(f"Large CSV file detected ({file_size_mb:.1f}MB), loading in chunks...")
+        
+        # One parsing pass, stopped after the cap (+1 row to detect truncation); the exact
+        # row count is only needed for a truncated file and comes from a byte scan
+        max_rows_to_load = 500000  # Max 5 lakh rows
+        df = load_data_in_chunks("csv", file_path, max_rows=max_rows_to_load + 1, columns=columns)
+        if len(df) > max_rows_to_load:
+            from dq_unified import LargeDatasetHandler
+            total_rows = LargeDatasetHandler.count_csv_rows(file_path)
+            df = df.iloc[:max_rows_to_load]
+        else:
+            total_rows = len(df)
+        
+        logger.info(f"CSV has {total_rows:,} rows")
+    else:
+        # Small file, load normally
+        df = pd.read_csv(file_path, usecols=columns)
+        total_rows = len(df)
+    
+    if not cache_entry and columns is None and len(df) >= total_rows:
+        # Every row was just parsed: cache that frame (background thread, ready for the next load)
+        build_file_cache(file_path, 'csv', df=df)
+    
+    # Remember the origin so an out-of-core comparison can stream ALL rows again
+    df.attrs['comparison_source'] = {
+        'type': 'csv',
+        'path': file_path,
+        'columns': columns,
+        'total_rows': total_rows,
+        'truncated': len(df) < total_rows
+    }
+    return df
+
+def load_csv_source(source_type_label, ui_data=None, schema_only=False):
+    """Load CSV source with chunking for large files (schema_only: header + sample rows)"""
     
     logger.info(f"DEBUG load_csv_source called for {source_type_label}")
     
@@ -425,37 +527,45 @@ def load_csv_source(source_type_label, ui_data=None):
         return None, None, None
     
     try:
-        # Check file size
-        file_size_mb = os.path.getsize(file_path) / (1024 * 1024)
-        
-        if file_size_mb > 50:  # For files > 50MB, use chunking
-            logger.info(f"Large CSV file detected ({file_size_mb:.1f}MB), loading in chunks...")
-            
-            # Estimate row count
-            with open(file_path, 'r', encoding='utf-8') as f:
-                total_rows = sum(1 for _ in f) - 1  # Subtract header
-            
-            logger.info(f"CSV has approximately {total_rows:,} rows")
-            
-            # Use chunking for large files
-            max_rows_to_load = min(total_rows, 500000)  # Max 5 lakh rows
-            df = load_data_in_chunks("csv", file_path, max_rows=max_rows_to_load)
+        if schema_only:
+            df = pd.read_csv(file_path, nrows=get_projection_sample_rows(), low_memory=False)
+            df.attrs['comparison_source'] = {'type': 'csv', 'path': file_path, 'schema_only': True}
         else:
-            # Small file, load normally
-            df = pd.read_csv(file_path)
+            df = read_csv_source(file_path)
         
         source_info = f"CSV: {os.path.basename(file_path)}"
         source_file = os.path.basename(file_path)
         
-        logger.info(f"{source_type_label} CSV loaded: {len(df):,} rows, {len(df.columns)} columns")
+        logger.info(f"{source_type_label} CSV {'schema read' if schema_only else 'loaded'}: {len(df):,} rows, {len(df.columns)} columns")
         return df, source_info, source_file
         
     except Exception as e:
         logger.error(f"Error loading {source_type_label} CSV: {e}")
         return None, None, None
 
-def load_excel_source(source_type_label, ui_data=None):
-    """Load Excel source with chunking for large files"""
+def read_excel_source(file_path, sheet_name=None, columns=None):
+    """Read an Excel sheet (only `columns` when given), capped at 300,000 rows for large workbooks"""
+    file_size_mb = os.path.getsize(file_path) / (1024 * 1024)
+    
+    if file_size_mb > 20:  # For Excel files > 20MB, use optimized loading
+        logger.info(f"Large Excel file detected ({file_size_mb:.1f}MB), loading with optimizations...")
+        df = load_data_in_chunks("excel", file_path, max_rows=300000, columns=columns, sheet_name=sheet_name)  # Max 3 lakh rows
+        truncated = len(df) >= 300000
+    else:
+        df = pd.read_excel(file_path, sheet_name=sheet_name if sheet_name is not None else 0, usecols=columns)
+        truncated = False
+    
+    df.attrs['comparison_source'] = {
+        'type': 'excel',
+        'path': file_path,
+        'sheet_name': sheet_name,
+        'columns': columns,
+        'truncated': truncated
+    }
+    return df
+
+def load_excel_source(source_type_label, ui_data=None, schema_only=False):
+    """Load Excel source with chunking for large files (schema_only: header + sample rows)"""
     
     logger.info(f"DEBUG load_excel_source called for {source_type_label}")
     logger.info(f"DEBUG ui_data: {ui_data}")
@@ -509,47 +619,51 @@ def load_excel_source(source_type_label, ui_data=None):
             sheet_name = ui_data[field_name]
             logger.debug(f"Using dynamic sheet name from UI: {sheet_name}")
         
-        if file_size_mb > 20:  # For Excel files > 20MB, use optimized loading
-            logger.info(f"Large Excel file detected ({file_size_mb:.1f}MB), loading with optimizations...")
-            
-            # Load with chunking
-            df = load_data_in_chunks("excel", file_path, max_rows=300000)  # Max 3 lakh rows
-            
-            if sheet_name:
-                logger.info(f"Note: Sheet '{sheet_name}' selected but chunked loading may use different sheet")
+        if file_size_mb > 20 and not schema_only:
+            # Large workbook - the loader asks for the sheet itself when none was given
+            df = read_excel_source(file_path, sheet_name)
         else:
-            # Small file, load normally
-            excel_file = pd.ExcelFile(file_path)
+            # Small file (or schema read) - resolve the sheet first (names from the workbook index)
+            from dq_unified import LargeDatasetHandler
+            sheet_names = LargeDatasetHandler.get_excel_sheet_names(file_path)
             
             if sheet_name is None:
-                if len(excel_file.sheet_names) > 1:
-                    logger.info(f"📑 Available sheets: {excel_file.sheet_names}")
+                if len(sheet_names) > 1:
+                    logger.info(f"📑 Available sheets: {sheet_names}")
                     
                     if HAS_INPUT_HANDLER:
                         sheet_name = get_input(
                             prompt=f"Enter sheet name for {source_type_label} (or press Enter for first sheet)",
                             field_name=f'{source_type_label.lower()}_sheet_name',
-                            default=excel_file.sheet_names[0],
+                            default=sheet_names[0],
                             required=False
                         ).strip()
                         if not sheet_name:
-                            sheet_name = excel_file.sheet_names[0] if excel_file.sheet_names else 'Sheet1'
+                            sheet_name = sheet_names[0] if sheet_names else 'Sheet1'
                             logger.debug(f"Using first sheet: {sheet_name}")
                     else:
                         sheet_name = input(f"Enter sheet name for {source_type_label} (or press Enter for first sheet): ").strip()
                         if not sheet_name:
-                            sheet_name = excel_file.sheet_names[0] if excel_file.sheet_names else 'Sheet1'
+                            sheet_name = sheet_names[0] if sheet_names else 'Sheet1'
                             logger.debug(f"Using first sheet: {sheet_name}")
                 else:
-                    sheet_name = excel_file.sheet_names[0] if excel_file.sheet_names else 'Sheet1'
+                    sheet_name = sheet_names[0] if sheet_names else 'Sheet1'
                     logger.debug(f"Using first sheet: {sheet_name}")
             
-            df = pd.read_excel(file_path, sheet_name=sheet_name)
+            if schema_only:
+                if LargeDatasetHandler.is_streamable_excel(file_path):
+                    # Streamed - stops after the sample rows
+                    df = next(LargeDatasetHandler.iter_excel_chunks(file_path, sheet_name, max_rows=get_projection_sample_rows()), pd.DataFrame())
+                else:
+                    df = pd.read_excel(file_path, sheet_name=sheet_name, nrows=get_projection_sample_rows())
+                df.attrs['comparison_source'] = {'type': 'excel', 'path': file_path, 'sheet_name': sheet_name, 'schema_only': True}
+            else:
+                df = read_excel_source(file_path, sheet_name)
         
         source_info = f"Excel: {os.path.basename(file_path)} ({sheet_name})"
         source_file = os.path.basename(file_path)
         
-        logger.info(f"{source_type_label} Excel loaded: {len(df):,} rows, {len(df.columns)} columns")
+        logger.info(f"{source_type_label} Excel {'schema read' if schema_only else 'loaded'}: {len(df):,} rows, {len(df.columns)} columns")
         return df, source_info, source_file
         
     except Exception as e:
@@ -558,8 +672,37 @@ def load_excel_source(source_type_label, ui_data=None):
         logger.error(traceback.format_exc())
         return None, None, None
 
-def load_database_source(source_type_label, ui_data=None):
-    """Load database source with dynamic input - DUAL MODE"""
+def read_database_source(db_config, columns=None, sample_rows=None):
+    """
+    Read a database table (only `columns` when given, at most sample_rows rows when given).
+    Returns None when nothing could be loaded.
+    """
+    from dq_unified import load_data_from_source
+    
+    read_config = dict(db_config)
+    if columns:
+        read_config['columns'] = columns
+    if sample_rows:
+        read_config['sample_size'] = sample_rows
+    
+    # NO CONVERSION NEEDED - db_config already has 'postgresql' not 'postgres'
+    df = load_data_from_source("database", read_config)
+    if df is None or df.empty:
+        return None
+    
+    # load_data_from_source stops at max_rows_in_memory - an out-of-core comparison streams the rest
+    df.attrs['comparison_source'] = {
+        'type': 'database',
+        'config': db_config,
+        'columns': columns,
+        'truncated': len(df) >= APP_SETTINGS.get('max_rows_in_memory', 200000)
+    }
+    if sample_rows:
+        df.attrs['comparison_source'].update({'truncated': False, 'schema_only': True})
+    return df
+
+def load_database_source(source_type_label, ui_data=None, schema_only=False):
+    """Load database source with dynamic input - DUAL MODE (schema_only: column list + sample rows)"""
     logger.info(f"\n🗄️ {source_type_label} DATABASE CONFIGURATION")
     logger.info("-"*40)
     
@@ -615,12 +758,9 @@ def load_database_source(source_type_label, ui_data=None):
     
     try:
         # Load data using the existing load_data_from_source function
-        from dq_unified import load_data_from_source
+        df = read_database_source(db_config, sample_rows=get_projection_sample_rows() if schema_only else None)
         
-        # NO CONVERSION NEEDED - db_config already has 'postgresql' not 'postgres'
-        df = load_data_from_source("database", db_config)
-        
-        if df is None or df.empty:
+        if df is None:
             logger.error(f"No data loaded from {source_type_label} database")
             return None, None, None
         
@@ -631,7 +771,7 @@ def load_database_source(source_type_label, ui_data=None):
         source_info = f"Database: {db_config['type']} - {db_config['database']}.{db_config['table']}"
         source_file = f"{db_config['type']}_{db_config['table']}"
         
-        logger.info(f"{source_type_label} database loaded: {len(df):,} rows, {len(df.columns)} columns")
+        logger.info(f"{source_type_label} database {'schema read' if schema_only else 'loaded'}: {len(df):,} rows, {len(df.columns)} columns")
         return df, source_info, source_file
     except Exception as e:
         logger.error(f"Error loading {source_type_label} database: {e}")
@@ -834,8 +974,12 @@ def get_database_config_for_comparison(source_type_label, ui_data=None):
         from dq_unified import get_dynamic_database_config
         return get_dynamic_database_config(db_type)
 
-def load_comparison_sources(ui_data=None):
-    """Load source and target from any combination - DUAL MODE"""
+def load_comparison_sources(ui_data=None, schema_only=False):
+    """
+    Load source and target from any combination - DUAL MODE
+    schema_only: read just the columns and a few sample rows of each side (phase one of
+    load_projected_comparison_sources)
+    """
     logger.info("LOADING SOURCE AND TARGET DATA")
     
     # Initialize input handler if UI data provided
@@ -851,7 +995,7 @@ def load_comparison_sources(ui_data=None):
     if ui_data and 'source' in ui_data:
         source_ui_data = ui_data['source']
     
-    source_df, source_info, source_file = load_single_comparison_source("SOURCE", source_ui_data)
+    source_df, source_info, source_file = load_single_comparison_source("SOURCE", source_ui_data, schema_only)
     
     logger.info("\n" + "="*50)
     logger.info("🔗 TARGET DATA CONFIGURATION")
@@ -862,7 +1006,7 @@ def load_comparison_sources(ui_data=None):
     if ui_data and 'target' in ui_data:
         target_ui_data = ui_data['target']
     
-    target_df, target_info, target_file = load_single_comparison_source("TARGET", target_ui_data)
+    target_df, target_info, target_file = load_single_comparison_source("TARGET", target_ui_data, schema_only)
     
     return source_df, target_df, source_info, target_info, source_file, target_file
 
@@ -975,6 +1119,164 @@ def get_target_column_name(source_column, common_cols):
             return col_info['target_original']
     return source_column  # Fallback to same name
 
+# ========== COLUMN-PROJECTED LOADING ==========
+# Comparing 5 of 80 columns should not read the other 75. Phase one reads the columns of
+# each side plus a few sample rows (CSV header, top of the sheet, SELECT with a row limit),
+# column selection runs on those samples, and phase two reads only the selected columns
+# (usecols / an explicit SELECT list) plus what key detection needs: the key fields given
+# in ui_data, or else the key candidates found in the samples. A column that is unique
+# over all rows is unique in the sample too, so no auto-detected key is lost.
+
+def get_projection_sample_rows():
+    """Rows read with the schema in phase one"""
+    return COMPARISON_SETTINGS.get('projection_sample_rows', 1000)
+
+def get_schema_columns(df):
+    """All columns of the source a (possibly column-projected) DataFrame was read from"""
+    descriptor = df.attrs.get('comparison_source') or {}
+    return list(descriptor.get('schema_columns') or df.columns)
+
+def _find_column(name, columns):
+    """Case-insensitive lookup of a column name, None when absent"""
+    for col in columns:
+        if str(col).lower() == str(name).lower():
+            return col
+    return None
+
+def get_projection_key_pairs(source_schema, target_schema, ui_data=None):
+    """
+    Key fields from ui_data or, without them, the single / composite key candidates found
+    in the schema samples. Returns (source_column, target_column) pairs (None when absent).
+    """
+    key_pairs = []
+    key_fields = ui_data.get('key_fields') if ui_data else None
+    if isinstance(key_fields, str):
+        key_fields = [f.strip() for f in key_fields.split(',')]
+
+    if key_fields:
+        key_pairs = [(_find_column(field, source_schema.columns), _find_column(field, target_schema.columns))
+                     for field in key_fields]
+    else:
+        # Same matching as validate_primary_key_fields, on the samples
+        for col in infer_key_fields_from_data(source_schema):
+            key_pairs.append((col, _find_column(col, target_schema.columns)))
+        key_pairs = [(src, tgt) for src, tgt in key_pairs if tgt is not None]
+
+        if not key_pairs and COMPARISON_SETTINGS.get('composite_key_discovery', True):
+            composite_keys, _ = discover_composite_keys(source_schema, target_schema)
+            for key in composite_keys:
+                key_pairs.extend(zip(key['source_columns'], key['target_columns']))
+    return key_pairs
+
+def get_projection_columns(source_schema, target_schema, selected_columns, common_cols, ui_data=None, key_pairs=None):
+    """
+    Columns each side has to load: the selected ones plus the key fields (see get_projection_key_pairs).
+    Returns (source_columns, target_columns), each in source order.
+    """
+    if key_pairs is None:
+        key_pairs = get_projection_key_pairs(source_schema, target_schema, ui_data)
+
+    source_needed = set(selected_columns) | {src for src, _ in key_pairs if src is not None}
+    target_needed = {get_target_column_name(col, common_cols) for col in selected_columns}
+    target_needed |= {tgt for _, tgt in key_pairs if tgt is not None}
+
+    source_columns = [col for col in source_schema.columns if col in source_needed]
+    target_columns = [col for col in target_schema.columns if col in target_needed]
+    return source_columns, target_columns
+
+def load_projected_source(schema_df, columns):
+    """Phase two: read only `columns` from wherever the schema sample was read"""
+    descriptor = schema_df.attrs.get('comparison_source') or {}
+
+    if descriptor.get('type') == 'csv':
+        df = read_csv_source(descriptor['path'], columns)
+    elif descriptor.get('type') == 'excel':
+        df = read_excel_source(descriptor['path'], descriptor.get('sheet_name'), columns)
+    elif descriptor.get('type') == 'database':
+        df = read_database_source(descriptor['config'], columns)
+    else:
+        return schema_df[columns]
+
+    if df is not None:
+        df.attrs['comparison_source']['schema_columns'] = list(schema_df.columns)
+    return df
+
+def sample_projected_source(schema_df, columns):
+    """
+    Keyed DB-to-DB comparisons skip phase two: the databases checksum their rows themselves,
+    so the schema sample stands in for the table (a truncated load of `columns`).
+    load_deferred_source reads the table when the comparison needs it after all.
+    """
+    descriptor = dict(schema_df.attrs.get('comparison_source') or {})
+    df = schema_df[columns].copy()
+    descriptor.update({
+        'columns': columns,
+        'schema_columns': list(schema_df.columns),
+        'schema_only': False,
+        'truncated': len(schema_df) >= get_projection_sample_rows(),
+        'deferred': True
+    })
+    df.attrs['comparison_source'] = descriptor
+    return df
+
+def is_deferred_source(df):
+    """Whether df is the sample of a table whose load was left to checksum pushdown"""
+    descriptor = get_comparison_source_descriptor(df) or {}
+    return bool(descriptor.get('deferred') and descriptor.get('truncated'))
+
+def load_deferred_source(df):
+    """Read the projected table behind a sample_projected_source frame (df itself when that fails)"""
+    descriptor = get_comparison_source_descriptor(df)
+    loaded = read_database_source(descriptor['config'], descriptor['columns'])
+    if loaded is None:
+        logger.warning(f"⚠️ Could not load {descriptor['config'].get('table')} - comparing the {len(df):,} sampled rows")
+        return df
+    loaded.attrs['comparison_source']['schema_columns'] = descriptor['schema_columns']
+    return loaded
+
+def load_projected_comparison_sources(ui_data=None, columns_ui_data=None):
+    """
+    Load source and target, then select columns - reading only the columns the comparison
+    needs when COMPARISON_SETTINGS['projected_loading'] is on.
+
+    Returns:
+        (source_df, target_df, source_info, target_info, source_file, target_file,
+         selected_columns, common_cols)
+    """
+    if not COMPARISON_SETTINGS.get('projected_loading', True):
+        loaded = load_comparison_sources(ui_data)
+        if loaded[0] is None or loaded[1] is None:
+            return loaded + ([], [])
+        return loaded + select_columns_for_comparison(loaded[0], loaded[1], columns_ui_data)
+
+    # Phase one: schemas and samples
+    source_schema, target_schema, source_info, target_info, source_file, target_file = load_comparison_sources(ui_data, schema_only=True)
+    if source_schema is None or target_schema is None:
+        return source_schema, target_schema, source_info, target_info, source_file, target_file, [], []
+
+    # Phase two: column selection
+    selected_columns, common_cols = select_columns_for_comparison(source_schema, target_schema, columns_ui_data)
+    if not selected_columns:
+        return source_schema, target_schema, source_info, target_info, source_file, target_file, [], []
+
+    # Phase three: only the needed columns
+    key_pairs = get_projection_key_pairs(source_schema, target_schema, ui_data)
+    source_columns, target_columns = get_projection_columns(source_schema, target_schema, selected_columns, common_cols,
+                                                            ui_data, key_pairs)
+    if should_use_checksum_pushdown(source_schema, target_schema, [pair for pair in key_pairs if None not in pair], ui_data):
+        logger.info("📉 Keyed DB-to-DB comparison: tables are checksummed in place, keeping the schema samples")
+        return (sample_projected_source(source_schema, source_columns), sample_projected_source(target_schema, target_columns),
+                source_info, target_info, source_file, target_file, selected_columns, common_cols)
+
+    start_time = time.time()
+    source_df = load_projected_source(source_schema, source_columns)
+    target_df = load_projected_source(target_schema, target_columns)
+    logger.info(f"📉 Projected load: source {len(source_columns)} of {len(source_schema.columns)} columns, "
+                f"target {len(target_columns)} of {len(target_schema.columns)} columns "
+                f"in {time.time() - start_time:.2f}s")
+
+    return source_df, target_df, source_info, target_info, source_file, target_file, selected_columns, common_cols
+
 # def normalize_date(value, column_name=""):
     """Normalize date values to YYYY-MM-DD format with PROPER timestamp handling"""
     # Handle NULL/NaN consistently
@@ -1302,6 +1604,31 @@ def normalize_string(value):
 #         logger.debug(f"Error in smart_normalize_value for {value} in column {column_name}: {e}")
 #         return str(value) if not pd.isna(value) else "NULL"
 
+# Patterns used by smart_normalize_value - compiled once, shared with the column normalization plans
+DATE_PATTERNS = [
+    r'^\d{4}-\d{1,2}-\d{1,2}$',                    # 2023-12-31
+    r'^\d{4}-\d{1,2}-\d{1,2}[ T]\d{1,2}:\d{2}',    # 2023-12-31 14:30
+    r'^\d{4}/\d{1,2}/\d{1,2}$',                    # 2023/12/31
+    r'^\d{1,2}-\d{1,2}-\d{4}$',                    # 31-12-2023
+    r'^\d{1,2}/\d{1,2}/\d{4}$',                    # 31/12/2023
+    r'^\d{4}\d{2}\d{2}$',                          # 20231231
+    r'^\d{1,2}[./]\d{1,2}[./]\d{4}$',              # 31.12.2023
+]
+COMPILED_DATE_PATTERNS = [re.compile(pattern, re.IGNORECASE) for pattern in DATE_PATTERNS]
+NUMERIC_CLEANUP_PATTERN = re.compile(r'[$,₹€£¥\s]')
+LEADING_ZERO_PATTERN = re.compile(r'^[+-]?0[0-9]+$')
+EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$', re.IGNORECASE)
+DIGIT_STRING_PATTERN = re.compile(r'^[\d\s\-+()]+$')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+NULL_STRINGS = ['nan', 'none', 'null', 'nat', '']
+BOOLEAN_MAP = {
+    'true': 'TRUE', 'false': 'FALSE',
+    'yes': 'TRUE', 'no': 'FALSE',
+    '1': 'TRUE', '0': 'FALSE',
+    't': 'TRUE', 'f': 'FALSE',
+    'y': 'TRUE', 'n': 'FALSE'
+}
+
 def smart_normalize_value(value, column_name=""):
     """
     TOTALLY GENERIC normalization - NO industry assumptions
@@ -1317,7 +1644,7 @@ def smart_normalize_value(value, column_name=""):
         str_value = str(value).strip()
         
         # Check for empty/null strings
-        if not str_value or str_value.lower() in ['nan', 'none', 'null', 'nat', '']:
+        if not str_value or str_value.lower() in NULL_STRINGS:
             return "NULL"
         
         # ===== 1. FIRST: Check if it's EMPTY after stripping =====
@@ -1326,18 +1653,8 @@ def smart_normalize_value(value, column_name=""):
         
         # ===== 2. Try to detect DATE/TIME patterns (based on format only) =====
         # Common date patterns (YYYY-MM-DD, DD/MM/YYYY, etc.)
-        date_patterns = [
-            r'^\d{4}-\d{1,2}-\d{1,2}$',                    # 2023-12-31
-            r'^\d{4}-\d{1,2}-\d{1,2}[ T]\d{1,2}:\d{2}',    # 2023-12-31 14:30
-            r'^\d{4}/\d{1,2}/\d{1,2}$',                    # 2023/12/31
-            r'^\d{1,2}-\d{1,2}-\d{4}$',                    # 31-12-2023
-            r'^\d{1,2}/\d{1,2}/\d{4}$',                    # 31/12/2023
-            r'^\d{4}\d{2}\d{2}$',                          # 20231231
-            r'^\d{1,2}[./]\d{1,2}[./]\d{4}$',              # 31.12.2023
-        ]
-        
-        for pattern in date_patterns:
-            if re.match(pattern, str_value, re.IGNORECASE):
+        for pattern in COMPILED_DATE_PATTERNS:
+            if pattern.match(str_value):
                 try:
                     parsed = pd.to_datetime(str_value, errors='coerce', dayfirst=True)
                     
@@ -1349,7 +1666,7 @@ def smart_normalize_value(value, column_name=""):
         # ===== 3. Try NUMERIC conversion =====
         try:
             # Remove common non-numeric characters (commas, currency symbols, spaces)
-            clean_num = re.sub(r'[$,₹€£¥\s]', '', str_value)
+            clean_num = NUMERIC_CLEANUP_PATTERN.sub('', str_value)
             
             # Handle percentages
             if clean_num.endswith('%'):
@@ -1365,7 +1682,7 @@ def smart_normalize_value(value, column_name=""):
                 # Handle leading zeros for integer-like numbers
                 if num_val.is_integer() and not (-1 < num_val < 1):
                     # Check if original had leading zeros
-                    if re.match(r'^[+-]?0[0-9]+$', str_value):
+                    if LEADING_ZERO_PATTERN.match(str_value):
                         # Remove leading zeros for comparison
                         return str(int(num_val))
                 
@@ -1381,25 +1698,16 @@ def smart_normalize_value(value, column_name=""):
             pass
         
         # ===== 4. Check for BOOLEAN values =====
-        bool_map = {
-            'true': 'TRUE', 'false': 'FALSE',
-            'yes': 'TRUE', 'no': 'FALSE',
-            '1': 'TRUE', '0': 'FALSE',
-            't': 'TRUE', 'f': 'FALSE',
-            'y': 'TRUE', 'n': 'FALSE'
-        }
-        
         lower_val = str_value.lower()
-        if lower_val in bool_map:
-            return bool_map[lower_val]
+        if lower_val in BOOLEAN_MAP:
+            return BOOLEAN_MAP[lower_val]
         
         # ===== 5. Check for EMAIL pattern (generic, not column-specific) =====
-        email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        if re.match(email_pattern, str_value, re.IGNORECASE):
+        if EMAIL_PATTERN.match(str_value):
             return str_value.lower().strip()
         
         # ===== 6. Check for pure digits (could be IDs, codes, phones - generic) =====
-        if re.match(r'^[\d\s\-+()]+$', str_value):
+        if DIGIT_STRING_PATTERN.match(str_value):
             # Remove all non-digit characters for comparison
             digits_only = re.sub(r'\D', '', str_value)
             if digits_only:
@@ -1409,7 +1717,7 @@ def smart_normalize_value(value, column_name=""):
         
         # ===== 7. DEFAULT: String normalization =====
         # Remove extra whitespace, normalize case
-        normalized = re.sub(r'\s+', ' ', str_value).strip()
+        normalized = WHITESPACE_PATTERN.sub(' ', str_value).strip()
         
         # Convert to lowercase for case-insensitive comparison
         normalized = normalized.lower()
@@ -1422,147 +1730,1108 @@ def smart_normalize_value(value, column_name=""):
         # Fallback: return original as string
         return str(value) if not pd.isna(value) else "NULL"
 
-def compare_row_counts(source_df, target_df, error_logger, session_id, source_info, target_info):
-    """FIRST CHECK: Compare row counts"""
-    logger.info("FIRST CHECK: ROW COUNT COMPARISON")
-    
-    source_label, target_label = get_dynamic_labels(source_info, target_info)
+# ========== COLUMN NORMALIZATION PLANS ==========
+# Vectorized equivalents of the smart_normalize_value branches. Every stage only
+# claims values for which smart_normalize_value would take exactly that branch and
+# produce exactly that output - anything else is left for the per-value fallback.
+ANY_DATE_PATTERN = '|'.join(f'(?:{pattern})' for pattern in DATE_PATTERNS)
+PLAN_YMD_PATTERN = r'^([0-9]{4})([-/])([0-9]{1,2})\2([0-9]{1,2})$'
+PLAN_DMY_PATTERN = r'^([0-9]{1,2})([-/.])([0-9]{1,2})\2([0-9]{4})$'
+PLAN_YMD_TIME_PATTERN = r'^([0-9]{4})-([0-9]{1,2})-([0-9]{1,2})[ T]([0-9]{1,2}):([0-9]{2})(?::([0-9]{2})(?:\.[0-9]{1,9})?)?$'
+PLAN_COMPACT_DATE_PATTERN = r'^([0-9]{4})([0-9]{2})([0-9]{2})$'
+PLAN_INT_LITERAL = r'[+-]?[0-9]{1,15}'
+PLAN_FLOAT_LITERAL = r'[+-]?(?:[0-9]+\.?[0-9]*|\.[0-9]+)(?:[eE][+-]?[0-9]{1,3})?'
+PLAN_DIGIT_STRING_PATTERN = r'^[0-9\s\-+()]+$'
+PLAN_TEXT_BOOLEANS = {key: value for key, value in BOOLEAN_MAP.items() if key not in ('1', '0')}
+PLAN_SAFE_DATE_YEARS = (1678, 2261)       # pandas Timestamp bounds
+PLAN_SAFE_INTEGER_LIMIT = 1e15            # integers that survive float64 exactly
+NORMALIZATION_PLAN_SAMPLE_SIZE = 1000
+NORMALIZATION_PLAN_MIN_SHARE = 0.05       # secondary types below this share go to the fallback
 
-    source_count = len(source_df)
-    target_count = len(target_df)
-    
-    logger.info(f"Source rows: {source_count:,}, Target rows: {target_count:,}")
-    
-    if source_count == target_count:
-        logger.info("✅ Row counts match perfectly")
-        return True, 0, 0
-    else:
-        diff = abs(source_count - target_count)
-        percentage_diff = (diff / max(source_count, target_count)) * 100
-        logger.warning(f"Row count difference: {diff:,} rows ({percentage_diff:.2f}%)")
-        
-        if source_count > target_count:
-            logger.warning(f"Source has {diff:,} more rows than target")
-            missing_in_target = diff
-            extra_in_target = 0
+def _empty_stage_result(str_values):
+    return pd.Series(np.nan, index=str_values.index, dtype=object)
+
+def _format_date_parts(year, month, day):
+    """Build 'YYYY-MM-DD' strings, NaN where the date is invalid"""
+    parsed = pd.to_datetime(pd.DataFrame({'year': year, 'month': month, 'day': day}), errors='coerce')
+    formatted = parsed.dt.strftime('%Y-%m-%d')
+    return formatted.where(parsed.notna(), np.nan)
+
+def _dayfirst_date_parts(year, first, second):
+    """
+    Same day/month resolution pd.to_datetime(dayfirst=True) applies to a single string:
+    the first number is the day unless the second one cannot be a month.
+    """
+    first_is_day = second <= 12
+    day = first.where(first_is_day, second)
+    month = second.where(first_is_day, first)
+    in_range = year.between(*PLAN_SAFE_DATE_YEARS)
+    return year.where(in_range, 2000), month, day, in_range
+
+def _stage_date(str_values):
+    """Date-like strings -> 'YYYY-MM-DD' (same result as the scalar pd.to_datetime path)"""
+    result = _empty_stage_result(str_values)
+
+    ymd = str_values.str.extract(PLAN_YMD_PATTERN)
+    dmy = str_values.str.extract(PLAN_DMY_PATTERN)
+    ymd_time = str_values.str.extract(PLAN_YMD_TIME_PATTERN)
+    compact = str_values.str.extract(PLAN_COMPACT_DATE_PATTERN)
+
+    parts = []
+    mask = ymd[0].notna()
+    if mask.any():
+        parts.append((mask, ymd.loc[mask, 0], ymd.loc[mask, 2], ymd.loc[mask, 3], True))
+    mask = dmy[0].notna()
+    if mask.any():
+        parts.append((mask, dmy.loc[mask, 3], dmy.loc[mask, 0], dmy.loc[mask, 2], True))
+    mask = ymd_time[0].notna()
+    if mask.any():
+        time_parts = ymd_time.loc[mask, [0, 3, 4, 5]].fillna('0').astype(np.int64)
+        valid_time = (time_parts[3] < 24) & (time_parts[4] < 60) & (time_parts[5] < 60)
+        # dateutil quirk: when HHMM equals the year the day/month resolution changes -> fallback
+        valid_time &= (time_parts[3] * 100 + time_parts[4]) != time_parts[0]
+        mask = mask & valid_time.reindex(mask.index, fill_value=False)
+        parts.append((mask, ymd_time.loc[mask, 0], ymd_time.loc[mask, 1], ymd_time.loc[mask, 2], True))
+    mask = compact[0].notna()
+    if mask.any():
+        # Compact dates are tried as YYYYMMDD first - other orders go to the fallback
+        parts.append((mask, compact.loc[mask, 0], compact.loc[mask, 1], compact.loc[mask, 2], False))
+
+    for mask, year, first, second, dayfirst in parts:
+        if not mask.any():
+            continue
+        year = year.astype(np.int64)
+        first = first.astype(np.int64)
+        second = second.astype(np.int64)
+        if dayfirst:
+            year, month, day, in_range = _dayfirst_date_parts(year, first, second)
         else:
-            logger.warning(f"Target has {diff:,} more rows than source")
-            missing_in_target = 0
-            extra_in_target = diff
-        
-        # Log this error
-        error_logger.log_error({
-            'session_id': session_id,
-            'check_type': 'comparison',
-            'source_name': source_info,
-            'target_name': target_info,
-            'actual_value': f"{source_label} has {source_count:,} rows",
-            'expected_value': f"{target_label} has {target_count:,} rows",
-            'error_type': 'row_count_mismatch',
-            'error_description': f"Row count mismatch. Source({source_label})={source_count}, Target({target_label})={target_count}, Difference={diff}",
-            'severity': 'high'
-        })
-        
-        return False, missing_in_target, extra_in_target
+            in_range = year.between(*PLAN_SAFE_DATE_YEARS)
+            year, month, day = year.where(in_range, 2000), first, second
+        formatted = _format_date_parts(year, month, day).where(in_range, np.nan)
+        result.loc[formatted.index] = formatted
 
-def compare_column_structures(source_df, target_df,source_info, target_info, ui_data=None):
+    return result
+
+def _stage_numeric(str_values):
+    """Plain numbers, currency amounts and percentages -> canonical number strings"""
+    result = _empty_stage_result(str_values)
+
+    candidates = ~str_values.str.match(ANY_DATE_PATTERN, case=False)
+    if not candidates.any():
+        return result
+    values = str_values[candidates]
+
+    cleaned = values.str.replace(NUMERIC_CLEANUP_PATTERN.pattern, '', regex=True)
+    is_percent = cleaned.str.endswith('%')
+    cleaned = cleaned.where(~is_percent, cleaned.str[:-1])
+
+    is_int = cleaned.str.fullmatch(PLAN_INT_LITERAL)
+    is_float = cleaned.str.fullmatch(PLAN_FLOAT_LITERAL) & ~is_int
+    mantissa_digits = cleaned.str.replace(r'[eE].*$', '', regex=True).str.count(r'[0-9]')
+    is_float &= mantissa_digits <= 15
+
+    if is_int.any():
+        ints = pd.to_numeric(cleaned[is_int]).astype(np.int64).astype(str)
+        ints = ints.where(~is_percent[is_int], ints + '%')
+        result.loc[ints.index] = ints
+
+    if is_float.any():
+        floats = pd.to_numeric(cleaned[is_float], errors='coerce').astype(np.float64)
+        finite = np.isfinite(floats)
+        percent = is_percent[is_float]
+
+        integral = finite & (floats == np.floor(floats)) & (floats.abs() < PLAN_SAFE_INTEGER_LIMIT) & ~percent
+        if integral.any():
+            result.loc[floats.index[integral]] = floats[integral].astype(np.int64).astype(str).to_numpy()
+
+        fractional = finite & (floats != np.floor(floats)) & ~percent
+        if fractional.any():
+            formatted = floats[fractional].map('{:.10f}'.format).str.rstrip('0').str.rstrip('.')
+            result.loc[formatted.index] = formatted
+
+        percent_values = finite & percent & (floats.abs() < PLAN_SAFE_INTEGER_LIMIT)
+        if percent_values.any():
+            formatted = floats[percent_values].map(lambda num_val: f"{num_val}%")
+            result.loc[formatted.index] = formatted
+
+    return result
+
+def _stage_boolean(str_values):
+    """yes/no/true/false/t/f/y/n -> TRUE/FALSE (1/0 are handled as numbers)"""
+    return str_values.str.lower().map(PLAN_TEXT_BOOLEANS).astype(object)
+
+def _stage_email(str_values):
+    """Email addresses -> lower case"""
+    result = _empty_stage_result(str_values)
+    mask = str_values.str.match(EMAIL_PATTERN.pattern, case=False)
+    if mask.any():
+        result[mask] = str_values[mask].str.lower()
+    return result
+
+def _stage_digit_string(str_values):
+    """Phone numbers / codes made of digits and separators -> digits without leading zeros"""
+    result = _empty_stage_result(str_values)
+    mask = (str_values.str.match(PLAN_DIGIT_STRING_PATTERN)
+            & ~str_values.str.match(ANY_DATE_PATTERN, case=False))
+    if not mask.any():
+        return result
+
+    values = str_values[mask]
+    # Values that still parse as a plain integer belong to the numeric branch
+    cleaned = values.str.replace(NUMERIC_CLEANUP_PATTERN.pattern, '', regex=True)
+    digits_only = values.str.replace(r'[^0-9]', '', regex=True)
+    keep = ~cleaned.str.fullmatch(r'[+-]?[0-9]+') & (digits_only != '')
+
+    normalized = digits_only[keep].str.lstrip('0').replace('', '0')
+    result.loc[normalized.index] = normalized
+    return result
+
+def _stage_text(str_values):
+    """Free text -> collapsed whitespace, lower case"""
+    result = _empty_stage_result(str_values)
+    lower = str_values.str.lower()
+    mask = ~(str_values.str.match(ANY_DATE_PATTERN, case=False)
+             | lower.isin(BOOLEAN_MAP.keys())
+             | str_values.str.match(EMAIL_PATTERN.pattern, case=False)
+             | str_values.str.match(DIGIT_STRING_PATTERN.pattern))
+    if mask.any():
+        cleaned = str_values[mask].str.replace(NUMERIC_CLEANUP_PATTERN.pattern, '', regex=True)
+        cleaned = cleaned.where(~cleaned.str.endswith('%'), cleaned.str[:-1])
+        is_number = pd.to_numeric(cleaned, errors='coerce').notna()
+        mask.loc[is_number.index] &= ~is_number
+    if mask.any():
+        text = str_values[mask].str.replace(WHITESPACE_PATTERN.pattern, ' ', regex=True).str.strip().str.lower()
+        result[mask] = text
+    return result
+
+NORMALIZATION_STAGES = {
+    'date': _stage_date,
+    'numeric': _stage_numeric,
+    'boolean': _stage_boolean,
+    'email': _stage_email,
+    'digit_string': _stage_digit_string,
+    'text': _stage_text,
+}
+
+def _to_normalization_strings(series):
+    """String view used by smart_normalize_value: str(value).strip(), NaN for nulls"""
+    values = series.astype(object)
+    null_mask = pd.isna(values)
+    strings = pd.Series(
+        [str(value).strip() if not is_null else np.nan for value, is_null in zip(values, null_mask)],
+        index=series.index, dtype=object
+    )
+    return strings
+
+def build_normalization_plan(series, column_name="", sample_size=NORMALIZATION_PLAN_SAMPLE_SIZE):
     """
-    Compare column structures between source and target
-    
-    Returns:
-        dict: {
-            'column_match': bool,
-            'total_columns_match': bool,
-            'column_names_match': bool,
-            'column_order_match': bool,
-            'data_types_match': bool,
-            'details': {
-                'missing_in_target': list,
-                'missing_in_source': list,
-                'type_mismatches': list,
-                'order_mismatches': list
-            }
-        }
+    Sample a column once and decide how it should be normalized.
+
+    Returns a plan dict:
+      column, dtype, kind           - 'integer' / 'float' / 'boolean' / 'datetime' (native fast paths) or 'string'
+      semantic_type                 - dominant content type (date, numeric, boolean, email, digit_string, text)
+      stages                        - vectorized transforms to apply (dominant type first)
+      type_shares                   - share of each semantic type in the sample
     """
-    logger.info("Comparing column structures...")
-    
-    results = {
-        'column_match': True,
-        'total_columns_match': True,
-        'column_names_match': True,
-        'column_order_match': True,
-        'data_types_match': True,
-        'details': {
-            'missing_in_target': [],
-            'missing_in_source': [],
-            'type_mismatches': [],
-            'order_mismatches': []
-        }
+    plan = {
+        'column': column_name,
+        'dtype': str(series.dtype),
+        'kind': 'string',
+        'semantic_type': 'text',
+        'stages': [],
+        'type_shares': {},
+        'sample_size': 0
     }
-    
-    # Get column names
-    source_columns = list(source_df.columns)
-    target_columns = list(target_df.columns)
-    
-    # Convert to lowercase for case-insensitive comparison if requested
-    if ui_data and ui_data.get('case_insensitive', True):
-        source_columns_lower = [col.lower() for col in source_columns]
-        target_columns_lower = [col.lower() for col in target_columns]
-        
-        # Create mapping for original names
-        source_col_map = {col.lower(): col for col in source_columns}
-        target_col_map = {col.lower(): col for col in target_columns}
-        
-        # Check total column count
-        if len(source_columns) != len(target_columns):
-            results['total_columns_match'] = False
-            results['column_match'] = False
-            logger.warning(f"Column count mismatch: Source={len(source_columns)}, Target={len(target_columns)}")
-        
-        # Find missing columns (case-insensitive)
-        missing_in_target = [source_col_map[col] for col in source_columns_lower 
-                            if col not in target_columns_lower]
-        missing_in_source = [target_col_map[col] for col in target_columns_lower 
-                            if col not in source_columns_lower]
-        
-        results['details']['missing_in_target'] = missing_in_target
-        results['details']['missing_in_source'] = missing_in_source
-        
-        if missing_in_target or missing_in_source:
-            results['column_names_match'] = False
-            results['column_match'] = False
-            
-            if missing_in_target:
-                logger.warning(f"Columns missing in target: {missing_in_target}")
-            if missing_in_source:
-                logger.warning(f"Columns missing in source: {missing_in_source}")
-        
-        # Check column order (case-insensitive)
-        if source_columns_lower != target_columns_lower:
-            results['column_order_match'] = False
-            results['column_match'] = False
-            
-            # Find order mismatches
-            for i, (src_col, tgt_col) in enumerate(zip(source_columns_lower, target_columns_lower)):
-                if src_col != tgt_col:
-                    results['details']['order_mismatches'].append({
-                        'position': i + 1,
-                        'source_column': source_columns[i] if i < len(source_columns) else None,
-                        'target_column': target_columns[i] if i < len(target_columns) else None
-                    })
-            
-            if results['details']['order_mismatches']:
-                logger.warning(f"Column order mismatch at positions: {[m['position'] for m in results['details']['order_mismatches']]}")
-        
-        # Compare data types (when available)
-        try:
-            # Get data types
-            source_dtypes = source_df.dtypes.to_dict()
-            target_dtypes = target_df.dtypes.to_dict()
-            
-            # Determine if these are from database or file
-            is_source_db = 'database' in str(source_info).lower() or 'db' in str(source_info).lower()
-            is_target_db = 'database' in str(target_info).lower() or 'db' in str(target_info).lower()
+
+    dtype = series.dtype
+    if pd.api.types.is_bool_dtype(dtype):
+        plan.update({'kind': 'boolean', 'semantic_type': 'boolean'})
+        return plan
+    if pd.api.types.is_integer_dtype(dtype):
+        plan.update({'kind': 'integer', 'semantic_type': 'numeric'})
+        return plan
+    if dtype == np.float64 or str(dtype) == 'Float64':
+        plan.update({'kind': 'float', 'semantic_type': 'numeric'})
+        return plan
+    if pd.api.types.is_datetime64_dtype(dtype):
+        plan.update({'kind': 'datetime', 'semantic_type': 'date'})
+        return plan
+
+    # String-like column: classify a sample of the non-null values
+    sample = series.dropna()
+    if len(sample) > sample_size:
+        sample = sample.sample(n=sample_size, random_state=42)
+    strings = _to_normalization_strings(sample).dropna()
+    strings = strings[~strings.str.lower().isin(NULL_STRINGS)]
+    plan['sample_size'] = int(len(strings))
+
+    if strings.empty:
+        plan['stages'] = ['text']
+        return plan
+
+    shares = {}
+    for semantic_type, stage in NORMALIZATION_STAGES.items():
+        try:
+            claimed = stage(strings).notna().sum()
+        except Exception as e:
+            logger.debug(f"Plan stage '{semantic_type}' failed on sample of {column_name}: {e}")
+            claimed = 0
+        if claimed:
+            shares[semantic_type] = round(float(claimed) / len(strings), 4)
+
+    ranked = sorted(shares.items(), key=lambda item: item[1], reverse=True)
+    plan['type_shares'] = dict(ranked)
+    if ranked:
+        plan['semantic_type'] = ranked[0][0]
+    plan['stages'] = [semantic_type for semantic_type, share in ranked
+                      if share >= NORMALIZATION_PLAN_MIN_SHARE or semantic_type == plan['semantic_type']]
+    return plan
+
+def _apply_native_plan(series, plan):
+    """Fast paths for native dtypes. Returns (result, fallback_mask)."""
+    values = series
+    null_mask = values.isna().to_numpy()
+    result = pd.Series("NULL", index=series.index, dtype=object)
+    fallback = np.zeros(len(series), dtype=bool)
+    present = ~null_mask
+
+    if plan['kind'] == 'boolean':
+        result[present] = np.where(values[present].astype(bool), 'TRUE', 'FALSE')
+
+    elif plan['kind'] == 'integer':
+        ints = values[present]
+        # 8 digit integers look like YYYYMMDD dates to smart_normalize_value
+        date_like = ((ints >= 10_000_000) & (ints <= 99_999_999)).to_numpy(dtype=bool)
+        result[present] = ints.astype(str).to_numpy()
+        fallback[np.flatnonzero(present)[date_like]] = True
+
+    elif plan['kind'] == 'float':
+        # smart_normalize_value re-parses str(value) with pandas' float parser - do the same
+        floats = pd.to_numeric(values[present].astype(np.float64).map(str)).astype(np.float64)
+        finite = np.isfinite(floats)
+        integral = finite & (floats == np.floor(floats)) & (floats.abs() < PLAN_SAFE_INTEGER_LIMIT)
+        fractional = finite & (floats != np.floor(floats))
+        formatted = pd.Series(np.nan, index=floats.index, dtype=object)
+        if integral.any():
+            formatted[integral] = floats[integral].astype(np.int64).astype(str)
+        if fractional.any():
+            formatted[fractional] = floats[fractional].map('{:.10f}'.format).str.rstrip('0').str.rstrip('.')
+        result[present] = formatted.to_numpy()
+        fallback[np.flatnonzero(present)[formatted.isna().to_numpy()]] = True
+
+    elif plan['kind'] == 'datetime':
+        stamps = values[present]
+        year = stamps.dt.year.astype(np.int64)
+        # str(Timestamp) is 'YYYY-MM-DD HH:MM:SS' -> resolved with dayfirst like any other string
+        hhmm_is_year = (stamps.dt.hour * 100 + stamps.dt.minute) == year
+        year, month, day, in_range = _dayfirst_date_parts(year, stamps.dt.month.astype(np.int64), stamps.dt.day.astype(np.int64))
+        formatted = _format_date_parts(year, month, day).where(in_range & ~hhmm_is_year, np.nan)
+        result[present] = formatted.to_numpy()
+        fallback[np.flatnonzero(present)[formatted.isna().to_numpy()]] = True
+
+    return result, fallback
+
+def apply_normalization_plan(series, plan):
+    """
+    Normalize a whole column with a plan from build_normalization_plan.
+    Produces exactly the same values as smart_normalize_value applied cell by cell;
+    values no vectorized stage can claim are normalized one by one (outliers only).
+    """
+    column_name = plan.get('column', '')
+    original_index = series.index
+    if len(series) == 0:
+        return pd.Series([], index=original_index, dtype=object)
+    series = series.reset_index(drop=True)
+
+    if plan['kind'] != 'string':
+        result, fallback = _apply_native_plan(series, plan)
+    else:
+        strings = _to_normalization_strings(series)
+        result = pd.Series("NULL", index=series.index, dtype=object)
+        present = strings.notna() & ~strings.str.lower().isin(NULL_STRINGS)
+        pending = strings[present]
+        resolved = pd.Series(np.nan, index=pending.index, dtype=object)
+
+        for semantic_type in plan['stages']:
+            open_values = pending[resolved.isna()]
+            if open_values.empty:
+                break
+            stage_result = NORMALIZATION_STAGES[semantic_type](open_values)
+            claimed = stage_result.notna()
+            resolved[claimed[claimed].index] = stage_result[claimed]
+
+        result[present] = resolved
+        fallback = (present & result.isna()).to_numpy()
+
+    if fallback.any():
+        originals = series.astype(object)[fallback]
+        result[fallback] = originals.map(lambda value: smart_normalize_value(value, column_name)).to_numpy()
+        plan['fallback_values'] = plan.get('fallback_values', 0) + int(fallback.sum())
+
+    result.index = original_index
+    return result
+
+# ========== CARDINALITY-PROPORTIONAL NORMALIZATION ==========
+class NormalizedValueCache:
+    """
+    Bounded LRU of value -> normalized value.
+    One instance is shared by the source and target columns of a comparison, so a
+    value seen on both sides (status codes, dates, countries...) is normalized once.
+    Keys are str(value).strip() - the only thing smart_normalize_value looks at.
+    """
+
+    def __init__(self, max_entries=None):
+        self.max_entries = max_entries or COMPARISON_SETTINGS.get('normalization_cache_size', 200000)
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_many(self, keys):
+        """Look up keys, returns list with None for misses"""
+        found = []
+        entries = self._entries
+        for key in keys:
+            value = entries.get(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                entries.move_to_end(key)
+            found.append(value)
+        return found
+
+    def put_many(self, keys, values):
+        """Store normalized values, evicting least recently used entries"""
+        entries = self._entries
+        for key, value in zip(keys, values):
+            entries[key] = value
+            entries.move_to_end(key)
+        overflow = len(entries) - self.max_entries
+        for _ in range(max(0, overflow)):
+            entries.popitem(last=False)
+            self.evictions += 1
+
+    def get_stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups * 100, 2) if lookups else 0.0,
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'evictions': self.evictions
+        }
+
+def _factorize_for_normalization(series):
+    """
+    Factorize a column into (codes, distinct values). Nulls get code -1.
+    Mixed-type object columns are factorized on their string view, because
+    factorize treats True == 1 == 1.0 while the normalizer does not.
+    """
+    values = series
+    if values.dtype == object and pd.api.types.infer_dtype(values, skipna=True) not in ('string', 'empty'):
+        values = _to_normalization_strings(values)
+    codes, uniques = pd.factorize(values, use_na_sentinel=True)
+    return codes, pd.Series(uniques)
+
+def normalize_column_values(series, column_name="", plan=None, value_cache=None, stats=None):
+    """
+    Normalize a column with cost proportional to its cardinality:
+    factorize -> normalize the distinct values (LRU first, then the column plan) -> map codes back.
+    Returns an object numpy array identical to smart_normalize_value applied cell by cell.
+    """
+    codes, uniques = _factorize_for_normalization(series)
+
+    normalized_uniques = np.empty(len(uniques), dtype=object)
+    pending = np.arange(len(uniques))
+    keys = None
+
+    if value_cache is not None and 0 < len(uniques) <= value_cache.max_entries:
+        keys = [str(value).strip() for value in uniques.astype(object)]
+        cached = value_cache.get_many(keys)
+        hit_mask = np.array([value is not None for value in cached], dtype=bool)
+        if hit_mask.any():
+            normalized_uniques[hit_mask] = [value for value in cached if value is not None]
+        pending = np.flatnonzero(~hit_mask)
+
+    if len(pending):
+        to_normalize = uniques.iloc[pending].reset_index(drop=True)
+        if plan is None:
+            plan = build_normalization_plan(to_normalize, column_name)
+        normalized_uniques[pending] = apply_normalization_plan(to_normalize, plan).to_numpy(dtype=object)
+        if keys is not None:
+            value_cache.put_many([keys[i] for i in pending], normalized_uniques[pending])
+
+    if len(uniques):
+        result = normalized_uniques.take(codes)
+    else:
+        result = np.empty(len(codes), dtype=object)
+    result[codes < 0] = "NULL"
+
+    if stats is not None:
+        stats['rows'] = stats.get('rows', 0) + len(codes)
+        stats['unique_values'] = stats.get('unique_values', 0) + len(uniques)
+        stats['normalized_values'] = stats.get('normalized_values', 0) + len(pending)
+    return result, plan
+
+def normalize_series(series, column_name="", plan=None, value_cache=None):
+    """
+    Normalize a whole column at once.
+    Gives exactly the same values as smart_normalize_value applied cell by cell.
+    """
+    values, _ = normalize_column_values(series, column_name, plan, value_cache)
+    return pd.Series(values, index=series.index, dtype=object)
+
+def normalize_columns(df, columns, normalization_cache=None, side="source", store_columns=True):
+    """
+    Normalize the given columns of a DataFrame column by column.
+    Returns a new DataFrame (positional RangeIndex) holding the normalized strings.
+
+    normalization_cache (optional dict) is shared between the comparison steps of one
+    report so every column is planned and normalized only once, and distinct values
+    are looked up in one NormalizedValueCache for both sides.
+
+    store_columns=False is used for streamed chunks: the normalized arrays are not kept,
+    the column plan is reused while the chunk dtype stays the same and the column
+    stats add up over all chunks.
+    """
+    normalized = {}
+    for col in columns:
+        cache_key = (side, col)
+        if store_columns and normalization_cache is not None and cache_key in normalization_cache.get('columns', {}):
+            normalized[col] = normalization_cache['columns'][cache_key]
+            continue
+
+        value_cache = None
+        plan = None
+        column_stats = {}
+        if normalization_cache is not None:
+            if 'value_cache' not in normalization_cache:
+                normalization_cache['value_cache'] = NormalizedValueCache()
+            value_cache = normalization_cache['value_cache']
+            if not store_columns:
+                plan = normalization_cache.get('plans', {}).get(cache_key)
+                if plan is not None and plan.get('dtype') != str(df[col].dtype):
+                    plan = None
+                column_stats = normalization_cache.get('column_stats', {}).get(cache_key, {})
+
+        values, plan = normalize_column_values(df[col], col, plan=plan, value_cache=value_cache, stats=column_stats)
+        normalized[col] = values
+
+        if normalization_cache is not None:
+            if store_columns:
+                normalization_cache.setdefault('columns', {})[cache_key] = values
+            normalization_cache.setdefault('plans', {})[cache_key] = plan
+            normalization_cache.setdefault('column_stats', {})[cache_key] = column_stats
+    return pd.DataFrame(normalized, columns=list(columns), index=pd.RangeIndex(len(df)))
+
+def get_normalization_stats(normalization_cache):
+    """Summarize cardinality and cache hit rates of one comparison for the results dict"""
+    if not normalization_cache:
+        return {}
+
+    stats = {'cache': {}, 'columns': {}}
+    value_cache = normalization_cache.get('value_cache')
+    if value_cache is not None:
+        stats['cache'] = value_cache.get_stats()
+
+    total_rows = 0
+    total_normalized = 0
+    for (side, col), column_stats in normalization_cache.get('column_stats', {}).items():
+        plan = normalization_cache.get('plans', {}).get((side, col)) or {}
+        stats['columns'][f"{side}:{col}"] = {
+            'rows': column_stats.get('rows', 0),
+            'unique_values': column_stats.get('unique_values', 0),
+            'normalized_values': column_stats.get('normalized_values', 0),
+            'semantic_type': plan.get('semantic_type', 'cached')
+        }
+        total_rows += column_stats.get('rows', 0)
+        total_normalized += column_stats.get('normalized_values', 0)
+
+    stats['rows_normalized'] = total_rows
+    stats['values_normalized'] = total_normalized
+    stats['work_ratio'] = round(total_normalized / total_rows, 4) if total_rows else 0.0
+    return stats
+
+def compute_row_hashes(normalized_df):
+    """
+    64-bit hash for every row of an already normalized DataFrame.
+    Column ORDER is part of the hash, column NAMES are not - so source and
+    target frames with differently named columns hash identically.
+    """
+    if normalized_df.shape[1] == 0:
+        return np.zeros(len(normalized_df), dtype=np.uint64)
+    return pd.util.hash_pandas_object(normalized_df, index=False).to_numpy(dtype=np.uint64)
+
+class RowHashIndex:
+    """
+    Compact, array-backed index over the row hashes of one side.
+
+    Instead of a {hash: [row, row, ...]} dictionary (hundreds of bytes per row) it keeps
+      sorted_hashes - the row hashes in ascending order (uint64)
+      order         - row position of every sorted hash (argsort, stable: positions ascend inside a hash)
+      run_starts    - offset of every distinct hash inside sorted_hashes
+      run_counts    - how often every distinct hash occurs (duplicates)
+    which answers the same questions: distinct hashes, rows of a hash, duplicate counts.
+    """
+
+    def __init__(self, row_hashes):
+        row_hashes = np.asarray(row_hashes, dtype=np.uint64)
+        self.row_count = len(row_hashes)
+        position_dtype = np.int32 if self.row_count < np.iinfo(np.int32).max else np.int64
+        self.order = np.argsort(row_hashes, kind='stable').astype(position_dtype, copy=False)
+        self.sorted_hashes = row_hashes[self.order]
+        if self.row_count:
+            boundaries = np.flatnonzero(self.sorted_hashes[1:] != self.sorted_hashes[:-1]) + 1
+            self.run_starts = np.concatenate(([0], boundaries)).astype(position_dtype, copy=False)
+            self.run_counts = np.diff(np.append(self.run_starts, self.row_count)).astype(position_dtype, copy=False)
+        else:
+            self.run_starts = np.zeros(0, dtype=position_dtype)
+            self.run_counts = np.zeros(0, dtype=position_dtype)
+
+    @property
+    def unique_hashes(self):
+        return self.sorted_hashes[self.run_starts]
+
+    @property
+    def nbytes(self):
+        return int(self.order.nbytes + self.sorted_hashes.nbytes + self.run_starts.nbytes + self.run_counts.nbytes)
+
+    @property
+    def bytes_per_row(self):
+        return round(self.nbytes / self.row_count, 2) if self.row_count else 0.0
+
+    def rows_of(self, hash_value):
+        """Row positions holding the given hash (ascending)"""
+        start = np.searchsorted(self.sorted_hashes, np.uint64(hash_value), side='left')
+        stop = np.searchsorted(self.sorted_hashes, np.uint64(hash_value), side='right')
+        return self.order[start:stop]
+
+    def _row_mask(self, sorted_mask):
+        """Translate a mask over sorted_hashes into a mask over row positions"""
+        mask = np.zeros(self.row_count, dtype=bool)
+        mask[self.order[sorted_mask]] = True
+        return mask
+
+    def unmatched_mask(self, matched_counts):
+        """
+        Rows without a partner on the other side.
+        For duplicated hashes the FIRST (count - matched) occurrences are unmatched,
+        same as the original dictionary based logic.
+        """
+        if self.row_count == 0:
+            return np.zeros(0, dtype=bool)
+        rank = np.arange(self.row_count) - np.repeat(self.run_starts, self.run_counts)
+        return self._row_mask(rank < np.repeat(self.run_counts - matched_counts, self.run_counts))
+
+    def absent_mask(self, present):
+        """Rows whose hash does not exist on the other side (present: bool per distinct hash)"""
+        if self.row_count == 0:
+            return np.zeros(0, dtype=bool)
+        return self._row_mask(~np.repeat(present, self.run_counts))
+
+    def match(self, other):
+        """Duplicate-aware matching against the index of the other side (see match_row_hashes)"""
+        self_unique, other_unique = self.unique_hashes, other.unique_hashes
+        common, self_pos, other_pos = np.intersect1d(self_unique, other_unique, assume_unique=True, return_indices=True)
+
+        pair_counts = np.minimum(self.run_counts[self_pos], other.run_counts[other_pos]).astype(np.int64)
+        self_matched = np.zeros(len(self_unique), dtype=np.int64)
+        other_matched = np.zeros(len(other_unique), dtype=np.int64)
+        self_matched[self_pos] = pair_counts
+        other_matched[other_pos] = pair_counts
+
+        self_present = np.zeros(len(self_unique), dtype=bool)
+        other_present = np.zeros(len(other_unique), dtype=bool)
+        self_present[self_pos] = True
+        other_present[other_pos] = True
+
+        common_rows = int(pair_counts.sum())
+        total_rows = self.row_count + other.row_count
+        return {
+            'common_rows': common_rows,
+            'unique_to_source': int(self.row_count - common_rows),
+            'unique_to_target': int(other.row_count - common_rows),
+            'unique_source_hashes': int(len(self_unique)),
+            'unique_target_hashes': int(len(other_unique)),
+            'common_hashes': int(len(common)),
+            'source_only_mask': self.unmatched_mask(self_matched),
+            'target_only_mask': other.unmatched_mask(other_matched),
+            'source_absent_mask': self.absent_mask(self_present),
+            'target_absent_mask': other.absent_mask(other_present),
+            'index_stats': {
+                'source_bytes': self.nbytes,
+                'target_bytes': other.nbytes,
+                'bytes_per_row': round((self.nbytes + other.nbytes) / total_rows, 2) if total_rows else 0.0
+            }
+        }
+
+def match_row_hashes(source_row_hashes, target_row_hashes):
+    """
+    Duplicate-aware matching of two row hash arrays through RowHashIndex.
+
+    Returns dict with:
+      common_rows, unique_to_source, unique_to_target   - summary counts
+      unique_source_hashes, unique_target_hashes, common_hashes - distinct hash counts
+      source_only_mask / target_only_mask               - rows without a partner (incl. surplus duplicates)
+      source_absent_mask / target_absent_mask           - rows whose hash does not exist on the other side
+      index_stats                                       - memory of both indexes (bytes, bytes per row)
+    """
+    return RowHashIndex(source_row_hashes).match(RowHashIndex(target_row_hashes))
+
+def format_row_hash(hash_value):
+    """Hex representation of a 64-bit row hash (for logs and mismatch references)"""
+    return f"{int(hash_value):016x}"
+
+# ========== PARALLEL NORMALIZATION AND HASHING ==========
+# Large frames are split into row chunks that are normalized and hashed in a process pool.
+# Columns travel through shared memory as plain numpy buffers (numbers / datetimes as is,
+# text as UTF-8 bytes plus row offsets and a null mask) - no DataFrame is pickled. Workers write
+# row hashes and per-column codes of their normalized values back into shared memory and
+# only return the distinct normalized values and per-chunk hash counts.
+
+def get_comparison_worker_count():
+    """Worker processes for parallel normalization/hashing (PERFORMANCE_CONFIG['comparison_workers'], 0 = all cores)"""
+    workers = PERFORMANCE_CONFIG.get('comparison_workers', 0) or os.cpu_count() or 1
+    return max(1, int(workers))
+
+def should_parallelize(row_count, workers=None):
+    """The pool only pays off for large frames and when more than one worker is configured"""
+    workers = workers or get_comparison_worker_count()
+    return workers > 1 and row_count >= PERFORMANCE_CONFIG.get('parallel_min_rows', 500000)
+
+def _share_array(values, blocks):
+    """Copy a numpy array into a new shared memory block, return the spec to attach it"""
+    values = np.ascontiguousarray(values)
+    shm = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+    blocks.append(shm)
+    shared = np.ndarray(values.shape, dtype=values.dtype, buffer=shm.buf)
+    shared[...] = values
+    del shared
+    return {'name': shm.name, 'dtype': values.dtype.str, 'shape': values.shape}
+
+def _attach_array(spec, blocks):
+    """Numpy view on a shared memory block created by _share_array"""
+    shm = shared_memory.SharedMemory(name=spec['name'])
+    blocks.append(shm)
+    return np.ndarray(spec['shape'], dtype=np.dtype(spec['dtype']), buffer=shm.buf)
+
+def _share_text(values, blocks):
+    """
+    Share a sequence of strings as one UTF-8 byte buffer plus int64 row offsets,
+    so memory follows the total text length rather than rows x longest value
+    """
+    encoded = [value.encode('utf-8', 'surrogatepass') for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum(np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded)), out=offsets[1:])
+    data = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+    del encoded
+    return {'data': _share_array(data, blocks), 'offsets': _share_array(offsets, blocks)}
+
+def _attach_text(spec, blocks, start, end):
+    """Decode rows [start, end) of a column shared by _share_text into an object array"""
+    offsets = _attach_array(spec['offsets'], blocks)[start:end + 1].copy()
+    data = _attach_array(spec['data'], blocks)
+    chunk = data[offsets[0]:offsets[-1]].tobytes()
+    del data
+    offsets -= offsets[0]
+    values = np.empty(end - start, dtype=object)
+    values[:] = [chunk[begin:stop].decode('utf-8', 'surrogatepass') for begin, stop in zip(offsets[:-1], offsets[1:])]
+    return values
+
+def _close_blocks(blocks, unlink=False):
+    for shm in blocks:
+        try:
+            shm.close()
+            if unlink:
+                shm.unlink()
+        except Exception as e:
+            logger.debug(f"Could not release shared memory block {shm.name}: {e}")
+
+def _share_column(series, column_name, blocks):
+    """
+    Put one column into shared memory in a form that normalizes exactly like the original:
+      native numpy dtypes  -> raw values
+      pure text columns    -> UTF-8 bytes + offsets + null mask
+      mixed object columns -> their normalization string view (what the normalizer uses anyway)
+      anything else        -> normalized here, workers take the values as they are
+    """
+    dtype = series.dtype
+    if isinstance(dtype, np.dtype) and dtype.kind in 'biufM':
+        return {'column': column_name, 'values': _share_array(series.to_numpy(), blocks)}
+
+    if dtype == object:
+        inferred = pd.api.types.infer_dtype(series, skipna=True)
+        strings = series if inferred in ('string', 'empty') else _to_normalization_strings(series)
+        nulls = pd.isna(strings).to_numpy(dtype=bool)
+        text = [str(value) for value in strings.where(~nulls, '').to_numpy()]
+        return {'column': column_name, 'text': _share_text(text, blocks), 'nulls': _share_array(nulls, blocks)}
+
+    normalized, _ = normalize_column_values(series, column_name)
+    text = [str(value) for value in np.asarray(normalized, dtype=object)]
+    return {'column': column_name, 'text': _share_text(text, blocks), 'normalized': True}
+
+def _parallel_hash_worker(task):
+    """Normalize and hash rows [start, end) of a shared frame (runs in a pool process)"""
+    blocks = []
+    try:
+        start, end = task['start'], task['end']
+        raw = {}
+        normalized = {}
+        for spec in task['layout']:
+            if 'text' not in spec:
+                values = _attach_array(spec['values'], blocks)[start:end]
+                raw[spec['column']] = values.copy()
+                del values
+                continue
+            column = _attach_text(spec['text'], blocks, start, end)
+            if spec.get('normalized'):
+                normalized[spec['column']] = column
+            else:
+                column[_attach_array(spec['nulls'], blocks)[start:end]] = None
+                raw[spec['column']] = column
+
+        worker_cache = {}
+        if raw:
+            chunk_df = pd.DataFrame(raw, index=pd.RangeIndex(end - start))
+            normalized_raw = normalize_columns(chunk_df, list(raw), worker_cache, task['side'], store_columns=False)
+            for col in raw:
+                normalized[col] = normalized_raw[col].to_numpy()
+
+        columns = [spec['column'] for spec in task['layout']]
+        normalized_df = pd.DataFrame({col: normalized[col] for col in columns}, columns=columns,
+                                     index=pd.RangeIndex(end - start))
+        row_hashes = compute_row_hashes(normalized_df)
+        output = _attach_array(task['hash_output'], blocks)
+        output[start:end] = row_hashes
+        del output
+
+        uniques = {}
+        for col, code_spec in zip(columns, task['code_outputs']):
+            codes, column_uniques = pd.factorize(normalized_df[col].to_numpy())
+            code_output = _attach_array(code_spec, blocks)
+            code_output[start:end] = codes
+            del code_output
+            uniques[col] = list(column_uniques)
+
+        hash_values, hash_counts = np.unique(row_hashes, return_counts=True)
+        return {
+            'start': start,
+            'end': end,
+            'uniques': uniques,
+            'hash_values': hash_values,
+            'hash_counts': hash_counts,
+            'column_stats': {col: worker_cache.get('column_stats', {}).get((task['side'], col), {}) for col in raw},
+            'plans': {col: worker_cache.get('plans', {}).get((task['side'], col)) for col in raw}
+        }
+    finally:
+        _close_blocks(blocks)
+
+def merge_hash_counts(chunk_results):
+    """Merge per-chunk (hash, count) pairs into one distinct-hash table"""
+    if not chunk_results:
+        return np.zeros(0, dtype=np.uint64), np.zeros(0, dtype=np.int64)
+    values = np.concatenate([result['hash_values'] for result in chunk_results])
+    counts = np.concatenate([result['hash_counts'] for result in chunk_results])
+    merged_values, inverse = np.unique(values, return_inverse=True)
+    merged_counts = np.bincount(inverse.ravel(), weights=counts, minlength=len(merged_values)).astype(np.int64)
+    return merged_values, merged_counts
+
+def parallel_normalize_and_hash(df, columns, normalization_cache, side="source", workers=None, chunk_rows=None):
+    """
+    Normalize and hash a DataFrame in a process pool.
+    The normalized columns are stored in normalization_cache exactly like normalize_columns
+    would store them, so every later step reuses them.
+
+    Returns (row_hashes, merged_hash_counts) or None when the pool could not be used
+    (the caller then continues single-process).
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    workers = workers or get_comparison_worker_count()
+    chunk_rows = chunk_rows or PERFORMANCE_CONFIG.get('parallel_chunk_rows', 250000)
+    row_count = len(df)
+    columns = list(columns)
+    blocks = []
+    start_time = time.time()
+
+    try:
+        layout = [_share_column(df[col], col, blocks) for col in columns]
+        hash_output = _share_array(np.zeros(row_count, dtype=np.uint64), blocks)
+        code_outputs = [_share_array(np.zeros(row_count, dtype=np.int64), blocks) for _ in columns]
+        tasks = [
+            {'layout': layout, 'start': start, 'end': min(start + chunk_rows, row_count), 'side': side,
+             'hash_output': hash_output, 'code_outputs': code_outputs}
+            for start in range(0, row_count, chunk_rows)
+        ]
+        logger.info(f"Parallel normalization/hashing of {side}: {row_count:,} rows, {len(tasks)} chunks, {workers} workers")
+
+        with ProcessPoolExecutor(max_workers=min(workers, max(len(tasks), 1))) as executor:
+            chunk_results = list(executor.map(_parallel_hash_worker, tasks))
+
+        # ===== REBUILD NORMALIZED COLUMNS FROM CODES + DISTINCT VALUES =====
+        attached = []
+        row_hashes = _attach_array(hash_output, attached).copy()
+        for col, code_spec in zip(columns, code_outputs):
+            codes = _attach_array(code_spec, attached)
+            values = np.empty(row_count, dtype=object)
+            column_stats = {}
+            plan = None
+            for result in chunk_results:
+                values[result['start']:result['end']] = np.asarray(result['uniques'][col], dtype=object).take(
+                    codes[result['start']:result['end']])
+                for name, count in result['column_stats'].get(col, {}).items():
+                    column_stats[name] = column_stats.get(name, 0) + count
+                plan = plan or result['plans'].get(col)
+            del codes
+            normalization_cache.setdefault('columns', {})[(side, col)] = values
+            normalization_cache.setdefault('plans', {})[(side, col)] = plan
+            normalization_cache.setdefault('column_stats', {})[(side, col)] = column_stats
+        _close_blocks(attached)
+
+        merged_counts = merge_hash_counts(chunk_results)
+        logger.info(f"   {side}: {len(merged_counts[0]):,} distinct row hashes merged from {len(chunk_results)} chunks "
+                    f"in {time.time() - start_time:.2f}s")
+        return row_hashes, merged_counts
+    except Exception as e:
+        logger.warning(f"⚠️ Parallel hashing unavailable ({e}) - continuing single-process")
+        return None
+    finally:
+        _close_blocks(blocks, unlink=True)
+
+# ========== INCREMENTAL RE-COMPARISON (HASH SNAPSHOTS) ==========
+# The row hashes of every side are persisted after a run (see dq_hash_snapshot). The next
+# run of the same comparison reuses them: all of them when the source fingerprint is
+# unchanged, otherwise those of the row chunks whose raw values did not change.
+
+def should_use_hash_snapshots(ui_data=None):
+    """COMPARISON_SETTINGS['hash_snapshots'] ('auto' / 'never', default 'never'), overridable with ui_data['incremental']"""
+    mode = COMPARISON_SETTINGS.get('hash_snapshots', 'never')
+    if ui_data and 'incremental' in ui_data:
+        mode = 'auto' if safe_bool_check(ui_data['incremental']) else 'never'
+    return mode != 'never'
+
+def get_watermark_column(ui_data=None):
+    """Database column whose MAX() tells whether a table changed (ui_data['watermark_column'] or settings)"""
+    if ui_data and ui_data.get('watermark_column'):
+        return str(ui_data['watermark_column']).strip()
+    return COMPARISON_SETTINGS.get('snapshot_watermark_column')
+
+def prepare_hash_snapshot(df, columns, watermark_column=None):
+    """Identity, fingerprint and previous snapshot of one side - None when the source is unknown"""
+    identity = get_source_identity(df)
+    if identity is None:
+        return None
+    directory = COMPARISON_SETTINGS.get('snapshot_directory', 'temp/hash_snapshots')
+    snapshot = load_hash_snapshot(directory, identity, columns)
+    return {
+        'identity': identity,
+        'directory': directory,
+        'columns': list(columns),
+        'fingerprint': get_source_fingerprint(df, watermark_column),
+        'snapshot': snapshot,
+        'chunk_rows': snapshot['chunk_rows'] if snapshot else COMPARISON_SETTINGS.get('snapshot_chunk_rows', 100000),
+        'chunk_digests': None
+    }
+
+def reuse_snapshot_hashes(df, columns, normalization_cache, side, state):
+    """
+    Row hashes of one side rebuilt from its snapshot: unchanged fingerprint -> every hash
+    is reused, otherwise only chunks with a changed raw digest are normalized and hashed
+    (with the column plans of the snapshot, so reused and new hashes stay comparable).
+    Returns (row_hashes, stats) or None when nothing can be reused.
+    """
+    snapshot = state['snapshot']
+    if snapshot is None:
+        return None
+
+    row_count = len(df)
+    if state['fingerprint'] is not None and state['fingerprint'] == snapshot.get('fingerprint') and row_count == snapshot['row_count']:
+        state['chunk_digests'] = snapshot['chunk_digests']
+        logger.info(f"♻️  {side}: source unchanged - reusing all {row_count:,} row hashes")
+        return snapshot['row_hashes'], {'rows_rehashed': 0, 'rows_reused': row_count, 'snapshot': 'unchanged'}
+
+    chunk_rows = state['chunk_rows']
+    state['chunk_digests'] = get_chunk_digests(df, columns, chunk_rows)
+    previous_digests = snapshot['chunk_digests']
+    changed = [index for index, digest in enumerate(state['chunk_digests'])
+               if index >= len(previous_digests) or digest != previous_digests[index]]
+    if len(changed) == len(state['chunk_digests']):
+        return None
+
+    for col in columns:
+        plan = (snapshot.get('plans') or {}).get(col)
+        if plan:
+            normalization_cache.setdefault('plans', {})[(side, col)] = plan
+
+    row_hashes = snapshot['row_hashes'][:row_count].copy()
+    if len(row_hashes) < row_count:
+        row_hashes = np.concatenate([row_hashes, np.zeros(row_count - len(row_hashes), dtype=np.uint64)])
+    rows_rehashed = 0
+    for index in changed:
+        start, end = index * chunk_rows, min((index + 1) * chunk_rows, row_count)
+        chunk = df.iloc[start:end]
+        row_hashes[start:end] = compute_row_hashes(normalize_columns(chunk, columns, normalization_cache, side, store_columns=False))
+        rows_rehashed += end - start
+
+    logger.info(f"♻️  {side}: {len(changed):,} of {len(state['chunk_digests']):,} chunks changed - "
+                f"rehashed {rows_rehashed:,} rows, reused {row_count - rows_rehashed:,}")
+    return row_hashes, {'rows_rehashed': rows_rehashed, 'rows_reused': row_count - rows_rehashed, 'snapshot': 'chunks'}
+
+def store_hash_snapshot(df, row_hashes, normalization_cache, side, state):
+    """Persist the row hashes of one side for the next run"""
+    if state['chunk_digests'] is None:
+        state['chunk_digests'] = get_chunk_digests(df, state['columns'], state['chunk_rows'])
+    plans = {col: (normalization_cache or {}).get('plans', {}).get((side, col))
+             or ((state['snapshot'] or {}).get('plans') or {}).get(col)
+             for col in state['columns']}
+    save_hash_snapshot(state['directory'], state['identity'], state['columns'], row_hashes,
+                       state['fingerprint'], state['chunk_digests'], state['chunk_rows'], plans,
+                       max_snapshots=COMPARISON_SETTINGS.get('snapshot_max_count', 50))
+
+def compare_row_counts(source_df, target_df, error_logger, session_id, source_info, target_info):
+    """FIRST CHECK: Compare row counts"""
+    logger.info("FIRST CHECK: ROW COUNT COMPARISON")
+    
+    source_label, target_label = get_dynamic_labels(source_info, target_info)
+
+    source_count = len(source_df)
+    target_count = len(target_df)
+    
+    logger.info(f"Source rows: {source_count:,}, Target rows: {target_count:,}")
+    
+    if source_count == target_count:
+        logger.info("✅ Row counts match perfectly")
+        return True, 0, 0
+    else:
+        diff = abs(source_count - target_count)
+        percentage_diff = (diff / max(source_count, target_count)) * 100
+        logger.warning(f"Row count difference: {diff:,} rows ({percentage_diff:.2f}%)")
+        
+        if source_count > target_count:
+            logger.warning(f"Source has {diff:,} more rows than target")
+            missing_in_target = diff
+            extra_in_target = 0
+        else:
+            logger.warning(f"Target has {diff:,} more rows than source")
+            missing_in_target = 0
+            extra_in_target = diff
+        
+        # Log this error
+        error_logger.log_error({
+            'session_id': session_id,
+            'check_type': 'comparison',
+            'source_name': source_info,
+            'target_name': target_info,
+            'actual_value': f"{source_label} has {source_count:,} rows",
+            'expected_value': f"{target_label} has {target_count:,} rows",
+            'error_type': 'row_count_mismatch',
+            'error_description': f"Row count mismatch. Source({source_label})={source_count}, Target({target_label})={target_count}, Difference={diff}",
+            'severity': 'high'
+        })
+        
+        return False, missing_in_target, extra_in_target
+
+def compare_column_structures(source_df, target_df,source_info, target_info, ui_data=None):
+    """
+    Compare column structures between source and target
+    
+    Returns:
+        dict: {
+            'column_match': bool,
+            'total_columns_match': bool,
+            'column_names_match': bool,
+            'column_order_match': bool,
+            'data_types_match': bool,
+            'details': {
+                'missing_in_target': list,
+                'missing_in_source': list,
+                'type_mismatches': list,
+                'order_mismatches': list
+            }
+        }
+    """
+    logger.info("Comparing column structures...")
+    
+    results = {
+        'column_match': True,
+        'total_columns_match': True,
+        'column_names_match': True,
+        'column_order_match': True,
+        'data_types_match': True,
+        'details': {
+            'missing_in_target': [],
+            'missing_in_source': [],
+            'type_mismatches': [],
+            'order_mismatches': []
+        }
+    }
+    
+    # Get column names (of the whole source, also when only some columns were loaded)
+    source_columns = get_schema_columns(source_df)
+    target_columns = get_schema_columns(target_df)
+    
+    # Convert to lowercase for case-insensitive comparison if requested
+    if ui_data and ui_data.get('case_insensitive', True):
+        source_columns_lower = [col.lower() for col in source_columns]
+        target_columns_lower = [col.lower() for col in target_columns]
+        
+        # Create mapping for original names
+        source_col_map = {col.lower(): col for col in source_columns}
+        target_col_map = {col.lower(): col for col in target_columns}
+        
+        # Check total column count
+        if len(source_columns) != len(target_columns):
+            results['total_columns_match'] = False
+            results['column_match'] = False
+            logger.warning(f"Column count mismatch: Source={len(source_columns)}, Target={len(target_columns)}")
+        
+        # Find missing columns (case-insensitive)
+        missing_in_target = [source_col_map[col] for col in source_columns_lower 
+                            if col not in target_columns_lower]
+        missing_in_source = [target_col_map[col] for col in target_columns_lower 
+                            if col not in source_columns_lower]
+        
+        results['details']['missing_in_target'] = missing_in_target
+        results['details']['missing_in_source'] = missing_in_source
+        
+        if missing_in_target or missing_in_source:
+            results['column_names_match'] = False
+            results['column_match'] = False
+            
+            if missing_in_target:
+                logger.warning(f"Columns missing in target: {missing_in_target}")
+            if missing_in_source:
+                logger.warning(f"Columns missing in source: {missing_in_source}")
+        
+        # Check column order (case-insensitive)
+        if source_columns_lower != target_columns_lower:
+            results['column_order_match'] = False
+            results['column_match'] = False
+            
+            # Find order mismatches
+            for i, (src_col, tgt_col) in enumerate(zip(source_columns_lower, target_columns_lower)):
+                if src_col != tgt_col:
+                    results['details']['order_mismatches'].append({
+                        'position': i + 1,
+                        'source_column': source_columns[i] if i < len(source_columns) else None,
+                        'target_column': target_columns[i] if i < len(target_columns) else None
+                    })
+            
+            if results['details']['order_mismatches']:
+                logger.warning(f"Column order mismatch at positions: {[m['position'] for m in results['details']['order_mismatches']]}")
+        
+        # Compare data types (when available)
+        try:
+            # Get data types
+            source_dtypes = source_df.dtypes.to_dict()
+            target_dtypes = target_df.dtypes.to_dict()
+            
+            # Determine if these are from database or file
+            is_source_db = 'database' in str(source_info).lower() or 'db' in str(source_info).lower()
+            is_target_db = 'database' in str(target_info).lower() or 'db' in str(target_info).lower()
 
             type_mismatches = []
             
@@ -1649,6 +2918,40 @@ def get_database_primary_keys(df, db_info):
     # TODO: Implement actual database PK querying
     return []
 
+KEY_INFERENCE_SAMPLE_SIZES = (1000, 10000, 100000)
+
+def find_unique_columns(df, columns=None, sample_sizes=KEY_INFERENCE_SAMPLE_SIZES):
+    """
+    Columns without nulls and duplicates, found in stages:
+      1. growing random samples - a column is dropped at its first null or duplicate
+      2. the finalists are confirmed on all rows by checking their row hashes for duplicates
+         (an exact nunique() only runs when two hashes collide)
+    Returns (unique_columns, stats)
+    """
+    columns = list(df.columns if columns is None else columns)
+    remaining = columns
+    order = np.random.default_rng(42).permutation(len(df))
+    stats = {'columns': len(columns), 'dropped_by_sample': {}, 'finalists': 0}
+    
+    for sample_size in sample_sizes:
+        if sample_size >= len(df) or not remaining:
+            break
+        sample = df[remaining].take(order[:sample_size])
+        survivors = [column for column in remaining
+                     if not (sample[column].isnull().any() or sample[column].duplicated().any())]
+        stats['dropped_by_sample'][sample_size] = len(remaining) - len(survivors)
+        remaining = survivors
+    
+    stats['finalists'] = len(remaining)
+    unique_columns = []
+    for column in remaining:
+        series = df[column]
+        if series.isnull().any():
+            continue
+        if not pd.Series(hash_values(series)).duplicated().any() or series.nunique() == len(series):
+            unique_columns.append(column)
+    return unique_columns, stats
+
 def infer_key_fields_from_data(df):
     """
     Analyze DataFrame to suggest likely key fields
@@ -1659,14 +2962,14 @@ def infer_key_fields_from_data(df):
     
     key_candidates = []
     
-    for column in df.columns:
-        # Skip columns with too many nulls
-        null_pct = df[column].isnull().sum() / len(df)
-        if null_pct > 0.1:  # More than 10% nulls
-            continue
-        
-        # Calculate uniqueness score
-        unique_pct = df[column].nunique() / len(df)
+    # Only fully unique, null-free columns can qualify - find them without scanning every column
+    unique_columns, inference_stats = find_unique_columns(df)
+    logger.debug(f"Key inference: {inference_stats['finalists']} of {inference_stats['columns']} columns "
+                 f"survived sampling, {len(unique_columns)} unique")
+    
+    for column in unique_columns:
+        null_pct = 0.0
+        unique_pct = 1.0
         
         # Calculate score based on multiple factors
         score = 0
@@ -1728,6 +3031,178 @@ def infer_key_fields_from_data(df):
     # Return only column names (for backward compatibility)
     return [candidate['column'] for candidate in key_candidates]
 
+# ========== COMPOSITE KEY DISCOVERY ==========
+# Tables keyed by column pairs such as (account_id, business_date) have no single unique
+# column. The column lattice is searched bottom-up for minimal unique combinations:
+# columns that hold nulls, a single value, floats, timestamps, free text or measures
+# (amount / price / ... names) on either side are filtered out, identifier-like columns
+# (by name, then by cardinality) are searched first, combinations whose cardinality
+# product cannot reach the row count are pruned, supersets of a found key are skipped
+# (minimality) and every remaining combination is tested on growing samples before its
+# combined row hash is checked on all rows. A combination can be unique by coincidence,
+# so discovered keys are suggestions unless composite_key_join is on.
+
+COMPOSITE_KEY_NAME_PATTERNS = ['id', 'key', 'code', 'num', 'no', 'ref', 'sku', 'account', 'customer',
+                               'date', 'dt', 'day', 'month', 'period', 'version', 'seq', 'line', 'type']
+# Measures and free text: whole name tokens (short words) or anywhere in the name
+COMPOSITE_KEY_EXCLUDED_TOKENS = {'amt', 'cost', 'total', 'value', 'qty', 'rate', 'pct', 'score', 'desc', 'note',
+                                 'notes', 'text', 'time', 'created', 'updated', 'modified'}
+COMPOSITE_KEY_EXCLUDED_PATTERNS = ['amount', 'price', 'balance', 'quantity', 'percent', 'comment', 'remark',
+                                   'message', 'address', 'timestamp', 'description']
+COMPOSITE_HASH_MULTIPLIER = np.uint64(1099511628211)
+TIME_OF_DAY_PATTERN = re.compile(r'\d{1,2}:\d{2}')
+
+def _composite_key_exclusion(column, series):
+    """Why a column cannot be part of a discovered key (None when it can)"""
+    col_lower = str(column).lower()
+    tokens = set(re.findall(r'[a-z0-9]+', re.sub(r'([a-z])([A-Z])', r'\1_\2', str(column)).lower()))
+    excluded_name = tokens & COMPOSITE_KEY_EXCLUDED_TOKENS or any(pattern in col_lower for pattern in COMPOSITE_KEY_EXCLUDED_PATTERNS)
+    if excluded_name and not tokens & {'id', 'key', 'code', 'no', 'num', 'ref', 'sku'}:  # e.g. rate_code stays
+        return 'measure_or_text_name'
+    if pd.api.types.is_float_dtype(series.dtype):
+        return 'float'
+    if pd.api.types.is_datetime64_any_dtype(series.dtype):
+        values = series.dropna()
+        return 'timestamp' if (values.dt.normalize() != values).any() else None
+    if pd.api.types.is_object_dtype(series.dtype) or pd.api.types.is_string_dtype(series.dtype):
+        sample = series.dropna().head(200).astype(str)
+        if len(sample) and sample.str.contains(TIME_OF_DAY_PATTERN).mean() > 0.5:
+            return 'timestamp'
+        if len(sample) and (sample.str.len().mean() > 40 or sample.str.contains(r'\s').mean() > 0.5):
+            return 'free_text'
+    return None
+
+def _composite_column_score(column, series):
+    """Preference of a column as key part: identifier-like names and integer/date types"""
+    col_lower = str(column).lower()
+    score = 10 if any(pattern in col_lower for pattern in COMPOSITE_KEY_NAME_PATTERNS) else 0
+    if pd.api.types.is_integer_dtype(series.dtype) or pd.api.types.is_datetime64_any_dtype(series.dtype):
+        score += 5
+    return score
+
+def _combined_hashes(column_hashes, columns, positions=None):
+    """One uint64 per row for a column combination (order-sensitive mix of the column hashes)"""
+    combined = None
+    for column in columns:
+        hashes = column_hashes[column] if positions is None else column_hashes[column][positions]
+        combined = hashes.copy() if combined is None else (combined * COMPOSITE_HASH_MULTIPLIER) ^ hashes
+    return combined
+
+def _is_unique_combination(df, column_hashes, columns, order, sample_sizes=KEY_INFERENCE_SAMPLE_SIZES):
+    """Samples first (cheap rejection), then all rows; exact duplicated() only on a hash collision"""
+    for sample_size in sample_sizes:
+        if sample_size >= len(df):
+            break
+        if pd.Series(_combined_hashes(column_hashes, columns, order[:sample_size])).duplicated().any():
+            return False
+    if not pd.Series(_combined_hashes(column_hashes, columns)).duplicated().any():
+        return True
+    return not df.duplicated(subset=list(columns)).any()
+
+def discover_composite_keys(source_df, target_df, max_size=None, max_columns=None, max_keys=5):
+    """
+    Minimal column combinations that are unique in both source and target.
+
+    Returns (ranked candidates, stats). Each candidate:
+      {'source_columns': [...], 'target_columns': [...], 'size': n, 'score': s}
+    Smaller keys rank first, then keys made of identifier-like columns. Every key holds
+    at least one column that is identifier-like by name or by cardinality (>= half of
+    the rows distinct). stats['columns_excluded'] maps filtered columns to the reason.
+    """
+    start_time = time.time()
+    max_size = max_size or COMPARISON_SETTINGS.get('composite_key_max_size', 3)
+    max_columns = max_columns or COMPARISON_SETTINGS.get('composite_key_max_columns', 12)
+    stats = {'columns_considered': 0, 'combinations_pruned': 0, 'combinations_tested': 0, 'columns_excluded': {}}
+    if source_df.empty or target_df.empty:
+        return [], stats
+
+    target_by_lower = {str(col).lower(): col for col in target_df.columns}
+    sides = {'source': source_df, 'target': target_df}
+
+    # Column filters on BOTH sides, then per-column cardinality (from the column hashes, reused for every combination)
+    column_info = []
+    for src_col in source_df.columns:
+        tgt_col = target_by_lower.get(str(src_col).lower())
+        if tgt_col is None:
+            continue
+        reason = _composite_key_exclusion(src_col, source_df[src_col]) or _composite_key_exclusion(tgt_col, target_df[tgt_col])
+        if reason is None and (source_df[src_col].isnull().any() or target_df[tgt_col].isnull().any()):
+            reason = 'nulls'
+        if reason:
+            stats['columns_excluded'][src_col] = reason
+            continue
+        column_info.append((src_col, tgt_col, _composite_column_score(src_col, source_df[src_col])))
+    column_info.sort(key=lambda info: info[2], reverse=True)
+
+    column_hashes = {'source': {}, 'target': {}}
+    cardinality = {'source': {}, 'target': {}}
+    candidates = []
+    for src_col, tgt_col, score in column_info[:2 * max_columns]:
+        usable = True
+        for side, column in (('source', src_col), ('target', tgt_col)):
+            hashes = hash_values(sides[side][column])
+            distinct = pd.Series(hashes).nunique()
+            if distinct < 2:
+                usable = False  # Constant columns never help
+                break
+            column_hashes[side][src_col] = hashes
+            cardinality[side][src_col] = distinct
+        if usable:
+            candidates.append((src_col, tgt_col, score))
+    # Same name score: the column closer to unique identifies rows better
+    candidates.sort(key=lambda info: (info[2], min(cardinality[side][info[0]] / len(sides[side]) for side in sides)),
+                    reverse=True)
+    candidates = candidates[:max_columns]
+    stats['columns_considered'] = len(candidates)
+
+    target_of = {src_col: tgt_col for src_col, tgt_col, _ in candidates}
+    score_of = {src_col: score for src_col, _, score in candidates}
+    identifier_like = {src_col for src_col, _, score in candidates
+                       if score >= 10 or all(cardinality[side][src_col] * 2 >= len(sides[side]) for side in sides)}
+    orders = {side: np.random.default_rng(42).permutation(len(df)) for side, df in sides.items()}
+    target_hashes = {target_of[col]: hashes for col, hashes in column_hashes['target'].items() if col in target_of}
+
+    found = []
+    for size in range(1, max_size + 1):
+        for columns in itertools.combinations([col for col, _, _ in candidates], size):
+            if any(set(key) <= set(columns) for key in found):
+                continue  # Superset of a smaller key - not minimal
+            if not identifier_like.intersection(columns):
+                stats['combinations_pruned'] += 1
+                continue  # Unique by coincidence rather than by identity
+            # Cardinality bound: the combination has at most prod(cardinalities) distinct values
+            if any(np.prod([float(cardinality[side][col]) for col in columns]) < len(sides[side])
+                   for side in sides):
+                stats['combinations_pruned'] += 1
+                continue
+            stats['combinations_tested'] += 1
+            if not _is_unique_combination(source_df, column_hashes['source'], columns, orders['source']):
+                continue
+            target_columns = [target_of[col] for col in columns]
+            if _is_unique_combination(target_df, target_hashes, target_columns, orders['target']):
+                found.append(columns)
+        if found:
+            break  # Keep the smallest keys only
+
+    ranked = sorted(
+        ({'source_columns': list(columns),
+          'target_columns': [target_of[col] for col in columns],
+          'size': len(columns),
+          'score': sum(score_of[col] for col in columns)} for columns in found),
+        key=lambda candidate: (candidate['size'], -candidate['score'])
+    )[:max_keys]
+    stats['seconds'] = round(time.time() - start_time, 3)
+    logger.info(f"🔑 Composite key discovery: {len(ranked)} key(s) from {stats['columns_considered']} columns "
+                f"({len(stats['columns_excluded'])} excluded, {stats['combinations_tested']} tested, "
+                f"{stats['combinations_pruned']} pruned) in {stats['seconds']:.2f}s")
+    return ranked, stats
+
+def get_duplicate_key_samples(duplicates, fields, limit=3):
+    """First duplicated key values (tuples for composite keys)"""
+    if len(fields) == 1:
+        return duplicates[fields[0]].unique().tolist()[:limit]
+    return [tuple(values) for values in duplicates[fields].drop_duplicates().head(limit).values.tolist()]
+
 def validate_primary_key_fields(source_df, target_df, key_fields=None, ui_data=None):
     """
     Validate primary key/unique fields
@@ -1817,6 +3292,24 @@ def validate_primary_key_fields(source_df, target_df, key_fields=None, ui_data=N
             key_fields = [item['source_column'] for item in common_keys]
             results['details']['common_keys'] = common_keys
             logger.info(f"Auto-detected common key fields: {key_fields}")
+        elif COMPARISON_SETTINGS.get('composite_key_discovery', True):
+            # No single unique column - look for a unique column combination
+            composite_keys, discovery_stats = discover_composite_keys(source_df, target_df)
+            results['details']['composite_key_candidates'] = composite_keys
+            results['details']['composite_key_discovery'] = discovery_stats
+            if composite_keys and COMPARISON_SETTINGS.get('composite_key_join', False):
+                key_fields = composite_keys[0]['source_columns']
+                results['details']['key_detection_method'] = 'composite_detected'
+                logger.info(f"Auto-detected composite key: {key_fields}")
+            elif composite_keys:
+                # Unique in this data, not necessarily by design - only suggested
+                results['details']['suggested_key_fields'] = composite_keys[0]['source_columns']
+                logger.info(f"No common key fields auto-detected - suggested composite key: "
+                            f"{' + '.join(composite_keys[0]['source_columns'])} (pass it as key_fields to join on it)")
+                key_fields = []
+            else:
+                logger.info("No common key fields auto-detected")
+                key_fields = []
         else:
             logger.info("No common key fields auto-detected")
             key_fields = []
@@ -1825,6 +3318,8 @@ def validate_primary_key_fields(source_df, target_df, key_fields=None, ui_data=N
     if not key_fields:
         results['validation_status'] = 'NO_KEYS_IDENTIFIED'
         results['status_message'] = 'No identifiable key fields found'
+        if results['details'].get('suggested_key_fields'):
+            results['status_message'] += f" (suggested composite key: {' + '.join(results['details']['suggested_key_fields'])})"
         results['validation_passed'] = None  # Not applicable
         logger.info("No key fields identified for validation")
         return results
@@ -1863,20 +3358,26 @@ def validate_primary_key_fields(source_df, target_df, key_fields=None, ui_data=N
         logger.warning(f"Key fields missing: {missing_list}")
         return results
     
-    # Step 5: Check uniqueness for each key field
+    # Step 5: Check uniqueness for each key field (a discovered composite key as a whole)
     all_unique = True
     validation_details = []
     
-    for key_info in results['key_fields_found']:
-        src_field = key_info['source_column']
-        tgt_field = key_info['target_column']
+    key_groups = [[key_info] for key_info in results['key_fields_found']]
+    if results['details']['key_detection_method'] == 'composite_detected':
+        key_groups = [results['key_fields_found']]
+    
+    for key_group in key_groups:
+        src_fields = [key_info['source_column'] for key_info in key_group]
+        tgt_fields = [key_info['target_column'] for key_info in key_group]
+        src_field = ' + '.join(src_fields)
+        tgt_field = ' + '.join(tgt_fields)
         
         # Check uniqueness in source
-        source_duplicates = source_df[source_df.duplicated(subset=[src_field], keep=False)]
+        source_duplicates = source_df[source_df.duplicated(subset=src_fields, keep=False)]
         source_unique = source_duplicates.empty
         
         # Check uniqueness in target  
-        target_duplicates = target_df[target_df.duplicated(subset=[tgt_field], keep=False)]
+        target_duplicates = target_df[target_df.duplicated(subset=tgt_fields, keep=False)]
         target_unique = target_duplicates.empty
         
         if not source_unique or not target_unique:
@@ -1884,7 +3385,7 @@ def validate_primary_key_fields(source_df, target_df, key_fields=None, ui_data=N
             
             if not source_unique:
                 dup_count = len(source_duplicates)
-                sample_values = source_duplicates[src_field].unique().tolist()[:3]
+                sample_values = get_duplicate_key_samples(source_duplicates, src_fields)
                 results['details']['source_duplicates'].append({
                     'field': src_field,
                     'duplicate_count': dup_count,
@@ -1893,7 +3394,7 @@ def validate_primary_key_fields(source_df, target_df, key_fields=None, ui_data=N
             
             if not target_unique:
                 dup_count = len(target_duplicates)
-                sample_values = target_duplicates[tgt_field].unique().tolist()[:3]
+                sample_values = get_duplicate_key_samples(target_duplicates, tgt_fields)
                 results['details']['target_duplicates'].append({
                     'field': tgt_field,
                     'duplicate_count': dup_count,
@@ -2194,10 +3695,90 @@ def compare_table_metadata(source_df, target_df, source_info, target_info, ui_da
     return results
 
 
+STATISTICS_QUANTILES = {'p1': 0.01, 'p50': 0.5, 'p99': 0.99}
+STATISTICS_DATE_FORMATS = ['ISO8601', '%d/%m/%Y', '%d-%m-%Y', '%d.%m.%Y', '%Y%m%d', '%d/%m/%Y %H:%M:%S']
+
+def _optional_float(value):
+    return float(value) if not pd.isna(value) else None
+
+def numeric_column_statistics(df, columns, approximate=False):
+    """
+    min/max/mean/std/quantiles plus null and zero counts of many columns at once:
+    the columns are converted to one float matrix and reduced column-wise.
+    approximate=True takes the quantiles from KLL sketches instead of sorting each column.
+    """
+    null_counts = df[columns].isnull().sum().to_numpy()
+    if len(df) == 0:
+        empty = {stat: None for stat in ['min', 'max', 'mean', 'std', *STATISTICS_QUANTILES]}
+        return {col: {**empty, 'null_count': int(nulls), 'zero_count': 0} for col, nulls in zip(columns, null_counts)}
+
+    values = df[columns].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)  # All-null columns -> NaN
+        reduced = {
+            'min': np.nanmin(values, axis=0),
+            'max': np.nanmax(values, axis=0),
+            'mean': np.nanmean(values, axis=0),
+            'std': np.nanstd(values, axis=0, ddof=1)
+        }
+        if approximate:
+            quantiles = np.array([approximate_quantiles(values[:, i], list(STATISTICS_QUANTILES.values()))
+                                  for i in range(len(columns))], dtype=np.float64).T
+        else:
+            quantiles = np.nanquantile(values, list(STATISTICS_QUANTILES.values()), axis=0)
+    reduced.update(zip(STATISTICS_QUANTILES, quantiles))
+    zero_counts = (values == 0).sum(axis=0)
+
+    statistics = {}
+    for i, col in enumerate(columns):
+        statistics[col] = {stat: _optional_float(column_values[i]) for stat, column_values in reduced.items()}
+        statistics[col]['null_count'] = int(null_counts[i])
+        statistics[col]['zero_count'] = int(zero_counts[i])
+    return statistics
+
+def parse_date_column(series):
+    """Datetime values of a column - native datetimes as they are, strings by the first matching format"""
+    if pd.api.types.is_datetime64_any_dtype(series.dtype):
+        return series
+    strings = series.astype(str).str.strip().where(series.notna())
+    dates = pd.Series(pd.NaT, index=series.index, dtype='datetime64[ns]')
+    for date_format in STATISTICS_DATE_FORMATS:
+        missing = dates.isna() & strings.notna()
+        if not missing.any():
+            break
+        dates[missing] = pd.to_datetime(strings[missing], format=date_format, errors='coerce')
+    return dates
+
+def date_column_statistics(series):
+    """min/max/range of a date column, with null and unparseable counts"""
+    dates = parse_date_column(series)
+    null_count = int(series.isnull().sum())
+    min_date, max_date = dates.min(), dates.max()
+    return {
+        'min': str(min_date) if not pd.isna(min_date) else None,
+        'max': str(max_date) if not pd.isna(max_date) else None,
+        'range_days': int((max_date - min_date).days) if not pd.isna(min_date) else None,
+        'null_count': null_count,
+        'unparsed_count': int(dates.isnull().sum()) - null_count
+    }
+
+def is_date_column(series, column_name=""):
+    """Native datetime column, or a text column whose sampled values are mostly dates"""
+    if pd.api.types.is_datetime64_any_dtype(series.dtype):
+        return True
+    if str(series.dtype) not in ['object', 'category', 'string']:
+        return False
+    return build_normalization_plan(series, column_name)['semantic_type'] == 'date'
+
 def compare_statistics(source_df, target_df, common_cols_lower, source_col_map, target_col_map, ui_data):
     """
-    Compare statistical properties of columns
+    Compare statistical properties of columns.
+    On large inputs (or ui_data 'approximate') quantiles, distinct counts and top values
+    come from mergeable sketches (dq_sketches) instead of full sorts / value_counts.
     """
+    start_time = time.time()
+    approximate = use_approximate_profiling(max(len(source_df), len(target_df)),
+                                            (ui_data or {}).get('approximate'))
     results = {
         'statistics': {
             'numeric_comparison': {},
@@ -2214,7 +3795,50 @@ def compare_statistics(source_df, target_df, common_cols_lower, source_col_map,
     categorical_stats = {}
     date_stats = {}
     
+    # Numeric columns: one aggregation pass per DataFrame
+    numeric_cols = [col_lower for col_lower in common_cols_lower
+                    if 'int' in str(source_df[source_col_map[col_lower]].dtype)
+                    or 'float' in str(source_df[source_col_map[col_lower]].dtype)]
+    try:
+        src_numeric = numeric_column_statistics(source_df, [source_col_map[col] for col in numeric_cols], approximate)
+        tgt_numeric = numeric_column_statistics(target_df, [target_col_map[col] for col in numeric_cols], approximate)
+    except Exception as e:
+        logger.debug(f"Could not compute numeric column statistics: {e}")
+        numeric_cols = []
+    
+    for col_lower in numeric_cols:
+        src_col = source_col_map[col_lower]
+        src_stats = src_numeric[src_col]
+        tgt_stats = tgt_numeric[target_col_map[col_lower]]
+        
+        # Check for significant differences (>10%)
+        differences = []
+        for stat in ['min', 'max', 'mean']:
+            if src_stats[stat] is not None and tgt_stats[stat] is not None:
+                if src_stats[stat] != 0:
+                    diff_pct = abs(src_stats[stat] - tgt_stats[stat]) / abs(src_stats[stat]) * 100
+                    if diff_pct > 10:
+                        differences.append({
+                            'statistic': stat,
+                            'difference_percent': diff_pct,
+                            'source_value': src_stats[stat],
+                            'target_value': tgt_stats[stat]
+                        })
+        
+        numeric_stats[src_col] = {
+            'source': src_stats,
+            'target': tgt_stats,
+            'differences': differences,
+            'match': len(differences) == 0
+        }
+        
+        if differences:
+            results['summary']['statistics_match'] = False
+            results['summary']['all_metadata_match'] = False
+    
     for col_lower in common_cols_lower:
+        if col_lower in numeric_cols:
+            continue
         src_col = source_col_map[col_lower]
         tgt_col = target_col_map[col_lower]
         
@@ -2223,81 +3847,80 @@ def compare_statistics(source_df, target_df, common_cols_lower, source_col_map,
         
         src_dtype = str(src_series.dtype)
         
-        # Numeric columns
-        if 'int' in src_dtype or 'float' in src_dtype:
+        # Categorical columns
+        if src_dtype in ['object', 'category']:
             try:
-                src_stats = {
-                    'min': float(src_series.min()) if not pd.isna(src_series.min()) else None,
-                    'max': float(src_series.max()) if not pd.isna(src_series.max()) else None,
-                    'mean': float(src_series.mean()) if not pd.isna(src_series.mean()) else None,
-                    'std': float(src_series.std()) if not pd.isna(src_series.std()) else None,
-                    'null_count': int(src_series.isnull().sum())
-                }
-                
-                tgt_stats = {
-                    'min': float(tgt_series.min()) if not pd.isna(tgt_series.min()) else None,
-                    'max': float(tgt_series.max()) if not pd.isna(tgt_series.max()) else None,
-                    'mean': float(tgt_series.mean()) if not pd.isna(tgt_series.mean()) else None,
-                    'std': float(tgt_series.std()) if not pd.isna(tgt_series.std()) else None,
-                    'null_count': int(tgt_series.isnull().sum())
-                }
-                
-                # Check for significant differences (>10%)
-                differences = []
-                for stat in ['min', 'max', 'mean']:
-                    if src_stats[stat] is not None and tgt_stats[stat] is not None:
-                        if src_stats[stat] != 0:
-                            diff_pct = abs(src_stats[stat] - tgt_stats[stat]) / abs(src_stats[stat]) * 100
-                            if diff_pct > 10:
-                                differences.append({
-                                    'statistic': stat,
-                                    'difference_percent': diff_pct,
-                                    'source_value': src_stats[stat],
-                                    'target_value': tgt_stats[stat]
-                                })
+                if approximate:
+                    src_sketch = sketch_column(src_series)
+                    tgt_sketch = sketch_column(tgt_series)
+                    src_unique = round(src_sketch['distinct'].estimate())
+                    tgt_unique = round(tgt_sketch['distinct'].estimate())
+                    # Guaranteed occurrences (Space-Saving counts are upper bounds)
+                    src_top_values = {value: count - error for value, count, error in src_sketch['top_values'].top_k(5)}
+                    tgt_top_values = {value: count - error for value, count, error in tgt_sketch['top_values'].top_k(5)}
+                    # Estimates within 3 standard errors of each other count as equal
+                    tolerance = 3 * src_sketch['distinct'].relative_error * max(src_unique, tgt_unique)
+                    unique_match = bool(abs(src_unique - tgt_unique) <= tolerance)
+                else:
+                    src_unique = src_series.nunique()
+                    tgt_unique = tgt_series.nunique()
+                    
+                    src_top_values = src_series.value_counts().head(5).to_dict()
+                    tgt_top_values = tgt_series.value_counts().head(5).to_dict()
+                    unique_match = src_unique == tgt_unique
                 
-                numeric_stats[src_col] = {
-                    'source': src_stats,
-                    'target': tgt_stats,
-                    'differences': differences,
-                    'match': len(differences) == 0
+                categorical_stats[src_col] = {
+                    'source_unique': int(src_unique),
+                    'target_unique': int(tgt_unique),
+                    'source_top_values': src_top_values,
+                    'target_top_values': tgt_top_values,
+                    'unique_match': unique_match
                 }
                 
-                if differences:
+                if not unique_match:
                     results['summary']['statistics_match'] = False
                     results['summary']['all_metadata_match'] = False
                     
             except Exception as e:
-                logger.debug(f"Could not compute stats for numeric column {src_col}: {e}")
+                logger.debug(f"Could not compute stats for categorical column {src_col}: {e}")
         
-        # Categorical columns
-        elif src_dtype in ['object', 'category']:
-            try:
-                src_unique = src_series.nunique()
-                tgt_unique = tgt_series.nunique()
+        # Date columns (native datetimes or date strings)
+        try:
+            if is_date_column(src_series, src_col):
+                src_stats = date_column_statistics(src_series)
+                tgt_stats = date_column_statistics(tgt_series)
                 
-                src_top_values = src_series.value_counts().head(5).to_dict()
-                tgt_top_values = tgt_series.value_counts().head(5).to_dict()
+                differences = []
+                for stat in ['min', 'max']:
+                    if src_stats[stat] != tgt_stats[stat]:
+                        differences.append({
+                            'statistic': stat,
+                            'source_value': src_stats[stat],
+                            'target_value': tgt_stats[stat]
+                        })
                 
-                categorical_stats[src_col] = {
-                    'source_unique': int(src_unique),
-                    'target_unique': int(tgt_unique),
-                    'source_top_values': src_top_values,
-                    'target_top_values': tgt_top_values,
-                    'unique_match': src_unique == tgt_unique
+                date_stats[src_col] = {
+                    'source': src_stats,
+                    'target': tgt_stats,
+                    'differences': differences,
+                    'match': len(differences) == 0
                 }
                 
-                if src_unique != tgt_unique:
+                if differences:
                     results['summary']['statistics_match'] = False
                     results['summary']['all_metadata_match'] = False
                     
-            except Exception as e:
-                logger.debug(f"Could not compute stats for categorical column {src_col}: {e}")
+        except Exception as e:
+            logger.debug(f"Could not compute stats for date column {src_col}: {e}")
     
     results['statistics']['numeric_comparison'] = numeric_stats
     results['statistics']['categorical_comparison'] = categorical_stats
     results['statistics']['date_comparison'] = date_stats
+    results['statistics']['approximate'] = approximate
+    results['statistics']['computation_seconds'] = round(time.time() - start_time, 4)
     
+    logger.info(f"📊 Column statistics: {len(numeric_stats)} numeric, {len(categorical_stats)} categorical, "
+                f"{len(date_stats)} date columns in {results['statistics']['computation_seconds']:.2f}s")
     return results
 
 def normalize_data_type(dtype_str, context='pandas'):
@@ -2397,11 +4020,17 @@ def map_database_data_type(db_type_str, db_engine='generic'):
         return 'unknown'
 
 def compare_rows_detailed(source_row, target_row, source_columns, target_columns, common_cols,
-                         normalized_source=None, normalized_target=None, row_idx=None):
+                         normalized_source=None, normalized_target=None, row_idx=None, target_row_idx=None):
     """
     Compare two rows column by column and return detailed differences
     WITH SIGNIFICANCE FILTERING
+
+    row_idx / target_row_idx are positions in normalized_source / normalized_target
+    (target_row_idx defaults to row_idx for positionally paired rows)
     """
+    if target_row_idx is None:
+        target_row_idx = row_idx
+
     differences = []
     source_data = {}
     target_data = {}
@@ -2419,16 +4048,18 @@ def compare_rows_detailed(source_row, target_row, source_columns, target_columns
         source_data[src_col] = src_val if not pd.isna(src_val) else None
         target_data[tgt_col] = tgt_val if not pd.isna(tgt_val) else None
         
-        if normalized_source is not None and row_idx is not None and src_col in normalized_source:
+        if (normalized_source is not None and row_idx is not None and src_col in normalized_source
+                and row_idx < len(normalized_source)):
             # Get pre-normalized value (FAST!)
             src_norm = normalized_source[src_col].iloc[row_idx]
         else:
             # Normalize on the fly (fallback)
             src_norm = smart_normalize_value(src_val, src_col)
         
-        if normalized_target is not None and row_idx is not None and tgt_col in normalized_target:
+        if (normalized_target is not None and target_row_idx is not None and tgt_col in normalized_target
+                and target_row_idx < len(normalized_target)):
             # Get pre-normalized value (FAST!)
-            tgt_norm = normalized_target[tgt_col].iloc[row_idx]
+            tgt_norm = normalized_target[tgt_col].iloc[target_row_idx]
         else:
             # Normalize on the fly (fallback)
             tgt_norm = smart_normalize_value(tgt_val, tgt_col)
@@ -2635,11 +4266,652 @@ def format_mismatch_for_cli_detail(mismatch, source_label, target_label):
     
     return "\n".join(output)
 
-def advanced_data_comparison(source_df, target_df, selected_columns, common_cols, error_logger, session_id, source_info, target_info, source_file, target_file):
-    """SECOND CHECK: Hash-based comparison with PERFECT NORMALIZATION - FIXED FOR DUPLICATES"""
+def get_join_key_pairs(pk_validation_results):
+    """
+    Pick the key columns the join-based comparison can use.
+    Manually specified keys and discovered composite keys (composite_key_join on) are used together. Other
+    auto-detected keys are single-column candidates, so the best one that is unique
+    on both sides is used.
+
+    Returns list of (source_column, target_column) tuples - empty when no usable key.
+    """
+    if not pk_validation_results:
+        return []
+
+    status = pk_validation_results.get('validation_status')
+    found = pk_validation_results.get('key_fields_found', [])
+    if not found or status not in ['VALIDATION_PASSED', 'DUPLICATE_VALUES']:
+        return []
+
+    details = pk_validation_results.get('details', {})
+    if details.get('key_detection_method') in ['manual_input', 'ui_input', 'composite_detected']:
+        return [(key['source_column'], key['target_column']) for key in found]
+
+    for detail in details.get('validation_details', []):
+        if detail.get('unique_in_source') and detail.get('unique_in_target'):
+            return [(detail['field'], detail['target_field'])]
+    return []
+
+def key_join_comparison(source_df, target_df, normalized_source, normalized_target,
+                        source_columns, target_columns, key_pairs, common_cols,
+                        error_logger, session_id, source_info, target_info, normalization_cache=None):
+    """
+    Join-based reconciliation for keyed data.
+    Merges source and target on their normalized keys, builds per-column equality masks
+    for the joined rows and classifies every row as matched / changed / missing / extra
+    in one pass. Detailed diffs pair rows by KEY, not by position.
+
+    Returns the same tuple as advanced_data_comparison, or None when the normalized
+    keys are not unique on both sides (caller falls back to the hash comparison).
+    """
+    join_start = time.time()
+    source_key_columns = [source_col for source_col, _ in key_pairs]
+    target_key_columns = [target_col for _, target_col in key_pairs]
+    logger.info(f"KEY-BASED JOIN COMPARISON on {source_key_columns} ↔ {target_key_columns}")
+
+    source_keys = compute_row_hashes(normalize_columns(source_df, source_key_columns, normalization_cache, 'source'))
+    target_keys = compute_row_hashes(normalize_columns(target_df, target_key_columns, normalization_cache, 'target'))
+
+    source_key_dups = int(pd.Series(source_keys).duplicated().sum())
+    target_key_dups = int(pd.Series(target_keys).duplicated().sum())
+    if source_key_dups or target_key_dups:
+        logger.warning(f"⚠️ Normalized keys not unique (source duplicates: {source_key_dups:,}, "
+                       f"target duplicates: {target_key_dups:,}) - using hash-based comparison instead")
+        return None
+
+    # ===== JOIN ON NORMALIZED KEYS =====
+    merged = pd.DataFrame({'key': source_keys, 'source_row': np.arange(len(source_keys))}).merge(
+        pd.DataFrame({'key': target_keys, 'target_row': np.arange(len(target_keys))}),
+        on='key', how='outer', indicator=True, validate='one_to_one'
+    )
+    both = merged['_merge'] == 'both'
+    joined = merged[both].sort_values('source_row')
+    joined_source_rows = joined['source_row'].to_numpy(dtype=np.int64)
+    joined_target_rows = joined['target_row'].to_numpy(dtype=np.int64)
+    missing_rows = np.sort(merged.loc[merged['_merge'] == 'left_only', 'source_row'].to_numpy(dtype=np.int64))
+    extra_rows = np.sort(merged.loc[merged['_merge'] == 'right_only', 'target_row'].to_numpy(dtype=np.int64))
+
+    # ===== PER-COLUMN EQUALITY MASKS =====
+    if len(source_columns):
+        not_equal = np.column_stack([
+            normalized_source[source_col].to_numpy()[joined_source_rows] != normalized_target[target_col].to_numpy()[joined_target_rows]
+            for source_col, target_col in zip(source_columns, target_columns)
+        ])
+    else:
+        not_equal = np.zeros((len(joined_source_rows), 0), dtype=bool)
+    changed_mask = not_equal.any(axis=1)
+    column_mismatch_counts = {
+        source_col: int(count) for source_col, count in zip(source_columns, not_equal.sum(axis=0)) if count
+    }
+
+    changed_source_rows = joined_source_rows[changed_mask]
+    changed_target_rows = joined_target_rows[changed_mask]
+    matched_rows = int((~changed_mask).sum())
+    changed_count = int(changed_mask.sum())
+
+    common_rows = matched_rows
+    unique_to_source_count = changed_count + len(missing_rows)
+    unique_to_target_count = changed_count + len(extra_rows)
+
+    logger.info(f"Key-based Comparison Results ({time.time() - join_start:.2f}s):")
+    logger.info(f"  • Matched rows: {matched_rows:,}")
+    logger.info(f"  • Changed rows (same key, different values): {changed_count:,}")
+    logger.info(f"  • Missing in target: {len(missing_rows):,}")
+    logger.info(f"  • Extra in target: {len(extra_rows):,}")
+    for source_col, count in list(column_mismatch_counts.items())[:10]:
+        logger.info(f"  • Column '{source_col}': {count:,} differing values")
+
+    # Keep the positions for on-demand pages (get_mismatch_details_page) - only the first page is diffed and logged now
+    register_mismatch_session(
+        session_id, source_df, target_df, source_columns, target_columns, common_cols,
+        [mismatch_segment('changed', changed_source_rows, changed_target_rows, source_keys),
+         mismatch_segment('source_only', missing_rows, None, source_keys),
+         mismatch_segment('target_only', None, extra_rows, target_keys)],
+        normalization_cache, key_columns=(source_key_columns, target_key_columns)
+    )
+    all_detailed_mismatches, mismatch_log = detail_first_mismatch_page(
+        session_id, error_logger, source_info, target_info, source_df, target_df
+    )
+
+    source_label, target_label = get_dynamic_labels(source_info, target_info)
+    if all_detailed_mismatches:
+        table_output = display_mismatch_table_cli(all_detailed_mismatches, source_label, target_label)
+        logger.info(table_output)
+
+    source_only_indices = np.sort(np.concatenate([changed_source_rows, missing_rows]))
+    target_only_indices = np.sort(np.concatenate([changed_target_rows, extra_rows]))
+
+    enhanced_mismatch_details = {
+        'summary': {
+            'common_rows': common_rows,
+            'unique_to_source': unique_to_source_count,
+            'unique_to_target': unique_to_target_count,
+            'total_mismatches': len(all_detailed_mismatches),
+            'comparison_mode': 'key_join',
+            'key_fields': [{'source_column': src, 'target_column': tgt} for src, tgt in key_pairs],
+            'matched_rows': matched_rows,
+            'changed_rows': changed_count,
+            'missing_rows': int(len(missing_rows)),
+            'extra_rows': int(len(extra_rows)),
+            'column_mismatch_counts': column_mismatch_counts,
+            'mismatch_log': mismatch_log
+        },
+        'detailed_mismatches': all_detailed_mismatches[:100],  # First 100 for immediate display
+        'total_detailed_mismatches': len(all_detailed_mismatches),
+        'pagination': {
+            'type': 'hash_summary',
+            'comparison_mode': 'key_join',
+            'common_rows': common_rows,
+            'unique_to_source': unique_to_source_count,
+            'unique_to_target': unique_to_target_count,
+            'total_source_only': int(len(source_only_indices)),
+            'total_target_only': int(len(target_only_indices)),
+        }
+    }
+
+    logger.info(f"Returning key-based mismatch structure with {len(all_detailed_mismatches)} detailed mismatches")
+    return common_rows, unique_to_source_count, unique_to_target_count, enhanced_mismatch_details
+
+# ========== NEAR-MATCH PAIRING (MODIFIED ROWS) ==========
+# Without keys a changed row is one source-only plus one target-only row. Rows that
+# differ in at most d columns agree completely on at least one of d + 1 column groups
+# (pigeonhole), so blocking on the hash of each group finds every such pair without
+# comparing all source-only rows with all target-only rows.
+
+def get_side_plans(normalization_cache):
+    """Column plans of a comparison, so subsets of rows normalize exactly as the full sides did"""
+    return {key: plan for key, plan in (normalization_cache or {}).get('plans', {}).items()
+            if key[0] in ('source', 'target')}
+
+def pair_near_matches(source_values, target_values, max_differences, max_bucket=50,
+                      source_positions=None, target_positions=None, max_bucket_pairs=1000000):
+    """
+    One-to-one pairs of rows differing in at most max_differences columns.
+    source_values / target_values: 2-D object arrays of normalized values (same column order).
+    Rows are blocked on d + 1 column groups (a near-match agrees on all columns of at least
+    one group). Buckets holding more than max_bucket rows of one side (very common group
+    values) are paired directly - every source row against every target row - while their
+    pairs fit into max_bucket_pairs; buckets beyond that budget are skipped and reported.
+    Pairs with fewer differences win, then rows whose positions are closest.
+
+    Returns (source_idx, target_idx, differences, coverage) - the arrays index the given rows;
+    coverage counts oversized buckets and the rows of skipped ones (results are exact when
+    'skipped_buckets' is 0).
+    """
+    empty = np.empty(0, dtype=np.int64)
+    coverage = {'oversized_buckets': 0, 'skipped_buckets': 0, 'skipped_source_rows': 0, 'skipped_target_rows': 0}
+    column_count = source_values.shape[1]
+    if column_count < 2 or not len(source_values) or not len(target_values):
+        return empty, empty, empty, coverage
+    max_differences = min(max(1, max_differences), column_count - 1)
+
+    # Spread the columns over d + 1 groups, most distinct columns first
+    both_sides = np.concatenate([source_values, target_values])
+    column_hashes = [hash_values(pd.Series(both_sides[:, col], dtype=object)) for col in range(column_count)]
+    order = sorted(range(column_count), key=lambda col: pd.Series(column_hashes[col]).nunique(), reverse=True)
+    groups = [order[start::max_differences + 1] for start in range(max_differences + 1)]
+
+    candidates = []
+    split = len(source_values)
+    pair_budget = max_bucket_pairs
+    skipped_source = np.zeros(split, dtype=bool)
+    skipped_target = np.zeros(len(target_values), dtype=bool)
+    for group in groups:
+        group_hashes = _combined_hashes({col: column_hashes[col] for col in group}, group)
+        source_block = pd.DataFrame({'block': group_hashes[:split], 'source': np.arange(split)})
+        target_block = pd.DataFrame({'block': group_hashes[split:], 'target': np.arange(len(target_values))})
+        sizes = pd.concat([source_block['block'].value_counts().rename('source'),
+                           target_block['block'].value_counts().rename('target')], axis=1).fillna(0)
+        # Only buckets with rows on both sides produce pairs
+        sizes = sizes[(sizes['source'] > 0) & (sizes['target'] > 0)]
+        oversized = sizes[(sizes['source'] > max_bucket) | (sizes['target'] > max_bucket)]
+        if len(oversized):
+            coverage['oversized_buckets'] += len(oversized)
+            pairs = (oversized['source'] * oversized['target']).sort_values(kind='stable')
+            affordable = pairs.cumsum() <= pair_budget
+            pair_budget -= int(pairs[affordable].sum())
+            skipped = pairs.index[~affordable.to_numpy()]
+            if len(skipped):
+                coverage['skipped_buckets'] += len(skipped)
+                skipped_source |= source_block['block'].isin(skipped).to_numpy()
+                skipped_target |= target_block['block'].isin(skipped).to_numpy()
+                source_block = source_block[~source_block['block'].isin(skipped)]
+                target_block = target_block[~target_block['block'].isin(skipped)]
+        candidates.append(source_block.merge(target_block, on='block')[['source', 'target']])
+
+    coverage['skipped_source_rows'] = int(skipped_source.sum())
+    coverage['skipped_target_rows'] = int(skipped_target.sum())
+    candidates = pd.concat(candidates).drop_duplicates()
+    if candidates.empty:
+        return empty, empty, empty, coverage
+    source_idx = candidates['source'].to_numpy(dtype=np.int64)
+    target_idx = candidates['target'].to_numpy(dtype=np.int64)
+    # Counted in slices - directly paired buckets can produce many candidates
+    differences = np.concatenate([
+        (source_values[source_idx[start:start + 200000]] != target_values[target_idx[start:start + 200000]]).sum(axis=1)
+        for start in range(0, len(source_idx), 200000)
+    ])
+    close = differences <= max_differences
+    candidates = pd.DataFrame({'source': source_idx[close], 'target': target_idx[close],
+                               'differences': differences[close]})
+    if source_positions is not None and target_positions is not None:
+        candidates['distance'] = np.abs(np.asarray(source_positions)[candidates['source']] -
+                                        np.asarray(target_positions)[candidates['target']])
+    else:
+        candidates['distance'] = 0
+    candidates = candidates.sort_values(['differences', 'distance', 'source', 'target'])
+
+    # Greedy one-to-one: accept mutual best candidates, drop their rows, repeat
+    pairs = []
+    while not candidates.empty:
+        best = candidates.drop_duplicates('source').drop_duplicates('target')
+        pairs.append(best)
+        candidates = candidates[~candidates['source'].isin(best['source']) &
+                                ~candidates['target'].isin(best['target'])]
+    pairs = pd.concat(pairs).sort_values('source')
+    return (pairs['source'].to_numpy(dtype=np.int64), pairs['target'].to_numpy(dtype=np.int64),
+            pairs['differences'].to_numpy(dtype=np.int64), coverage)
+
+def find_modified_rows(source_df, target_df, source_columns, target_columns, source_rows, target_rows,
+                       normalization_cache=None, normalized_source=None, normalized_target=None):
+    """
+    Pair source-only and target-only rows (positions) that differ in only a few columns.
+    normalized_source / normalized_target: the frames normalized for hashing - reused when
+    given, otherwise only the candidate rows are normalized.
+    Returns (modified_source_rows, modified_target_rows, stats).
+    """
+    start_time = time.time()
+    stats = {'modified_rows': 0, 'candidates_source': int(len(source_rows)), 'candidates_target': int(len(target_rows))}
+    empty = np.empty(0, dtype=np.int64)
+    max_rows = COMPARISON_SETTINGS.get('near_match_max_rows', 200000)
+    if not COMPARISON_SETTINGS.get('near_match_pairing', True) or not len(source_rows) or not len(target_rows):
+        return empty, empty, stats
+    if len(source_rows) > max_rows or len(target_rows) > max_rows:
+        logger.info(f"Near-match pairing skipped: more than {max_rows:,} unmatched rows on one side")
+        stats['skipped'] = 'too_many_rows'
+        return empty, empty, stats
+
+    plans = get_side_plans(normalization_cache)
+    if normalized_source is not None:
+        source_values = normalized_source[source_columns].iloc[source_rows].to_numpy(dtype=object)
+    else:
+        source_values = normalize_columns(source_df.iloc[source_rows], source_columns, {'plans': dict(plans)},
+                                          'source', store_columns=False)[source_columns].to_numpy(dtype=object)
+    if normalized_target is not None:
+        target_values = normalized_target[target_columns].iloc[target_rows].to_numpy(dtype=object)
+    else:
+        target_values = normalize_columns(target_df.iloc[target_rows], target_columns, {'plans': dict(plans)},
+                                          'target', store_columns=False)[target_columns].to_numpy(dtype=object)
+    min_similarity = COMPARISON_SETTINGS.get('near_match_min_similarity', 0.6)
+    max_differences = len(source_columns) - int(np.ceil(min_similarity * len(source_columns)))
+    source_idx, target_idx, differences, coverage = pair_near_matches(
+        source_values, target_values, max_differences, COMPARISON_SETTINGS.get('near_match_max_bucket', 50),
+        source_rows, target_rows, COMPARISON_SETTINGS.get('near_match_max_bucket_pairs', 1000000)
+    )
+
+    stats.update({
+        'modified_rows': int(len(source_idx)),
+        'max_differences': int(max_differences),
+        'differences_histogram': {int(count): int(rows) for count, rows in zip(*np.unique(differences, return_counts=True))},
+        'exact': coverage['skipped_buckets'] == 0,
+        'coverage': coverage,
+        'seconds': round(time.time() - start_time, 3)
+    })
+    if coverage['skipped_buckets']:
+        logger.warning(f"⚠️ Near-match pairing is approximate: {coverage['skipped_buckets']:,} oversized buckets exceeded "
+                       f"the pair budget - {coverage['skipped_source_rows']:,} source / {coverage['skipped_target_rows']:,} "
+                       f"target rows may be reported as missing / extra instead of modified")
+    logger.info(f"🔗 Near-match pairing: {len(source_idx):,} modified rows (≤ {max_differences} differing columns) "
+                f"in {stats['seconds']:.2f}s")
+    return np.asarray(source_rows)[source_idx], np.asarray(target_rows)[target_idx], stats
+
+# ========== ON-DEMAND MISMATCH DETAILS ==========
+# A comparison registers the positions of its mismatched rows and diffs only the first
+# page right away; any other page is diffed when it is requested, and the last pages of
+# every session are kept in a small LRU. Sessions hold no full frames: each side keeps either just the
+# mismatched rows (at most mismatch_session_rows of them) or the descriptor of its CSV /
+# .xlsx / database source, from which the rows of a page are streamed again.
+
+mismatch_sessions = OrderedDict()
+
+def mismatch_segment(row_type, source_positions=None, target_positions=None, row_hashes=None):
+    """
+    Mismatched rows of one type for a session: aligned source / target positions
+    (None or -1 = no row on that side). row_hashes: full-length hashes of the side the
+    row is reported for (target for 'target_only'), shown as hash_value.
+    """
+    count = len(source_positions if source_positions is not None else target_positions)
+    no_rows = np.full(count, -1, dtype=np.int64)
+    source = np.asarray(source_positions, dtype=np.int64) if source_positions is not None else no_rows
+    target = np.asarray(target_positions, dtype=np.int64) if target_positions is not None else no_rows
+    hashes = None
+    if row_hashes is not None:
+        hashes = np.asarray(row_hashes, dtype=np.uint64)[target if row_type == 'target_only' else source]
+    return {'row_type': row_type, 'source': source, 'target': target, 'hashes': hashes}
+
+def positional_partners(positions, other_rows):
+    """Row at the same position on the other side (-1 past its end) - shown next to a source- / target-only row"""
+    positions = np.asarray(positions, dtype=np.int64)
+    return np.where(positions < other_rows, positions, -1)
+
+def slice_mismatch_jobs(segments, start_index, end_index):
+    """Jobs (row_type, source_position, target_position, row_hash) of rows start_index..end_index of the segments"""
+    jobs = []
+    offset = 0
+    for segment in segments:
+        count = len(segment['source'])
+        low, high = max(start_index - offset, 0), min(end_index - offset, count)
+        if low < high:
+            hashes = segment['hashes'][low:high].tolist() if segment['hashes'] is not None else [None] * (high - low)
+            jobs += [(segment['row_type'], src, tgt, row_hash) for src, tgt, row_hash in
+                     zip(segment['source'][low:high].tolist(), segment['target'][low:high].tolist(), hashes)]
+        offset += count
+    return jobs
+
+def build_mismatch_details(jobs, source_rows, target_rows, source_columns, target_columns, common_cols,
+                           plans=None, key_columns=None):
+    """
+    Detailed diffs for jobs [(row_type, source_position, target_position, row_hash), ...]
+    (-1 = no row on that side). source_rows / target_rows hold the rows of the jobs that
+    have one on that side, in job order. Only these rows are normalized, with the column
+    plans of the comparison so values normalize exactly as they did for hashing.
+    key_columns: (source key columns, target key columns) reported as key_values.
+    """
+    if not jobs:
+        return []
+    page_cache = {'plans': dict(plans or {})}
+    normalized_source = normalize_columns(source_rows, source_columns, page_cache, 'source', store_columns=False)
+    normalized_target = normalize_columns(target_rows, target_columns, page_cache, 'target', store_columns=False)
+
+    details = []
+    empty_row = pd.Series(dtype=object)
+    source_offset = target_offset = 0
+    for row_type, source_row, target_row, row_hash in jobs:
+        source_idx = source_offset if source_row >= 0 else None
+        target_idx = target_offset if target_row >= 0 else None
+        source_offset += source_row >= 0
+        target_offset += target_row >= 0
+        row_idx = target_row if row_type == 'target_only' else source_row
+        try:
+            comparison_result = compare_rows_detailed(
+                source_rows.iloc[source_idx] if source_idx is not None else empty_row,
+                target_rows.iloc[target_idx] if target_idx is not None else empty_row,
+                source_columns,
+                target_columns,
+                common_cols,
+                normalized_source=normalized_source if source_idx is not None else None,
+                normalized_target=normalized_target if target_idx is not None else None,
+                row_idx=source_idx,
+                target_row_idx=target_idx
+            )
+            comparison_result['row_index'] = row_idx
+            comparison_result['excel_row'] = row_idx + 2
+            comparison_result['row_type'] = row_type
+            if row_type in ('modified', 'changed'):
+                comparison_result['target_row_index'] = target_row
+                comparison_result['target_excel_row'] = target_row + 2
+            if key_columns:
+                key_row = source_rows.iloc[source_idx] if source_idx is not None else target_rows.iloc[target_idx]
+                comparison_result['key_values'] = {col: str(key_row[col]) for col in key_columns[0 if source_idx is not None else 1]}
+            if row_hash is not None:
+                comparison_result['hash_value'] = format_row_hash(row_hash)[:8]  # First 8 chars for reference
+            details.append(comparison_result)
+        except Exception as e:
+            logger.warning(f"Error processing {row_type} row {row_idx}: {e}")
+    return details
+
+def detail_loaded_rows(jobs, source_df, target_df, source_columns, target_columns, common_cols,
+                       plans=None, key_columns=None):
+    """build_mismatch_details for jobs whose rows are all part of the loaded frames"""
+    return build_mismatch_details(
+        jobs,
+        source_df.iloc[[src for _, src, _, _ in jobs if src >= 0]],
+        target_df.iloc[[tgt for _, _, tgt, _ in jobs if tgt >= 0]],
+        source_columns, target_columns, common_cols, plans, key_columns
+    )
+
+def is_rereadable_source(descriptor):
+    """Whether the rows of a loaded input can be streamed again from its CSV / .xlsx file or table"""
+    if not descriptor or descriptor.get('schema_only'):
+        return False
+    if descriptor.get('type') == 'database':
+        return bool(descriptor.get('config'))
+    path = descriptor.get('path')
+    if descriptor.get('type') not in ('csv', 'excel') or not isinstance(path, str) or not os.path.isfile(path):
+        return False
+    if descriptor['type'] == 'excel':
+        from dq_unified import LargeDatasetHandler
+        return LargeDatasetHandler.is_streamable_excel(path)
+    return True
+
+def _source_signature(descriptor):
+    """(size, mtime) of a file input - pages are not read from a file changed since the comparison"""
+    if descriptor.get('type') == 'database':
+        return None
+    stat = os.stat(descriptor['path'])
+    return (stat.st_size, stat.st_mtime_ns)
+
+def read_rows_at_positions(descriptor, positions, columns, chunk_size=None):
+    """
+    Stream a re-readable input (see is_rereadable_source) up to the last wanted row and
+    return the rows at `positions`, in that order, with a positional index.
+    """
+    positions = np.asarray(positions, dtype=np.int64)
+    wanted = np.unique(positions)
+    if not len(wanted):
+        return pd.DataFrame(columns=columns)
+    chunk_size = chunk_size or COMPARISON_SETTINGS.get('spill_chunk_size', 200000)
+    if descriptor['type'] == 'database':
+        chunks = _iter_database_chunks(descriptor['config'], chunk_size, columns)
+    else:
+        chunks = iter_data_chunks(descriptor['type'], descriptor['path'], chunk_size=chunk_size,
+                                  columns=columns, sheet_name=descriptor.get('sheet_name'))
+    parts = []
+    offset = 0
+    try:
+        for chunk in chunks:
+            in_chunk = wanted[(wanted >= offset) & (wanted < offset + len(chunk))]
+            if len(in_chunk):
+                parts.append(chunk.iloc[in_chunk - offset])
+            offset += len(chunk)
+            if offset > wanted[-1]:
+                break
+    finally:
+        chunks.close()
+
+    rows = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=columns)
+    if len(rows) < len(wanted):
+        raise ValueError(f"input has {offset:,} rows, row {int(wanted[-1]):,} was compared")
+    return rows.iloc[np.searchsorted(wanted, positions)].reset_index(drop=True)
+
+def frame_session_side(rows, positions):
+    """Session side holding `rows` - the rows at the sorted, unique `positions`"""
+    return {'frame': rows.reset_index(drop=True), 'positions': np.asarray(positions, dtype=np.int64)}
+
+def build_session_side(df, positions, columns):
+    """
+    How a session reads rows of one side again: the rows at `positions` copied out of the
+    loaded frame while they are part of it and number at most mismatch_session_rows,
+    otherwise the source descriptor. None when neither is possible.
+    """
+    positions = np.unique(np.asarray(positions, dtype=np.int64))
+    positions = positions[positions >= 0]
+    in_frame = not len(positions) or positions[-1] < len(df)
+    if in_frame and len(positions) <= COMPARISON_SETTINGS.get('mismatch_session_rows', 50000):
+        return frame_session_side(df[columns].iloc[positions], positions)
+    descriptor = get_comparison_source_descriptor(df)
+    if not is_rereadable_source(descriptor):
+        return None
+    # Re-read rows get the dtypes of the loaded frame (loaders downcast), so they normalize as compared
+    return {'descriptor': dict(descriptor), 'signature': _source_signature(descriptor), 'columns': list(columns),
+            'dtypes': df[columns].dtypes.to_dict()}
+
+def read_session_rows(side, positions):
+    """Rows at `positions` of a session side, in that order, with a positional index"""
+    if 'frame' in side:
+        return side['frame'].iloc[np.searchsorted(side['positions'], positions)].reset_index(drop=True)
+    descriptor = side['descriptor']
+    if side['signature'] is not None and _source_signature(descriptor) != side['signature']:
+        raise ValueError(f"{os.path.basename(descriptor['path'])} changed since the comparison")
+    rows = read_rows_at_positions(descriptor, positions, side['columns'])
+    for col, dtype in side['dtypes'].items():
+        if col in rows.columns and rows[col].dtype != dtype:
+            try:
+                rows[col] = rows[col].astype(dtype)
+            except (ValueError, TypeError):
+                pass
+    return rows
+
+def _truncate_segments(segments, source_limit, target_limit, max_rows):
+    """Keep the first max_rows mismatches whose rows lie below source_limit / target_limit"""
+    kept = []
+    for segment in segments:
+        mask = (segment['source'] < source_limit) & (segment['target'] < target_limit)
+        rows = np.flatnonzero(mask)[:max(0, max_rows)]
+        max_rows -= len(rows)
+        kept.append({
+            'row_type': segment['row_type'],
+            'source': segment['source'][rows],
+            'target': segment['target'][rows],
+            'hashes': segment['hashes'][rows] if segment['hashes'] is not None else None
+        })
+    return kept
+
+def register_mismatch_session(session_id, source_df, target_df, source_columns, target_columns, common_cols,
+                              segments, normalization_cache=None, key_columns=None,
+                              source_side=None, target_side=None, total_mismatches=None):
+    """
+    Keep what is needed to diff any page of a comparison's mismatches later (oldest sessions
+    are dropped). segments: mismatch_segment(...) list in page order. Sides default to
+    build_session_side of the loaded frames; when a side can neither hold its rows nor read
+    them again, only the mismatches within the first mismatch_session_rows loaded rows are kept.
+    total_mismatches: all mismatches found, when the segments hold a sample of them.
+    """
+    source_key_columns, target_key_columns = key_columns or ([], [])
+    source_read_columns = list(dict.fromkeys(list(source_columns) + list(source_key_columns)))
+    target_read_columns = list(dict.fromkeys(list(target_columns) + list(target_key_columns)))
+    session_rows = sum(len(segment['source']) for segment in segments)
+
+    if source_side is None:
+        source_side = build_session_side(source_df, np.concatenate([s['source'] for s in segments]), source_read_columns)
+    if target_side is None:
+        target_side = build_session_side(target_df, np.concatenate([s['target'] for s in segments]), target_read_columns)
+    if source_side is None or target_side is None:
+        segments = _truncate_segments(
+            segments,
+            len(source_df) if source_side is None else np.iinfo(np.int64).max,
+            len(target_df) if target_side is None else np.iinfo(np.int64).max,
+            COMPARISON_SETTINGS.get('mismatch_session_rows', 50000)
+        )
+        kept_rows = sum(len(segment['source']) for segment in segments)
+        logger.warning(f"⚠️ Input cannot be read again - mismatch pages of {session_id} cover "
+                       f"{kept_rows:,} of {session_rows:,} rows")
+        if source_side is None:
+            source_side = build_session_side(source_df, np.concatenate([s['source'] for s in segments]), source_read_columns)
+        if target_side is None:
+            target_side = build_session_side(target_df, np.concatenate([s['target'] for s in segments]), target_read_columns)
+
+    mismatch_sessions[session_id] = {
+        'source': source_side,
+        'target': target_side,
+        'source_columns': list(source_columns),
+        'target_columns': list(target_columns),
+        'common_cols': common_cols,
+        'key_columns': key_columns,
+        'segments': segments,
+        'total_mismatches': total_mismatches if total_mismatches is not None else session_rows,
+        'plans': get_side_plans(normalization_cache),
+        'pages': OrderedDict(),
+        'timestamp': datetime.now().isoformat()
+    }
+    mismatch_sessions.move_to_end(session_id)
+    while len(mismatch_sessions) > max(1, COMPARISON_SETTINGS.get('mismatch_sessions', 10)):
+        mismatch_sessions.popitem(last=False)
+
+def get_mismatch_details_page(session_id, page=1, page_size=50):
+    """
+    One page of detailed mismatches of a registered session, in segment order (modified /
+    changed rows first, then source-only, then target-only rows).
+    Returns None when the session is not (or no longer) held or its rows cannot be read
+    again - callers fall back to the mismatch log.
+    """
+    session = mismatch_sessions.get(session_id)
+    if session is None:
+        return None
+    mismatch_sessions.move_to_end(session_id)
+
+    total_rows = sum(len(segment['source']) for segment in session['segments'])
+    page_size = max(1, int(page_size))
+    total_pages = max(1, (total_rows + page_size - 1) // page_size)
+    page = max(1, min(int(page), total_pages))
+    start_index = (page - 1) * page_size
+    end_index = min(start_index + page_size, total_rows)
+
+    pages = session['pages']
+    cache_key = (start_index, end_index)
+    if cache_key in pages:
+        pages.move_to_end(cache_key)
+    else:
+        jobs = slice_mismatch_jobs(session['segments'], start_index, end_index)
+        try:
+            source_rows = read_session_rows(session['source'], [src for _, src, _, _ in jobs if src >= 0])
+            target_rows = read_session_rows(session['target'], [tgt for _, _, tgt, _ in jobs if tgt >= 0])
+        except Exception as e:
+            logger.warning(f"⚠️ Rows of comparison {session_id} cannot be read again ({e}) - session dropped")
+            mismatch_sessions.pop(session_id, None)
+            return None
+        pages[cache_key] = build_mismatch_details(
+            jobs, source_rows, target_rows, session['source_columns'], session['target_columns'],
+            session['common_cols'], session['plans'], session['key_columns']
+        )
+        while len(pages) > max(1, COMPARISON_SETTINGS.get('mismatch_page_cache', 8)):
+            pages.popitem(last=False)
+
+    return {
+        'mismatches': pages[cache_key],
+        'page': page,
+        'page_size': page_size,
+        'total_pages': total_pages,
+        'total_rows': total_rows,
+        'total_mismatches': session['total_mismatches'],
+        'start_index': start_index,
+        'end_index': end_index
+    }
+
+def detail_first_mismatch_page(session_id, error_logger, source_info, target_info, source_df=None, target_df=None):
+    """
+    Diff and log the first page (mismatch_page_size rows) of a registered session while the
+    comparison runs - every later page is diffed when it is requested. With the loaded
+    source_df / target_df (holding every compared row) the page is diffed from them and
+    cached for the session, otherwise it is read like any other page.
+    Returns (detailed mismatches, mismatch log write statistics).
+    """
+    page_size = max(1, int(COMPARISON_SETTINGS.get('mismatch_page_size', 100)))
+    session = mismatch_sessions.get(session_id)
+    details = []
+    if session is not None and source_df is not None:
+        jobs = slice_mismatch_jobs(session['segments'], 0, page_size)
+        details = detail_loaded_rows(jobs, source_df, target_df, session['source_columns'], session['target_columns'],
+                                     session['common_cols'], session['plans'], session['key_columns'])
+        session['pages'][(0, len(jobs))] = details
+    elif session is not None:
+        page = get_mismatch_details_page(session_id, 1, page_size)
+        details = page['mismatches'] if page else []
+
+    mismatch_writer = error_logger.create_mismatch_writer(session_id, source_info, target_info)
+    for comparison_result in details:
+        mismatch_writer.add(comparison_result)
+    return details, mismatch_writer.close()
+
+def advanced_data_comparison(source_df, target_df, selected_columns, common_cols, error_logger, session_id, source_info, target_info, source_file, target_file,
+                             normalization_cache=None, key_pairs=None, incremental=False, watermark_column=None):
+    """
+    SECOND CHECK: Hash-based comparison with PERFECT NORMALIZATION - FIXED FOR DUPLICATES
+    When key_pairs [(source_col, target_col), ...] are given and unique, rows are
+    reconciled by key join instead (see key_join_comparison).
+    incremental=True reuses the persisted row hashes of unchanged data (hash matching only).
+    """
     logger.info("SECOND CHECK: HASH-BASED COMPARISON WITH PERFECT NORMALIZATION")
-    
-    logged_rows = set()
 
     import traceback
     current_stack = traceback.format_stack()
@@ -2648,20 +4920,6 @@ def advanced_data_comparison(source_df, target_df, selected_columns, common_cols
     source_label, target_label = get_dynamic_labels(source_info, target_info)
     
     total_rows = len(source_df) + len(target_df)
-    processed_rows = 0
-    last_progress_log = 0
-    
-    def log_progress(processed, total, operation="Processing"):
-        """Log progress every 10% or 50,000 rows"""
-        nonlocal last_progress_log
-        progress_pct = (processed / total) * 100 if total > 0 else 0
-        
-        # Log every 10% progress or every 50,000 rows
-        if progress_pct - last_progress_log >= 10 or (processed % 50000 == 0 and processed > 0):
-            logger.info(f"   {operation}: {progress_pct:.1f}% complete ({processed:,}/{total:,} rows)")
-            last_progress_log = progress_pct
-        
-        return last_progress_log
     
     logger.info(f"Starting comparison of {total_rows:,} total rows...")
     
@@ -2706,95 +4964,94 @@ def advanced_data_comparison(source_df, target_df, selected_columns, common_cols
     logger.info(f"Source columns: {common_source_columns}")
     logger.info(f"Target columns: {common_target_columns}")
     
-    def create_row_hash(row, columns, dataset_type="source"):
-        """Create hash from PERFECTLY normalized row values - ADD MORE DEBUG"""
-        
-        normalized_values = []
-        
-        # DEBUG: Track what we're hashing
-        debug_info = []
-        
-        for i, col in enumerate(columns):
-            try:
-                value = row[col]
-                target_col_name = common_target_columns[i] if dataset_type == "target" else col
-                
-                norm_val = smart_normalize_value(value, target_col_name)
-                normalized_values.append(str(norm_val))
-                
-                # DEBUG: Log first row details
-                if dataset_type == "source" and i < 5:  # First 5 columns of first row
-                    debug_info.append(f"{col}: '{value}' -> '{norm_val}'")
-                    
-            except Exception as e:
-                logger.warning(f"Error normalizing value for column {col}: {e}")
-                normalized_values.append("NULL")
+    # ===== COLUMNAR HASHING: normalize whole columns, then 64-bit row hashes =====
+    hash_start = time.time()
+
+    sides = (('source', source_df, common_source_columns), ('target', target_df, common_target_columns))
+
+    # Repeated runs: rebuild row hashes from the snapshot of the last run, rehashing only changed chunks
+    snapshot_states = {}
+    snapshot_hashes = {}
+    incremental_stats = {}
+    if incremental and not key_pairs:
+        if normalization_cache is None:
+            normalization_cache = {}
+        for side, df, side_columns in sides:
+            state = prepare_hash_snapshot(df, side_columns, watermark_column)
+            if state is None:
+                continue
+            snapshot_states[side] = state
+            reused = reuse_snapshot_hashes(df, side_columns, normalization_cache, side, state)
+            if reused is not None:
+                snapshot_hashes[side], incremental_stats[side] = reused
+
+    # Large frames: normalize + hash row chunks in a process pool (fills the normalization cache)
+    parallel_hashes = {}
+    workers = get_comparison_worker_count()
+    if should_parallelize(max(len(source_df), len(target_df)), workers):
+        if normalization_cache is None:
+            normalization_cache = {}
+        for side, df, side_columns in sides:
+            if side in snapshot_hashes:
+                continue
+            parallel_result = parallel_normalize_and_hash(df, side_columns, normalization_cache, side, workers)
+            if parallel_result is not None:
+                parallel_hashes[side] = parallel_result[0]
+
+    # Sides rebuilt from a snapshot are not normalized - detailed diffs normalize their few rows on the fly
+    normalized_source = None
+    normalized_target = None
+    if 'source' not in snapshot_hashes:
+        logger.info(f"Normalizing source data ({len(source_df):,} rows, {len(common_source_columns)} columns)...")
+        normalized_source = normalize_columns(source_df, common_source_columns, normalization_cache, 'source')
+    if 'target' not in snapshot_hashes:
+        logger.info(f"Normalizing target data ({len(target_df):,} rows, {len(common_target_columns)} columns)...")
+        normalized_target = normalize_columns(target_df, common_target_columns, normalization_cache, 'target')
+
+    # ===== KEYED DATA: reconcile by key join instead of hash + positional pairing =====
+    if key_pairs:
+        key_result = key_join_comparison(
+            source_df, target_df, normalized_source, normalized_target,
+            common_source_columns, common_target_columns, key_pairs, common_cols,
+            error_logger, session_id, source_info, target_info, normalization_cache
+        )
+        if key_result is not None:
+            return key_result
+
+    logger.info("Generating 64-bit row hashes...")
+    row_hashes = {}
+    for side, normalized in (('source', normalized_source), ('target', normalized_target)):
+        if side in snapshot_hashes:
+            row_hashes[side] = snapshot_hashes[side]
+        elif side in parallel_hashes:
+            row_hashes[side] = parallel_hashes[side]
+        else:
+            row_hashes[side] = compute_row_hashes(normalized)
+    source_row_hashes, target_row_hashes = row_hashes['source'], row_hashes['target']
+    logger.info(f"   Hashing completed in {time.time() - hash_start:.2f}s")
+
+    for side, df, side_columns in sides:
+        if side not in snapshot_states:
+            continue
+        incremental_stats.setdefault(side, {'rows_rehashed': len(df), 'rows_reused': 0, 'snapshot': 'created'})
+        store_hash_snapshot(df, row_hashes[side], normalization_cache, side, snapshot_states[side])
+        # Lets the duplicate analysis count on hashes instead of normalizing a reused side again
+        normalization_cache.setdefault('row_hashes', {})[side] = (list(side_columns), row_hashes[side])
+    incremental_summary = None
+    if incremental_stats:
+        incremental_summary = {
+            'rows_rehashed': sum(stats['rows_rehashed'] for stats in incremental_stats.values()),
+            'rows_reused': sum(stats['rows_reused'] for stats in incremental_stats.values()),
+            'sides': incremental_stats
+        }
+        logger.info(f"   Incremental: {incremental_summary['rows_rehashed']:,} rows rehashed, "
+                    f"{incremental_summary['rows_reused']:,} rows reused")
 
-        row_string = '|'.join(normalized_values)
-        hash_result = hashlib.md5(row_string.encode('utf-8')).hexdigest()
-        
-        
-        return hash_result
-    
-    # Generate hashes for source - TRACK ALL ROWS, NOT JUST UNIQUE
-    source_hashes = {}
-    source_row_hashes = {}
-    logger.info(f"Generating hashes for source data ({len(source_df)} rows)...")
-    
-    for idx, row in source_df.iterrows():
-        try:
-            processed_rows += 1
-            log_progress(processed_rows, total_rows, "Hashing source data")
-            row_hash = create_row_hash(row, common_source_columns, "source")
-            source_row_hashes[idx] = row_hash
-            
-            # Track count of each hash
-            if row_hash in source_hashes:
-                source_hashes[row_hash]['count'] += 1
-                source_hashes[row_hash]['rows'].append(idx)
-            else:
-                source_hashes[row_hash] = {
-                    'count': 1,
-                    'rows': [idx],
-                    'sample_row': idx
-                }
-                
-        except Exception as e:
-            logger.warning(f"Error hashing source row {idx}: {e}")
-    
     # DEBUG: Show sample hashes
     logger.info("=== DEBUG: SAMPLE HASHES ===")
-    hash_samples = list(source_hashes.keys())[:3]  # First 3 unique hashes
-    for i, hash_val in enumerate(hash_samples):
-        sample_idx = source_hashes[hash_val]['sample_row']
-        logger.info(f"Hash {i+1}: {hash_val[:16]}... (sample row {sample_idx})")
-    
-    # Generate hashes for target - TRACK ALL ROWS
-    target_hashes = {}
-    target_row_hashes = {}
-    logger.info(f"Generating hashes for target data ({len(target_df)} rows)...")
-    
-    for idx, row in target_df.iterrows():
-        try:
-            processed_rows += 1
-            log_progress(processed_rows, total_rows, "Hashing target data")
-            row_hash = create_row_hash(row, common_target_columns, "target")
-            target_row_hashes[idx] = row_hash
-            
-            # Track count of each hash
-            if row_hash in target_hashes:
-                target_hashes[row_hash]['count'] += 1
-                target_hashes[row_hash]['rows'].append(idx)
-            else:
-                target_hashes[row_hash] = {
-                    'count': 1,
-                    'rows': [idx],
-                    'sample_row': idx
-                }
-                
-        except Exception as e:
-            logger.warning(f"Error hashing target row {idx}: {e}")
-    
+    for i in range(min(3, len(source_row_hashes))):
+        logger.info(f"Hash {i+1}: {format_row_hash(source_row_hashes[i])}... (sample row {i})")
+
     # ===== FIX 3: ENHANCED DEBUG - COMPARE SAMPLE ROWS =====
     logger.info("\n" + "="*70)
     logger.info("🔍 DEBUG: ANALYZING WHY HASHES DON'T MATCH")
@@ -2891,22 +5148,27 @@ def advanced_data_comparison(source_df, target_df, selected_columns, common_cols
     logger.info("PERFORMING DETAILED ROW-LEVEL COMPARISON WITH PAGINATION...")
 
     start_time = time.time()
-    processed_count = 0
+
+    # Match hashes (duplicate aware) with numpy set operations
+    hash_match = match_row_hashes(source_row_hashes, target_row_hashes)
+
+    # Rows without a partner (surplus duplicates: first N rows of the hash)
+    all_missing_rows = np.flatnonzero(hash_match['source_only_mask'])
+    all_extra_rows = np.flatnonzero(hash_match['target_only_mask'])
+
+    # Changed rows: pair source-only and target-only rows that differ in only a few columns
+    modified_source_rows, modified_target_rows, near_match_stats = find_modified_rows(
+        source_df, target_df, common_source_columns, common_target_columns,
+        all_missing_rows, all_extra_rows, normalization_cache, normalized_source, normalized_target
+    )
+    all_missing_rows = np.setdiff1d(all_missing_rows, modified_source_rows, assume_unique=True)
+    all_extra_rows = np.setdiff1d(all_extra_rows, modified_target_rows, assume_unique=True)
 
     # Count how many mismatches we have
-    total_mismatches = 0
-    for hash_val, info in source_hashes.items():
-        if hash_val not in target_hashes:
-            total_mismatches += len(info['rows'])
-    for hash_val, info in target_hashes.items():
-        if hash_val not in source_hashes:
-            total_mismatches += len(info['rows'])
+    total_mismatches = len(modified_source_rows) + len(all_missing_rows) + len(all_extra_rows)
 
     logger.info(f"Found {total_mismatches:,} total mismatches")
 
-    # Set a reasonable limit (adjust as needed)
-    MAX_PROCESS = min(total_mismatches, 5000)  # Process max 5000 rows
-    logger.info(f"Will process detailed comparisons for first {MAX_PROCESS:,} rows")
 
     # Helper functions
     def get_row_summary(df, row_idx, columns, dataset_label, max_cols=3):
@@ -2991,331 +5253,992 @@ def advanced_data_comparison(source_df, target_df, selected_columns, common_cols
     # Get target column names
     target_columns = [get_target_column_name(col, common_cols) for col in selected_columns]
         
-    # Find matches considering duplicates
-    source_hash_set = set(source_hashes.keys())
-    target_hash_set = set(target_hashes.keys())
-    common_hashes = source_hash_set.intersection(target_hash_set)
-    
-    # Calculate actual matches considering duplicates
-    common_rows = 0
-    for hash_val in common_hashes:
-        source_count = source_hashes[hash_val]['count']
-        target_count = target_hashes[hash_val]['count']
-        common_rows += min(source_count, target_count)  # Only count matching pairs
-    
+    # Actual matches considering duplicates (only matching pairs count)
+    common_rows = hash_match['common_rows']
+
         # ===== NEW: PROCESS MISMATCHES WITH DETAILED COMPARISON =====
-    all_detailed_mismatches = []  # Store for UI response
-    mismatch_counter = 0
+    # Page order: modified rows, then source-only and target-only rows (next to the row at the same position)
+    mismatch_segments = [
+        mismatch_segment('modified', modified_source_rows, modified_target_rows, source_row_hashes),
+        mismatch_segment('source_only', all_missing_rows, positional_partners(all_missing_rows, len(target_df)), source_row_hashes),
+        mismatch_segment('target_only', positional_partners(all_extra_rows, len(source_df)), all_extra_rows, target_row_hashes)
+    ]
+    # Keep the positions for on-demand pages (get_mismatch_details_page) - only the first page is diffed and logged now
+    register_mismatch_session(
+        session_id, source_df, target_df, common_source_columns, common_target_columns, common_cols,
+        mismatch_segments, normalization_cache
+    )
+    all_detailed_mismatches, mismatch_log = detail_first_mismatch_page(
+        session_id, error_logger, source_info, target_info, source_df, target_df
+    )
+    mismatch_counter = total_mismatches
     cli_display_limit = 10  # Show first 10 in CLI
+    logger.info(f"Detailed {len(all_detailed_mismatches):,} of {total_mismatches:,} mismatched rows "
+                f"in {time.time() - start_time:.2f}s (other pages on request)")
 
-    # Process source-only rows (hash in source but not in target)
-    for hash_val, source_hash_info in source_hashes.items():
-        if hash_val not in target_hashes:
-            # ALL rows with this hash are mismatched
-            for row_idx in source_hash_info['rows']:
-                if processed_count >= MAX_PROCESS:
-                    break
-                processed_count += 1
-                if processed_count % 500 == 0:
-                    elapsed = time.time() - start_time
-                    logger.info(f"Progress: {processed_count:,}/{MAX_PROCESS:,} rows ({elapsed:.1f}s)")
-                if row_idx in logged_rows:
-                    logger.debug(f"Row {row_idx} already logged, skipping duplicate")
-                    continue
-                try:
-                    mismatch_counter += 1
-                    
-                    # Get row data
-                    source_row = source_df.iloc[row_idx]
-                    
-                    # Try to find corresponding target row (same position)
-                    target_row = None
-                    if row_idx < len(target_df):
-                        target_row = target_df.iloc[row_idx]
-                    
-                    # Perform detailed column comparison
-                    comparison_result = compare_rows_detailed(
-                        source_row, 
-                        target_row if target_row is not None else pd.Series(),
-                        common_source_columns,  # Use common columns only
-                        common_target_columns,
-                        common_cols
-                    )
-                    
-                    # Add metadata to comparison result
-                    comparison_result['row_index'] = row_idx
-                    comparison_result['excel_row'] = row_idx + 2
-                    comparison_result['row_type'] = 'source_only'
-                    comparison_result['hash_value'] = hash_val[:8]  # First 8 chars for reference
-                    
-                    # Log to database IMMEDIATELY
-                    error_logger.log_comparison_mismatch_immediate(
-                        session_id=session_id,
-                        mismatch_data=comparison_result,
-                        source_name=source_info,
-                        target_name=target_info
-                    )
-                    
-                    # Store for UI response (limit to reasonable amount)
-                    if len(all_detailed_mismatches) < 5000:  # Keep first 1000 for immediate UI response
-                        all_detailed_mismatches.append(comparison_result)
-                    
-                    logged_rows.add(row_idx)
-                        
-                    # # Format source data for display
-                    # source_display = format_row_data_for_display(source_row, common_source_columns)
-                    # logger.info(f"SOURCE DATA: {source_display}")
-                    
-                    # # Format target data for display
-                    # if target_row is not None:
-                    #     target_display = format_row_data_for_display(target_row, common_target_columns)
-                    #     logger.info(f"TARGET DATA: {target_display}")
-                    # else:
-                    #     logger.info(f"TARGET DATA: ROW NOT FOUND (position {row_idx + 2})")
-                    
-                    # # Show specific differences
-                    # if comparison_result['differences']:
-                    #     logger.info(f"SPECIFIC DIFFERENCES:")
-                    #     for diff in comparison_result['differences'][:5]:  # First 5 differences
-                    #         logger.info(f"  • {diff['column']}: '{diff['source']}' ≠ '{diff['target']}'")
-                    #     if len(comparison_result['differences']) > 5:
-                    #         logger.info(f"  • ... and {len(comparison_result['differences']) - 5} more differences")
-                
-                except Exception as e:
-                    logger.warning(f"Error processing mismatch row {row_idx}: {e}")
-
-    # Process target-only rows (hash in target but not in source)
-    for hash_val, target_hash_info in target_hashes.items():
-        if hash_val not in source_hashes:
-            for row_idx in target_hash_info['rows']:
-                if processed_count >= MAX_PROCESS:
-                    break
-                processed_count += 1
-                if processed_count % 500 == 0:
-                    elapsed = time.time() - start_time
-                    logger.info(f"Progress: {processed_count:,}/{MAX_PROCESS:,} rows ({elapsed:.1f}s)")
-                if row_idx in logged_rows:
-                    logger.debug(f"Row {row_idx} already logged, skipping duplicate")
-                    continue
-                try:
-                    mismatch_counter += 1
-                    
-                    # Get row data
-                    target_row = target_df.iloc[row_idx]
-                    
-                    # Try to find corresponding source row
-                    source_row = None
-                    if row_idx < len(source_df):
-                        source_row = source_df.iloc[row_idx]
-                    
-                    # Perform detailed comparison
-                    comparison_result = compare_rows_detailed(
-                        source_row if source_row is not None else pd.Series(),
-                        target_row,
-                        common_source_columns,
-                        common_target_columns,
-                        common_cols
-                    )
-                    
-                    # Add metadata
-                    comparison_result['row_index'] = row_idx
-                    comparison_result['excel_row'] = row_idx + 2
-                    comparison_result['row_type'] = 'target_only'
-                    comparison_result['hash_value'] = hash_val[:8]
-                    
-                    # # Log to database
-                    error_logger.log_comparison_mismatch_immediate(
-                        session_id=session_id,
-                        mismatch_data=comparison_result,
-                        source_name=source_info,
-                        target_name=target_info
-                    )
-                    
-                    # Store for UI
-                    if len(all_detailed_mismatches) < 5000:
-                        all_detailed_mismatches.append(comparison_result)
-                    
-                    logged_rows.add(row_idx)
-                        
-                    # if source_row is not None:
-                    #     source_display = format_row_data_for_display(source_row, common_source_columns)
-                    #     logger.info(f"SOURCE DATA: {source_display}")
-                    # else:
-                    #     logger.info(f"SOURCE DATA: ROW NOT FOUND (position {row_idx + 2})")
-                    
-                    # target_display = format_row_data_for_display(target_row, common_target_columns)
-                    # logger.info(f"TARGET DATA: {target_display}")
-                        
-                except Exception as e:
-                    logger.warning(f"Error processing target-only row {row_idx}: {e}")
+    # Summary
+    if mismatch_counter > 0:
+        logger.info(f"\n{'='*80}")
+        logger.info(f"DETAILED MISMATCH SUMMARY:")
+        logger.info(f"  Total mismatches found: {mismatch_counter}")
+        logger.info(f"  Detailed comparisons logged: {len(all_detailed_mismatches)}")
+        logger.info(f"  First {cli_display_limit} rows displayed above")
+        if mismatch_counter > len(all_detailed_mismatches):
+            logger.info(f"  Remaining mismatches are detailed on demand - use API to page through all {mismatch_counter}")
+        logger.info(f"{'='*80}")
+
+    # Calculate unique rows (considering duplicates)
+    unique_to_source_count = hash_match['unique_to_source']
+    unique_to_target_count = hash_match['unique_to_target']
+    
+    logger.info(f"Hash-based Comparison Results (with duplicate handling):")
+    logger.info(f"  • Unique source hashes: {hash_match['unique_source_hashes']}")
+    logger.info(f"  • Unique target hashes: {hash_match['unique_target_hashes']}")
+    logger.info(f"  • Common hashes: {hash_match['common_hashes']}")
+    logger.info(f"  • Hash index memory: {hash_match['index_stats']['bytes_per_row']} bytes/row")
+    logger.info(f"  • Common rows (counting duplicates): {common_rows:,}")
+    logger.info(f"  • Rows only in source (counting duplicates): {unique_to_source_count:,}")
+    logger.info(f"  • Rows only in target (counting duplicates): {unique_to_target_count:,}")
+    
+    # DEBUG: Check what we're sending
+    print("DEBUG: About to log error. Checking error_data...")
+    for key, value in locals().items():
+        if key in ['source_info', 'target_info', 'session_id', 'source_file', 'target_file']:
+            print(f"  {key}: {value} (type: {type(value)})")
+
+    # Check if any of these are slice objects
+    for key in ['source_info', 'target_info']:
+        if key in locals() and isinstance(locals()[key], slice):
+            print(f"ERROR: {key} is a slice object: {locals()[key]}")
+            print(f"Stack trace: {''.join(traceback.format_stack()[-5:-1])}")
+            # Convert slice to string
+            locals()[key] = str(locals()[key])
+
+    # HASH-ONLY COMPARISON - No column details for performance
+    logger.info("HASH-ONLY COMPARISON COMPLETED")
+
+    # Estimate column mismatches from hash results
+    if unique_to_source_count > 0 or unique_to_target_count > 0:
+        total_value_mismatches = (unique_to_source_count + unique_to_target_count) * len(selected_columns)
+    else:
+        total_value_mismatches = 0
+    
+    # Prepare mismatch details with hash results
+    mismatch_details = []
+    
+    # Just return the counts - scoring will be calculated in generate_comparison_report
+    logger.info(f"Returning counts for simple scoring:")
+    logger.info(f"  Common rows: {common_rows:,}")
+    logger.info(f"  Unique to source: {unique_to_source_count:,}")
+    logger.info(f"  Unique to target: {unique_to_target_count:,}")
+    logger.info(f"  Value mismatches: {total_value_mismatches}")
+    logger.info(f"  Modified rows: {len(modified_source_rows):,}")
+    logger.info(f"  Missing rows: {len(all_missing_rows):,}")
+    logger.info(f"  Extra rows: {len(all_extra_rows):,}")
+    
+        # ===== PREPARE PAGINATION DATA =====
+    # Store row indices for pagination
+    source_only_indices = all_missing_rows
+    target_only_indices = all_extra_rows
+    
+    # Prepare pagination metadata for mismatch_details
+    mismatch_details.append({
+        'type': 'hash_summary',
+        'common_rows': common_rows,
+        'unique_to_source': unique_to_source_count,
+        'unique_to_target': unique_to_target_count,
+        # 'source_only_indices': source_only_indices[:100],  # First 100
+        # 'target_only_indices': target_only_indices[:100],  # First 100
+        'total_modified': int(len(modified_source_rows)),
+        'total_source_only': len(source_only_indices),
+        'total_target_only': len(target_only_indices),
+        'hash_index': hash_match['index_stats'],
+        'incremental': incremental_summary,
+        # 'pagination_info': {
+        #     'source_only_api': f"/api/compare/{session_id}/rows/source_only",
+        #     'target_only_api': f"/api/compare/{session_id}/rows/target_only",
+        #     'default_page_size': 50
+        # }
+    })
+
+    if all_detailed_mismatches:
+        table_output = display_mismatch_table_cli(all_detailed_mismatches, source_label, target_label)
+        logger.info(table_output)
+
+    # ===== FIX: Return the enhanced structure correctly =====
+# Create the enhanced return structure with proper dictionary
+    enhanced_mismatch_details = {
+        'summary': {
+            'common_rows': common_rows,
+            'unique_to_source': unique_to_source_count,
+            'unique_to_target': unique_to_target_count,
+            'total_mismatches': len(all_detailed_mismatches),
+            'modified_rows': int(len(modified_source_rows)),
+            'missing_rows': int(len(all_missing_rows)),
+            'extra_rows': int(len(all_extra_rows)),
+            'near_match': near_match_stats,
+            'hash_index': hash_match['index_stats'],
+            'incremental': incremental_summary,
+            'mismatch_log': mismatch_log
+        },
+        'detailed_mismatches': all_detailed_mismatches[:100],  # First 100 for immediate display
+        'total_detailed_mismatches': len(all_detailed_mismatches)
+    }
+
+    # Add pagination info if available
+    if mismatch_details and isinstance(mismatch_details, list) and len(mismatch_details) > 0:
+        # Extract pagination from old structure
+        for item in mismatch_details:
+            if isinstance(item, dict) and 'type' in item and item['type'] == 'hash_summary':
+                enhanced_mismatch_details['pagination'] = item
+                break
+
+    logger.info(f"Returning enhanced mismatch structure with {len(all_detailed_mismatches)} detailed mismatches")
+
+    return common_rows, unique_to_source_count, unique_to_target_count, enhanced_mismatch_details
+
+
+# ========== OUT-OF-CORE PARTITIONED COMPARISON ==========
+# Inputs bigger than APP_SETTINGS['max_rows_in_memory'] are truncated by the loaders.
+# This mode streams each side again in chunks, spills (row hash, position) records into
+# N bucket files on disk (partitioned by hash, so equal rows always land in the same
+# bucket) and matches the buckets pair by pair. Memory is bounded by one chunk plus one
+# bucket pair, the counts are the same as the in-memory comparison.
+
+ROW_SPILL_DTYPE = np.dtype([('hash', '<u8'), ('row', '<i8')])
+
+def key_spill_dtype(column_count):
+    """Record layout of the key-partitioned spill: key hash, position, one value hash per column"""
+    return np.dtype([('key', '<u8'), ('row', '<i8'), ('values', '<u8', (max(column_count, 1),))])
+
+def get_comparison_source_descriptor(df):
+    """Where a loaded DataFrame came from (set by the loaders) - needed to stream it again"""
+    if df is None:
+        return None
+    return df.attrs.get('comparison_source')
+
+def should_use_out_of_core(source_df, target_df, ui_data=None):
+    """
+    Decide whether the comparison has to run out-of-core.
+    'auto' switches it on when a side was truncated while loading, ui_data['out_of_core']
+    (True/False) or COMPARISON_SETTINGS['out_of_core_mode'] can force it either way.
+    """
+    mode = COMPARISON_SETTINGS.get('out_of_core_mode', 'auto')
+    if ui_data and 'out_of_core' in ui_data:
+        mode = 'always' if safe_bool_check(ui_data['out_of_core']) else 'never'
+
+    if mode == 'never':
+        return False
+    if mode == 'always':
+        return True
+
+    for df in (source_df, target_df):
+        descriptor = get_comparison_source_descriptor(df)
+        if descriptor and descriptor.get('truncated'):
+            return True
+    return False
+
+def _iter_database_chunks(db_config, chunk_size, columns=None):
+    """Stream a database table (only `columns` when given) in chunks of chunk_size rows (server-side cursor where available)"""
+    from dq_unified import normalize_db_schema, LargeDatasetHandler
+    db_config = normalize_db_schema(dict(db_config, columns=columns))
+    db_type = db_config['type']
+
+    conn = open_database_connection(db_config)
+    try:
+        if db_type == 'postgresql':
+            cursor = conn.cursor(name='comparison_stream_cursor')
+        else:
+            cursor = conn.cursor()
+            if db_type == 'oracle':
+                cursor.arraysize = 10000
+
+        cursor.execute(f"SELECT {LargeDatasetHandler.get_select_list(db_config)} FROM {get_table_reference(db_config)}")
+        colnames = None
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            if colnames is None:
+                colnames = [desc[0] for desc in cursor.description]
+            yield pd.DataFrame.from_records([tuple(row) for row in rows], columns=colnames)
+        cursor.close()
+    finally:
+        conn.close()
+
+def iter_comparison_chunks(df, chunk_size=None):
+    """
+    Yield the FULL content of a comparison input chunk by chunk.
+    CSV files and database tables are read again from their source; anything else
+    (Excel, frames without a descriptor) is sliced from the loaded DataFrame.
+    """
+    chunk_size = chunk_size or COMPARISON_SETTINGS.get('spill_chunk_size', 200000)
+    descriptor = get_comparison_source_descriptor(df) or {}
+
+    if descriptor.get('type') == 'csv':
+        for chunk in iter_data_chunks('csv', descriptor['path'], chunk_size=chunk_size, columns=descriptor.get('columns')):
+            yield chunk
+    elif descriptor.get('type') == 'database':
+        for chunk in _iter_database_chunks(descriptor['config'], chunk_size, descriptor.get('columns')):
+            yield chunk
+    else:
+        if descriptor.get('truncated'):
+            logger.warning(f"⚠️ {descriptor.get('type', 'In-memory')} input cannot be streamed again - "
+                           f"comparing the {len(df):,} loaded rows")
+        for start in range(0, len(df), chunk_size):
+            yield df.iloc[start:start + chunk_size]
+
+def _append_partitioned(records, buckets, num_partitions, file_paths):
+    """Append records to their bucket files (one sorted write per bucket)"""
+    order = np.argsort(buckets, kind='stable')
+    bounds = np.concatenate(([0], np.cumsum(np.bincount(buckets, minlength=num_partitions))))
+    records = records[order]
+    for bucket in range(num_partitions):
+        start, end = bounds[bucket], bounds[bucket + 1]
+        if end > start:
+            with open(file_paths[bucket], 'ab') as fh:
+                records[start:end].tofile(fh)
+
+def spill_partitioned_hashes(chunks, columns, side, spill_dir, num_partitions,
+                             key_columns=None, normalization_cache=None):
+    """
+    Normalize and hash streamed chunks, spilling them into num_partitions bucket files.
+
+    Always writes '<side>_rows_NNNN.bin' (row hash, position) partitioned by row hash.
+    With key_columns it also writes '<side>_keys_NNNN.bin' (key hash, position, per-column
+    value hashes) partitioned by key hash for the key-join reconciliation.
+
+    Returns dict with total rows spilled and the bucket file paths.
+    """
+    key_columns = list(key_columns or [])
+    hash_columns = list(columns) + [col for col in key_columns if col not in columns]
+    row_files = [os.path.join(spill_dir, f"{side}_rows_{bucket:04d}.bin") for bucket in range(num_partitions)]
+    key_files = [os.path.join(spill_dir, f"{side}_keys_{bucket:04d}.bin") for bucket in range(num_partitions)]
+    key_dtype = key_spill_dtype(len(columns))
+    partitions = np.uint64(num_partitions)
+
+    total_rows = 0
+    for chunk in chunks:
+        if chunk.empty:
+            continue
+        normalized = normalize_columns(chunk, hash_columns, normalization_cache, side, store_columns=False)
+        positions = np.arange(total_rows, total_rows + len(chunk), dtype=np.int64)
+
+        row_hashes = compute_row_hashes(normalized[list(columns)])
+        records = np.empty(len(chunk), dtype=ROW_SPILL_DTYPE)
+        records['hash'] = row_hashes
+        records['row'] = positions
+        _append_partitioned(records, (row_hashes % partitions).astype(np.int64), num_partitions, row_files)
+
+        if key_columns:
+            key_hashes = compute_row_hashes(normalized[key_columns])
+            key_records = np.empty(len(chunk), dtype=key_dtype)
+            key_records['key'] = key_hashes
+            key_records['row'] = positions
+            if len(columns):
+                key_records['values'] = np.column_stack([
+                    pd.util.hash_array(normalized[col].to_numpy()) for col in columns
+                ])
+            _append_partitioned(key_records, (key_hashes % partitions).astype(np.int64), num_partitions, key_files)
+
+        total_rows += len(chunk)
+        if total_rows % 1000000 < len(chunk):
+            logger.info(f"   {side}: spilled {total_rows:,} rows...")
+
+    logger.info(f"   {side}: {total_rows:,} rows spilled into {num_partitions} partitions")
+    return {'rows': total_rows, 'row_files': row_files, 'key_files': key_files if key_columns else []}
+
+def _load_partition(file_path, dtype):
+    """Read one spilled bucket (missing file = empty bucket)"""
+    if not os.path.exists(file_path):
+        return np.empty(0, dtype=dtype)
+    return np.fromfile(file_path, dtype=dtype)
+
+def compare_row_hash_partitions(source_spill, target_spill, max_samples):
+    """
+    Duplicate-aware hash matching bucket by bucket. Identical rows share a hash and
+    therefore a bucket, so the per-bucket counts simply add up.
+    Keeps the first max_samples unmatched positions per side for detailed diffs.
+    """
+    totals = {'common_rows': 0, 'unique_to_source': 0, 'unique_to_target': 0,
+              'unique_source_hashes': 0, 'unique_target_hashes': 0, 'common_hashes': 0}
+    source_samples = []
+    target_samples = []
+
+    for source_file, target_file in zip(source_spill['row_files'], target_spill['row_files']):
+        source_records = _load_partition(source_file, ROW_SPILL_DTYPE)
+        target_records = _load_partition(target_file, ROW_SPILL_DTYPE)
+        hash_match = match_row_hashes(source_records['hash'], target_records['hash'])
+        for name in totals:
+            totals[name] += hash_match[name]
+
+        if len(source_samples) < max_samples:
+            source_samples.extend(source_records['row'][hash_match['source_absent_mask']][:max_samples - len(source_samples)].tolist())
+        if len(target_samples) < max_samples:
+            target_samples.extend(target_records['row'][hash_match['target_absent_mask']][:max_samples - len(target_samples)].tolist())
+
+    totals['source_samples'] = sorted(source_samples)
+    totals['target_samples'] = sorted(target_samples)
+    return totals
+
+def compare_key_partitions(source_spill, target_spill, source_columns, max_samples):
+    """
+    Key-join reconciliation bucket by bucket (equal keys share a bucket).
+    Returns None when a normalized key is duplicated on either side.
+    """
+    dtype = key_spill_dtype(len(source_columns))
+    totals = {'matched_rows': 0, 'changed_rows': 0, 'missing_rows': 0, 'extra_rows': 0}
+    column_counts = np.zeros(len(source_columns), dtype=np.int64)
+    changed_samples = []
+    missing_samples = []
+    extra_samples = []
+
+    for source_file, target_file in zip(source_spill['key_files'], target_spill['key_files']):
+        source_records = _load_partition(source_file, dtype)
+        target_records = _load_partition(target_file, dtype)
+        source_keys, source_pos = np.unique(source_records['key'], return_index=True)
+        target_keys, target_pos = np.unique(target_records['key'], return_index=True)
+        if len(source_keys) != len(source_records) or len(target_keys) != len(target_records):
+            return None
+
+        _, source_idx, target_idx = np.intersect1d(source_keys, target_keys, assume_unique=True, return_indices=True)
+        source_idx = source_pos[source_idx]
+        target_idx = target_pos[target_idx]
+
+        if len(source_columns):
+            not_equal = source_records['values'][source_idx][:, :len(source_columns)] != target_records['values'][target_idx][:, :len(source_columns)]
+        else:
+            not_equal = np.zeros((len(source_idx), 0), dtype=bool)
+        changed_mask = not_equal.any(axis=1)
+        column_counts += not_equal.sum(axis=0)
+
+        source_joined = np.zeros(len(source_records), dtype=bool)
+        target_joined = np.zeros(len(target_records), dtype=bool)
+        source_joined[source_idx] = True
+        target_joined[target_idx] = True
+
+        totals['matched_rows'] += int((~changed_mask).sum())
+        totals['changed_rows'] += int(changed_mask.sum())
+        totals['missing_rows'] += int((~source_joined).sum())
+        totals['extra_rows'] += int((~target_joined).sum())
+
+        if len(changed_samples) < max_samples:
+            pairs = zip(source_records['row'][source_idx[changed_mask]].tolist(), target_records['row'][target_idx[changed_mask]].tolist())
+            changed_samples.extend(list(pairs)[:max_samples - len(changed_samples)])
+        if len(missing_samples) < max_samples:
+            missing_samples.extend(source_records['row'][~source_joined][:max_samples - len(missing_samples)].tolist())
+        if len(extra_samples) < max_samples:
+            extra_samples.extend(target_records['row'][~target_joined][:max_samples - len(extra_samples)].tolist())
+
+    totals['column_mismatch_counts'] = {
+        source_col: int(count) for source_col, count in zip(source_columns, column_counts) if count
+    }
+    totals['changed_samples'] = sorted(changed_samples)
+    totals['missing_samples'] = sorted(missing_samples)
+    totals['extra_samples'] = sorted(extra_samples)
+    return totals
+
+class RowHashAggregator:
+    """
+    Streaming hash -> count table for one side of a comparison.
+
+    Chunks are added as soon as they are hashed; the table only grows with the number of
+    DISTINCT row hashes. The (hash, position) index needed to find mismatched rows again is
+    kept in memory up to max_index_rows records and spilled to a file after that.
+    """
+
+    def __init__(self, spill_path=None, max_index_rows=None):
+        self.hashes = np.zeros(0, dtype=np.uint64)
+        self.counts = np.zeros(0, dtype=np.int64)
+        self.rows = 0
+        self.spill_path = spill_path
+        self.max_index_rows = max_index_rows or COMPARISON_SETTINGS.get('position_index_memory_rows', 2000000)
+        self.spilled_rows = 0
+        self._pending = []
+        self._pending_size = 0
+        self._index_buffer = []
+        self._index_rows = 0
+
+    def add(self, row_hashes):
+        """Add the row hashes of the next chunk (positions continue from the previous chunk)"""
+        row_hashes = np.asarray(row_hashes, dtype=np.uint64)
+        values, counts = np.unique(row_hashes, return_counts=True)
+        self._pending.append((values, counts))
+        self._pending_size += len(values)
+        if self._pending_size >= max(len(self.hashes), 1000000):
+            self._merge()
+
+        records = np.empty(len(row_hashes), dtype=ROW_SPILL_DTYPE)
+        records['hash'] = row_hashes
+        records['row'] = np.arange(self.rows, self.rows + len(row_hashes), dtype=np.int64)
+        self._index_buffer.append(records)
+        self._index_rows += len(records)
+        if self.spill_path and self._index_rows > self.max_index_rows:
+            self._spill_index()
+        self.rows += len(row_hashes)
+
+    def _merge(self):
+        if not self._pending:
+            return
+        values = np.concatenate([self.hashes] + [pending[0] for pending in self._pending])
+        counts = np.concatenate([self.counts] + [pending[1] for pending in self._pending])
+        self.hashes, inverse = np.unique(values, return_inverse=True)
+        self.counts = np.bincount(inverse.ravel(), weights=counts, minlength=len(self.hashes)).astype(np.int64)
+        self._pending = []
+        self._pending_size = 0
+
+    def _spill_index(self):
+        with open(self.spill_path, 'ab') as fh:
+            for records in self._index_buffer:
+                records.tofile(fh)
+        self.spilled_rows += self._index_rows
+        self._index_buffer = []
+        self._index_rows = 0
+
+    def finalize(self):
+        """Distinct hashes (sorted) and their row counts"""
+        self._merge()
+        return self.hashes, self.counts
+
+    def iter_index_blocks(self, block_rows=1000000):
+        """(hash, row) records in position order - spilled part first, then the in-memory buffer"""
+        if self.spilled_rows:
+            spilled = np.memmap(self.spill_path, dtype=ROW_SPILL_DTYPE, mode='r', shape=(self.spilled_rows,))
+            for start in range(0, self.spilled_rows, block_rows):
+                yield np.array(spilled[start:start + block_rows])
+            del spilled
+        for records in self._index_buffer:
+            yield records
+
+    def positions_of(self, hashes, limit):
+        """First `limit` row positions whose hash is in `hashes` (sorted unique array)"""
+        positions = []
+        if limit <= 0 or len(hashes) == 0:
+            return positions
+        for block in self.iter_index_blocks():
+            matched = block['row'][np.isin(block['hash'], hashes, assume_unique=False)]
+            positions.extend(matched[:limit - len(positions)].tolist())
+            if len(positions) >= limit:
+                break
+        return positions
+
+    def memory_bytes(self):
+        """Bytes held in memory by the hash table and the unspilled part of the position index"""
+        return int(self.hashes.nbytes + self.counts.nbytes + self._index_rows * ROW_SPILL_DTYPE.itemsize)
+
+    def close(self):
+        self._index_buffer = []
+        if self.spill_path and os.path.exists(self.spill_path):
+            os.remove(self.spill_path)
+
+def aggregate_row_hashes(chunks, columns, side, aggregator, normalization_cache=None):
+    """Normalize and hash streamed chunks straight into a RowHashAggregator"""
+    for chunk in chunks:
+        if chunk.empty:
+            continue
+        normalized = normalize_columns(chunk, list(columns), normalization_cache, side, store_columns=False)
+        aggregator.add(compute_row_hashes(normalized))
+    logger.info(f"   {side}: {aggregator.rows:,} rows aggregated into {len(aggregator.finalize()[0]):,} distinct hashes "
+                f"({aggregator.spilled_rows:,} index rows spilled)")
+    return aggregator
+
+def compare_hash_aggregates(source_aggregator, target_aggregator):
+    """Duplicate-aware match counts of two finalized aggregators (same numbers as match_row_hashes)"""
+    source_hashes, source_counts = source_aggregator.finalize()
+    target_hashes, target_counts = target_aggregator.finalize()
+    common, source_pos, target_pos = np.intersect1d(source_hashes, target_hashes, assume_unique=True, return_indices=True)
+    common_rows = int(np.minimum(source_counts[source_pos], target_counts[target_pos]).sum())
+    return {
+        'common_rows': common_rows,
+        'unique_to_source': int(source_aggregator.rows - common_rows),
+        'unique_to_target': int(target_aggregator.rows - common_rows),
+        'unique_source_hashes': int(len(source_hashes)),
+        'unique_target_hashes': int(len(target_hashes)),
+        'common_hashes': int(len(common)),
+        'source_absent_hashes': np.setdiff1d(source_hashes, common, assume_unique=True),
+        'target_absent_hashes': np.setdiff1d(target_hashes, common, assume_unique=True)
+    }
+
+def streaming_data_comparison(source_df, target_df, selected_columns, common_cols, error_logger, session_id, source_info, target_info,
+                              normalization_cache=None, chunk_size=None):
+    """
+    Out-of-core hash comparison without bucket files: every streamed chunk is normalized,
+    hashed and folded into a hash -> count table, so peak memory follows the number of
+    distinct rows instead of the raw data size. Mismatched rows are located afterwards
+    through the (spillable) position index.
+
+    Returns the same tuple as partitioned_data_comparison, or None if streaming failed.
+    """
+    import shutil
+    import tempfile
+
+    chunk_size = chunk_size or COMPARISON_SETTINGS.get('spill_chunk_size', 200000)
+    max_detailed = COMPARISON_SETTINGS.get('max_detailed_mismatches', 5000)
+
+    source_columns = [col for col in selected_columns if col in source_df.columns]
+    target_columns = [get_target_column_name(col, common_cols) for col in source_columns]
+    if not source_columns or any(col not in target_df.columns for col in target_columns):
+        logger.warning("No common columns available for streaming comparison")
+        return 0, 0, 0, []
+
+    logger.info(f"OUT-OF-CORE STREAMING HASH COMPARISON ({chunk_size:,} rows per chunk)")
+    spill_root = COMPARISON_SETTINGS.get('spill_directory', 'temp/comparison_spill')
+    os.makedirs(spill_root, exist_ok=True)
+    spill_dir = tempfile.mkdtemp(prefix=f"{session_id}_", dir=spill_root)
+    source_aggregator = RowHashAggregator(os.path.join(spill_dir, 'source_positions.bin'))
+    target_aggregator = RowHashAggregator(os.path.join(spill_dir, 'target_positions.bin'))
+    start_time = time.time()
+
+    try:
+        aggregate_row_hashes(iter_comparison_chunks(source_df, chunk_size), source_columns, 'source_stream',
+                             source_aggregator, normalization_cache)
+        aggregate_row_hashes(iter_comparison_chunks(target_df, chunk_size), target_columns, 'target_stream',
+                             target_aggregator, normalization_cache)
+        hash_totals = compare_hash_aggregates(source_aggregator, target_aggregator)
+        source_samples = source_aggregator.positions_of(hash_totals['source_absent_hashes'], max_detailed)
+        target_samples = target_aggregator.positions_of(hash_totals['target_absent_hashes'], max_detailed)
+        peak_bytes = source_aggregator.memory_bytes() + target_aggregator.memory_bytes()
+    except Exception as e:
+        logger.error(f"Streaming comparison failed: {e}", exc_info=True)
+        return None
+    finally:
+        source_aggregator.close()
+        target_aggregator.close()
+        shutil.rmtree(spill_dir, ignore_errors=True)
+
+    common_rows = hash_totals['common_rows']
+    unique_to_source_count = hash_totals['unique_to_source']
+    unique_to_target_count = hash_totals['unique_to_target']
+    # The sampled positions are pageable (rows past the loaded frames are read from the source again)
+    register_mismatch_session(
+        session_id, source_df, target_df, source_columns, target_columns, common_cols,
+        [mismatch_segment('source_only', source_samples, positional_partners(source_samples, len(target_df))),
+         mismatch_segment('target_only', positional_partners(target_samples, len(source_df)), target_samples)],
+        normalization_cache, total_mismatches=unique_to_source_count + unique_to_target_count
+    )
+    all_detailed_mismatches, mismatch_log = detail_first_mismatch_page(session_id, error_logger, source_info, target_info)
+
+    logger.info(f"Streaming Comparison Results ({time.time() - start_time:.2f}s):")
+    logger.info(f"  • Source rows: {source_aggregator.rows:,}, Target rows: {target_aggregator.rows:,}")
+    logger.info(f"  • Distinct hashes - Source: {hash_totals['unique_source_hashes']:,}, Target: {hash_totals['unique_target_hashes']:,}")
+    logger.info(f"  • Common rows (counting duplicates): {common_rows:,}")
+    logger.info(f"  • Rows only in source (counting duplicates): {unique_to_source_count:,}")
+    logger.info(f"  • Rows only in target (counting duplicates): {unique_to_target_count:,}")
+    logger.info(f"  • Aggregator memory: {peak_bytes / 1024 / 1024:.1f}MB")
+
+    enhanced_mismatch_details = {
+        'summary': {
+            'common_rows': common_rows,
+            'unique_to_source': unique_to_source_count,
+            'unique_to_target': unique_to_target_count,
+            'total_mismatches': len(all_detailed_mismatches),
+            'comparison_mode': 'streaming_hash',
+            'source_rows': source_aggregator.rows,
+            'target_rows': target_aggregator.rows,
+            'unique_source_hashes': hash_totals['unique_source_hashes'],
+            'unique_target_hashes': hash_totals['unique_target_hashes'],
+            'aggregator_memory_mb': round(peak_bytes / 1024 / 1024, 2),
+            'mismatch_log': mismatch_log
+        },
+        'detailed_mismatches': all_detailed_mismatches[:100],  # First 100 for immediate display
+        'total_detailed_mismatches': len(all_detailed_mismatches),
+        'pagination': {
+            'type': 'hash_summary',
+            'comparison_mode': 'streaming_hash',
+            'common_rows': common_rows,
+            'unique_to_source': unique_to_source_count,
+            'unique_to_target': unique_to_target_count,
+            'total_source_only': unique_to_source_count,
+            'total_target_only': unique_to_target_count,
+        }
+    }
+    return common_rows, unique_to_source_count, unique_to_target_count, enhanced_mismatch_details
+
+def partitioned_data_comparison(source_df, target_df, selected_columns, common_cols, error_logger, session_id, source_info, target_info,
+                                normalization_cache=None, key_pairs=None, num_partitions=None, chunk_size=None):
+    """
+    Out-of-core version of advanced_data_comparison for inputs that do not fit in memory.
+    Streams both sides from their original source, spills hashes to partitioned bucket
+    files and compares the buckets one pair at a time.
 
-    # Summary
-    if mismatch_counter > 0:
-        logger.info(f"\n{'='*80}")
-        logger.info(f"DETAILED MISMATCH SUMMARY:")
-        logger.info(f"  Total mismatches found: {mismatch_counter}")
-        logger.info(f"  Detailed comparisons logged: {len(all_detailed_mismatches)}")
-        logger.info(f"  First {cli_display_limit} rows displayed above")
-        logger.info(f"  All mismatches stored in database with complete data")
-        if mismatch_counter > cli_display_limit:
-            logger.info(f"  Use API to retrieve all {mismatch_counter} mismatches")
-        logger.info(f"{'='*80}")
+    Detailed diffs of the first page are produced right away, later pages on request (mismatch sessions).
+    Returns the same tuple as advanced_data_comparison (summary additionally carries
+    source_rows / target_rows of the FULL inputs), or None if streaming failed.
+    """
+    import shutil
+    import tempfile
 
-    # Calculate unique rows (considering duplicates)
-    unique_to_source_count = 0
-    for hash_val, info in source_hashes.items():
-        if hash_val not in target_hashes:
-            unique_to_source_count += info['count']
-        else:
-            # Some rows of this hash might not have matches
-            source_count = info['count']
-            target_count = target_hashes[hash_val]['count']
-            if source_count > target_count:
-                unique_to_source_count += (source_count - target_count)
-    
-    unique_to_target_count = 0
-    for hash_val, info in target_hashes.items():
-        if hash_val not in source_hashes:
-            unique_to_target_count += info['count']
-        else:
-            # Some rows of this hash might not have matches
-            source_count = source_hashes[hash_val]['count']
-            target_count = info['count']
-            if target_count > source_count:
-                unique_to_target_count += (target_count - source_count)
-    
-    logger.info(f"Hash-based Comparison Results (with duplicate handling):")
-    logger.info(f"  • Unique source hashes: {len(source_hash_set)}")
-    logger.info(f"  • Unique target hashes: {len(target_hash_set)}")
-    logger.info(f"  • Common hashes: {len(common_hashes)}")
-    logger.info(f"  • Common rows (counting duplicates): {common_rows:,}")
-    logger.info(f"  • Rows only in source (counting duplicates): {unique_to_source_count:,}")
-    logger.info(f"  • Rows only in target (counting duplicates): {unique_to_target_count:,}")
-    
-    # Store ALL missing rows
-    all_missing_rows = []
-    for hash_val, source_hash_info in source_hashes.items():
-        if hash_val not in target_hashes:
-            # Add ALL rows with this hash
-            all_missing_rows.extend(source_hash_info['rows'])
-        else:
-            # Some rows might be missing if counts don't match
-            source_count = source_hash_info['count']
-            target_count = target_hashes[hash_val]['count']
-            if source_count > target_count:
-                # Some source rows don't have matches
-                missing_count = source_count - target_count
-                # Take the first N rows as missing
-                for i in range(missing_count):
-                    if i < len(source_hash_info['rows']):
-                        all_missing_rows.append(source_hash_info['rows'][i])
-    
-    # Store ALL extra rows  
-    all_extra_rows = []
-    for hash_val, target_hash_info in target_hashes.items():
-        if hash_val not in source_hashes:
-            # Add ALL rows with this hash
-            all_extra_rows.extend(target_hash_info['rows'])
-        else:
-            # Some rows might be extra if counts don't match
-            source_count = source_hashes[hash_val]['count']
-            target_count = target_hash_info['count']
-            if target_count > source_count:
-                # Some target rows don't have matches
-                extra_count = target_count - source_count
-                # Take the first N rows as extra
-                for i in range(extra_count):
-                    if i < len(target_hash_info['rows']):
-                        all_extra_rows.append(target_hash_info['rows'][i])
-    
-    # DEBUG: Check what we're sending
-    print("DEBUG: About to log error. Checking error_data...")
-    for key, value in locals().items():
-        if key in ['source_info', 'target_info', 'session_id', 'source_file', 'target_file']:
-            print(f"  {key}: {value} (type: {type(value)})")
+    num_partitions = num_partitions or COMPARISON_SETTINGS.get('spill_partitions', 64)
+    chunk_size = chunk_size or COMPARISON_SETTINGS.get('spill_chunk_size', 200000)
+    max_detailed = COMPARISON_SETTINGS.get('max_detailed_mismatches', 5000)
 
-    # Check if any of these are slice objects
-    for key in ['source_info', 'target_info']:
-        if key in locals() and isinstance(locals()[key], slice):
-            print(f"ERROR: {key} is a slice object: {locals()[key]}")
-            print(f"Stack trace: {''.join(traceback.format_stack()[-5:-1])}")
-            # Convert slice to string
-            locals()[key] = str(locals()[key])
+    source_columns = [col for col in selected_columns if col in source_df.columns]
+    target_columns = [get_target_column_name(col, common_cols) for col in source_columns]
+    if not source_columns or any(col not in target_df.columns for col in target_columns):
+        logger.warning("No common columns available for partitioned comparison")
+        return 0, 0, 0, []
 
-    # HASH-ONLY COMPARISON - No column details for performance
-    logger.info("HASH-ONLY COMPARISON COMPLETED")
+    key_pairs = list(key_pairs or [])
+    source_key_columns = [source_col for source_col, _ in key_pairs]
+    target_key_columns = [target_col for _, target_col in key_pairs]
 
-    # Estimate column mismatches from hash results
-    if unique_to_source_count > 0 or unique_to_target_count > 0:
-        total_value_mismatches = (unique_to_source_count + unique_to_target_count) * len(selected_columns)
+    logger.info(f"OUT-OF-CORE PARTITIONED COMPARISON ({num_partitions} partitions, {chunk_size:,} rows per chunk)")
+    spill_root = COMPARISON_SETTINGS.get('spill_directory', 'temp/comparison_spill')
+    os.makedirs(spill_root, exist_ok=True)
+    spill_dir = tempfile.mkdtemp(prefix=f"{session_id}_", dir=spill_root)
+    start_time = time.time()
+
+    try:
+        source_spill = spill_partitioned_hashes(
+            iter_comparison_chunks(source_df, chunk_size), source_columns, 'source_stream',
+            spill_dir, num_partitions, source_key_columns, normalization_cache
+        )
+        target_spill = spill_partitioned_hashes(
+            iter_comparison_chunks(target_df, chunk_size), target_columns, 'target_stream',
+            spill_dir, num_partitions, target_key_columns, normalization_cache
+        )
+        logger.info(f"   Spilling completed in {time.time() - start_time:.2f}s")
+
+        key_totals = None
+        if key_pairs:
+            key_totals = compare_key_partitions(source_spill, target_spill, source_columns, max_detailed)
+            if key_totals is None:
+                logger.warning("⚠️ Normalized keys not unique - using hash-based partition comparison instead")
+        hash_totals = None if key_totals is not None else compare_row_hash_partitions(source_spill, target_spill, max_detailed)
+    except Exception as e:
+        logger.error(f"Out-of-core comparison failed: {e}", exc_info=True)
+        return None
+    finally:
+        shutil.rmtree(spill_dir, ignore_errors=True)
+
+    # ===== PAGEABLE MISMATCH SAMPLES =====
+    if key_totals is not None:
+        comparison_mode = 'partitioned_key_join'
+        common_rows = key_totals['matched_rows']
+        unique_to_source_count = key_totals['changed_rows'] + key_totals['missing_rows']
+        unique_to_target_count = key_totals['changed_rows'] + key_totals['extra_rows']
+        changed_samples = np.asarray(key_totals['changed_samples'], dtype=np.int64).reshape(-1, 2)
+        mismatch_segments = [mismatch_segment('changed', changed_samples[:, 0], changed_samples[:, 1]),
+                             mismatch_segment('source_only', key_totals['missing_samples'], None),
+                             mismatch_segment('target_only', None, key_totals['extra_samples'])]
     else:
-        total_value_mismatches = 0
-    
-    # Prepare mismatch details with hash results
-    mismatch_details = []
-    
-    # Just return the counts - scoring will be calculated in generate_comparison_report
-    logger.info(f"Returning counts for simple scoring:")
-    logger.info(f"  Common rows: {common_rows:,}")
-    logger.info(f"  Unique to source: {unique_to_source_count:,}")
-    logger.info(f"  Unique to target: {unique_to_target_count:,}")
-    logger.info(f"  Value mismatches: {total_value_mismatches}")
-    logger.info(f"  Missing rows: {len(all_missing_rows):,}")
-    logger.info(f"  Extra rows: {len(all_extra_rows):,}")
-    
-        # ===== PREPARE PAGINATION DATA =====
-    # Store row indices for pagination
-    source_only_indices = sorted(list(set(all_missing_rows)))
-    target_only_indices = sorted(list(set(all_extra_rows)))
-    
-    # Prepare pagination metadata for mismatch_details
-    mismatch_details.append({
-        'type': 'hash_summary',
+        comparison_mode = 'partitioned_hash'
+        common_rows = hash_totals['common_rows']
+        unique_to_source_count = hash_totals['unique_to_source']
+        unique_to_target_count = hash_totals['unique_to_target']
+        mismatch_segments = [
+            mismatch_segment('source_only', hash_totals['source_samples'],
+                             positional_partners(hash_totals['source_samples'], len(target_df))),
+            mismatch_segment('target_only', positional_partners(hash_totals['target_samples'], len(source_df)),
+                             hash_totals['target_samples'])
+        ]
+
+    # The sampled positions are pageable (rows past the loaded frames are read from the source again)
+    register_mismatch_session(
+        session_id, source_df, target_df, source_columns, target_columns, common_cols, mismatch_segments,
+        normalization_cache, key_columns=(source_key_columns, target_key_columns) if key_totals is not None else None,
+        total_mismatches=(key_totals['changed_rows'] + key_totals['missing_rows'] + key_totals['extra_rows']
+                          if key_totals is not None else unique_to_source_count + unique_to_target_count)
+    )
+    all_detailed_mismatches, mismatch_log = detail_first_mismatch_page(session_id, error_logger, source_info, target_info)
+
+    logger.info(f"Partitioned Comparison Results ({time.time() - start_time:.2f}s):")
+    logger.info(f"  • Source rows: {source_spill['rows']:,}, Target rows: {target_spill['rows']:,}")
+    logger.info(f"  • Common rows (counting duplicates): {common_rows:,}")
+    logger.info(f"  • Rows only in source (counting duplicates): {unique_to_source_count:,}")
+    logger.info(f"  • Rows only in target (counting duplicates): {unique_to_target_count:,}")
+
+    summary = {
         'common_rows': common_rows,
         'unique_to_source': unique_to_source_count,
         'unique_to_target': unique_to_target_count,
-        # 'source_only_indices': source_only_indices[:100],  # First 100
-        # 'target_only_indices': target_only_indices[:100],  # First 100
-        'total_source_only': len(source_only_indices),
-        'total_target_only': len(target_only_indices),
-        # 'pagination_info': {
-        #     'source_only_api': f"/api/compare/{session_id}/rows/source_only",
-        #     'target_only_api': f"/api/compare/{session_id}/rows/target_only",
-        #     'default_page_size': 50
-        # }
-    })
+        'total_mismatches': len(all_detailed_mismatches),
+        'comparison_mode': comparison_mode,
+        'source_rows': source_spill['rows'],
+        'target_rows': target_spill['rows'],
+        'partitions': num_partitions,
+        'mismatch_log': mismatch_log
+    }
+    if key_totals is not None:
+        summary.update({
+            'key_fields': [{'source_column': src, 'target_column': tgt} for src, tgt in key_pairs],
+            'matched_rows': key_totals['matched_rows'],
+            'changed_rows': key_totals['changed_rows'],
+            'missing_rows': key_totals['missing_rows'],
+            'extra_rows': key_totals['extra_rows'],
+            'column_mismatch_counts': key_totals['column_mismatch_counts']
+        })
 
-    if all_detailed_mismatches:
-        table_output = display_mismatch_table_cli(all_detailed_mismatches, source_label, target_label)
-        logger.info(table_output)
+    enhanced_mismatch_details = {
+        'summary': summary,
+        'detailed_mismatches': all_detailed_mismatches[:100],  # First 100 for immediate display
+        'total_detailed_mismatches': len(all_detailed_mismatches),
+        'pagination': {
+            'type': 'hash_summary',
+            'comparison_mode': comparison_mode,
+            'common_rows': common_rows,
+            'unique_to_source': unique_to_source_count,
+            'unique_to_target': unique_to_target_count,
+            'total_source_only': unique_to_source_count,
+            'total_target_only': unique_to_target_count,
+        }
+    }
+    return common_rows, unique_to_source_count, unique_to_target_count, enhanced_mismatch_details
+
+# ========== DATABASE CHECKSUM PUSHDOWN ==========
+
+def should_use_checksum_pushdown(source_df, target_df, key_pairs, ui_data=None):
+    """DB-to-DB comparisons with usable keys let both databases compute the row checksums"""
+    mode = COMPARISON_SETTINGS.get('checksum_pushdown', 'auto')
+    if ui_data and 'checksum_pushdown' in ui_data:
+        mode = 'auto' if safe_bool_check(ui_data['checksum_pushdown']) else 'never'
+    if mode == 'never' or not key_pairs:
+        return False
+
+    source_descriptor = get_comparison_source_descriptor(source_df) or {}
+    target_descriptor = get_comparison_source_descriptor(target_df) or {}
+    return source_descriptor.get('type') == 'database' and target_descriptor.get('type') == 'database'
+
+def should_use_checksum_bisection(source_df, target_df, key_pairs, ui_data=None):
+    """
+    Segment-checksum bisection needs a single integer key on both sides.
+    'auto' bisects when a table was too large to load, 'always' whenever the key allows it.
+    """
+    mode = COMPARISON_SETTINGS.get('checksum_bisection', 'auto')
+    if ui_data and 'bisection_diff' in ui_data:
+        mode = 'always' if safe_bool_check(ui_data['bisection_diff']) else 'never'
+    if mode == 'never' or not key_pairs or len(key_pairs) != 1:
+        return False
+
+    source_key, target_key = key_pairs[0]
+    if not (pd.api.types.is_integer_dtype(source_df[source_key]) and pd.api.types.is_integer_dtype(target_df[target_key])):
+        logger.info("Checksum bisection needs a single integer key - pulling all key checksums instead")
+        return False
+    if mode == 'always':
+        return True
+    source_descriptor = get_comparison_source_descriptor(source_df) or {}
+    target_descriptor = get_comparison_source_descriptor(target_df) or {}
+    return bool(source_descriptor.get('truncated') or target_descriptor.get('truncated'))
+
+def _raw_key_rows(checksum_df, key_columns, positions):
+    """Key tuples as plain Python values (drivers reject numpy scalars)"""
+    if len(positions) == 0:
+        return []
+    return checksum_df[key_columns].iloc[positions].astype(object).to_numpy().tolist()
+
+def _normalized_key_hashes(df, key_columns, normalization_cache, side):
+    if df.empty:
+        return np.zeros(0, dtype=np.uint64)
+    return compute_row_hashes(normalize_columns(df, key_columns, normalization_cache, side, store_columns=False))
+
+def checksum_pushdown_comparison(source_df, target_df, selected_columns, common_cols, key_pairs,
+                                 error_logger, session_id, source_info, target_info, normalization_cache=None,
+                                 bisection=False):
+    """
+    Key-based reconciliation of two database tables without pulling them.
+    Each database returns (key, MD5 checksum) per row (see dq_checksum). Rows whose keys
+    match and whose checksums are equal are identical; only rows with differing checksums
+    (and a sample of missing / extra rows) are fetched and re-verified with the normal
+    value normalization - different engines can render equal values differently.
+
+    With bisection=True the databases first compare aggregate checksums per key range and
+    (key, checksum) pairs are only pulled for the ranges that differ.
+
+    Returns the same tuple as key_join_comparison (summary additionally carries the
+    full table row counts), or None when pushdown is not possible.
+    """
+    start_time = time.time()
+    max_detailed = COMPARISON_SETTINGS.get('max_detailed_mismatches', 5000)
+    source_config = get_comparison_source_descriptor(source_df)['config']
+    target_config = get_comparison_source_descriptor(target_df)['config']
+
+    source_columns = [col for col in selected_columns if col in source_df.columns]
+    target_columns = [get_target_column_name(col, common_cols) for col in source_columns]
+    if not source_columns or any(col not in target_df.columns for col in target_columns):
+        logger.warning("No common columns available for checksum pushdown")
+        return None
+    source_key_columns = [source_col for source_col, _ in key_pairs]
+    target_key_columns = [target_col for _, target_col in key_pairs]
+
+    logger.info(f"DATABASE CHECKSUM PUSHDOWN on {source_key_columns} ↔ {target_key_columns}")
+    key_ranges = None
+    bisection_stats = None
+    if bisection:
+        try:
+            key_ranges, bisection_stats = bisect_differing_key_ranges(
+                source_config, target_config, source_key_columns[0], target_key_columns[0],
+                source_columns, target_columns,
+                fanout=COMPARISON_SETTINGS.get('bisection_fanout', 16),
+                leaf_rows=COMPARISON_SETTINGS.get('bisection_leaf_rows', 2000)
+            )
+            logger.info(f"   Bisection: {len(key_ranges):,} differing key ranges after {bisection_stats['levels']} levels "
+                        f"({bisection_stats['source_rows_in_ranges']:,} source / {bisection_stats['target_rows_in_ranges']:,} target rows)")
+        except Exception as e:
+            logger.warning(f"⚠️ Checksum bisection unavailable ({e}) - pulling all key checksums")
+            key_ranges, bisection_stats = None, None
+
+    try:
+        source_checksums = fetch_key_checksums(source_config, source_key_columns, source_columns, key_ranges=key_ranges)
+        target_checksums = fetch_key_checksums(target_config, target_key_columns, target_columns, key_ranges=key_ranges)
+    except Exception as e:
+        logger.warning(f"⚠️ Checksum pushdown unavailable ({e}) - comparing loaded rows instead")
+        return None
+    comparison_mode = 'checksum_bisection' if bisection_stats else 'checksum_pushdown'
+    source_total_rows = bisection_stats['source_rows'] if bisection_stats else len(source_checksums)
+    target_total_rows = bisection_stats['target_rows'] if bisection_stats else len(target_checksums)
+
+    source_keys = _normalized_key_hashes(source_checksums, source_key_columns, normalization_cache, 'source_checksum')
+    target_keys = _normalized_key_hashes(target_checksums, target_key_columns, normalization_cache, 'target_checksum')
+    if pd.Series(source_keys).duplicated().any() or pd.Series(target_keys).duplicated().any():
+        logger.warning("⚠️ Normalized keys not unique - checksum pushdown not possible")
+        return None
+
+    # ===== JOIN (KEY, CHECKSUM) PAIRS =====
+    merged = pd.DataFrame({
+        'key': source_keys, 'source_row': np.arange(len(source_keys)),
+        'source_checksum': source_checksums[CHECKSUM_COLUMN].to_numpy()
+    }).merge(pd.DataFrame({
+        'key': target_keys, 'target_row': np.arange(len(target_keys)),
+        'target_checksum': target_checksums[CHECKSUM_COLUMN].to_numpy()
+    }), on='key', how='outer', indicator=True, validate='one_to_one')
+
+    joined = merged[merged['_merge'] == 'both'].sort_values('source_row')
+    checksum_differs = (joined['source_checksum'] != joined['target_checksum']).to_numpy()
+    candidates = joined[checksum_differs]
+    identical_rows = int((~checksum_differs).sum())
+    # Rows outside the differing key ranges sit in segments with equal (count, checksum) on both sides
+    identical_rows += source_total_rows - len(source_checksums)
+    missing_rows = np.sort(merged.loc[merged['_merge'] == 'left_only', 'source_row'].to_numpy(dtype=np.int64))
+    extra_rows = np.sort(merged.loc[merged['_merge'] == 'right_only', 'target_row'].to_numpy(dtype=np.int64))
+    logger.info(f"   {identical_rows:,} identical checksums, {len(candidates):,} differing, "
+                f"{len(missing_rows):,} missing, {len(extra_rows):,} extra")
+
+    # Engines rendering values differently make (nearly) every checksum differ - one streamed pass beats key lookups
+    max_differing = COMPARISON_SETTINGS.get('checksum_pushdown_max_differing', 0.2)
+    if len(candidates) > max_differing * max(source_total_rows, target_total_rows, 1):
+        logger.warning(f"⚠️ {len(candidates):,} of {max(source_total_rows, target_total_rows):,} checksums differ "
+                       f"(more than {max_differing:.0%}) - comparing streamed rows instead of fetching them by key")
+        return None
+
+    # ===== FETCH AND RE-VERIFY ONLY THE DIFFERING ROWS =====
+    candidate_source_rows = candidates['source_row'].to_numpy(dtype=np.int64)
+    candidate_target_rows = candidates['target_row'].to_numpy(dtype=np.int64)
+    fetch_source = np.concatenate([candidate_source_rows, missing_rows[:max_detailed]])
+    fetch_target = np.concatenate([candidate_target_rows, extra_rows[:max_detailed]])
+    try:
+        source_rows_df = fetch_rows_by_keys(source_config, source_key_columns, _raw_key_rows(source_checksums, source_key_columns, fetch_source),
+                                            columns=source_columns)
+        target_rows_df = fetch_rows_by_keys(target_config, target_key_columns, _raw_key_rows(target_checksums, target_key_columns, fetch_target),
+                                            columns=target_columns)
+    except Exception as e:
+        logger.warning(f"⚠️ Could not fetch differing rows ({e}) - comparing loaded rows instead")
+        return None
+
+    source_index = pd.Index(_normalized_key_hashes(source_rows_df, source_key_columns, normalization_cache, 'source_checksum'))
+    target_index = pd.Index(_normalized_key_hashes(target_rows_df, target_key_columns, normalization_cache, 'target_checksum'))
+    candidate_keys = candidates['key'].to_numpy(dtype=np.uint64)
+    fetched_source_idx = source_index.get_indexer(candidate_keys) if len(source_index) else np.full(len(candidate_keys), -1)
+    fetched_target_idx = target_index.get_indexer(candidate_keys) if len(target_index) else np.full(len(candidate_keys), -1)
+    found = (fetched_source_idx >= 0) & (fetched_target_idx >= 0)
+
+    normalized_source = normalize_columns(source_rows_df, source_columns, normalization_cache, 'source_fetched', store_columns=False) if len(source_rows_df) else None
+    normalized_target = normalize_columns(target_rows_df, target_columns, normalization_cache, 'target_fetched', store_columns=False) if len(target_rows_df) else None
+    if found.any():
+        not_equal = np.column_stack([
+            normalized_source[source_col].to_numpy()[fetched_source_idx[found]] != normalized_target[target_col].to_numpy()[fetched_target_idx[found]]
+            for source_col, target_col in zip(source_columns, target_columns)
+        ])
+    else:
+        not_equal = np.zeros((0, len(source_columns)), dtype=bool)
+    changed_found = not_equal.any(axis=1)
+    column_mismatch_counts = {
+        source_col: int(count) for source_col, count in zip(source_columns, not_equal.sum(axis=0)) if count
+    }
+
+    # Rows that vanished between the two queries stay counted as changed
+    changed_mask = ~found
+    changed_mask[np.flatnonzero(found)[changed_found]] = True
+    verified_equal = int(found.sum() - changed_found.sum())
+    matched_rows = identical_rows + verified_equal
+    changed_count = int(changed_mask.sum())
+    common_rows = matched_rows
+    unique_to_source_count = changed_count + len(missing_rows)
+    unique_to_target_count = changed_count + len(extra_rows)
+
+    logger.info(f"Checksum {'Bisection' if bisection_stats else 'Pushdown'} Results ({time.time() - start_time:.2f}s):")
+    logger.info(f"  • Matched rows: {matched_rows:,} ({verified_equal:,} after re-verifying differing checksums)")
+    logger.info(f"  • Changed rows (same key, different values): {changed_count:,}")
+    logger.info(f"  • Missing in target: {len(missing_rows):,}")
+    logger.info(f"  • Extra in target: {len(extra_rows):,}")
+    logger.info(f"  • Rows fetched: {len(source_rows_df):,} source, {len(target_rows_df):,} target")
+
+    missing_fetched = source_index.get_indexer(source_keys[missing_rows[:max_detailed]]) if len(source_index) else np.zeros(0, dtype=np.int64)
+    extra_fetched = target_index.get_indexer(target_keys[extra_rows[:max_detailed]]) if len(target_index) else np.zeros(0, dtype=np.int64)
+
+    # The fetched rows are pageable, addressed by their position in the checksum listing
+    changed_rows = np.flatnonzero(changed_mask & found)
+    missing_sample = missing_rows[:len(missing_fetched)][missing_fetched >= 0]
+    extra_sample = extra_rows[:len(extra_fetched)][extra_fetched >= 0]
+    source_positions = np.concatenate([candidate_source_rows[changed_rows], missing_sample])
+    source_fetched = np.concatenate([fetched_source_idx[changed_rows], missing_fetched[missing_fetched >= 0]]).astype(np.int64)
+    target_positions = np.concatenate([candidate_target_rows[changed_rows], extra_sample])
+    target_fetched = np.concatenate([fetched_target_idx[changed_rows], extra_fetched[extra_fetched >= 0]]).astype(np.int64)
+    source_order, target_order = np.argsort(source_positions), np.argsort(target_positions)
+    register_mismatch_session(
+        session_id, source_df, target_df, source_columns, target_columns, common_cols,
+        [mismatch_segment('changed', candidate_source_rows[changed_rows], candidate_target_rows[changed_rows]),
+         mismatch_segment('source_only', missing_sample, None),
+         mismatch_segment('target_only', None, extra_sample)],
+        normalization_cache, key_columns=(source_key_columns, target_key_columns),
+        source_side=frame_session_side(source_rows_df.iloc[source_fetched[source_order]], source_positions[source_order]),
+        target_side=frame_session_side(target_rows_df.iloc[target_fetched[target_order]], target_positions[target_order]),
+        total_mismatches=changed_count + len(missing_rows) + len(extra_rows)
+    )
+    all_detailed_mismatches, mismatch_log = detail_first_mismatch_page(session_id, error_logger, source_info, target_info)
 
-    # ===== FIX: Return the enhanced structure correctly =====
-# Create the enhanced return structure with proper dictionary
     enhanced_mismatch_details = {
         'summary': {
             'common_rows': common_rows,
             'unique_to_source': unique_to_source_count,
             'unique_to_target': unique_to_target_count,
-            'total_mismatches': len(all_detailed_mismatches)
+            'total_mismatches': len(all_detailed_mismatches),
+            'comparison_mode': comparison_mode,
+            'key_fields': [{'source_column': src, 'target_column': tgt} for src, tgt in key_pairs],
+            'source_rows': int(source_total_rows),
+            'target_rows': int(target_total_rows),
+            'matched_rows': matched_rows,
+            'changed_rows': changed_count,
+            'missing_rows': int(len(missing_rows)),
+            'extra_rows': int(len(extra_rows)),
+            'column_mismatch_counts': column_mismatch_counts,
+            'checksum_mismatches': int(len(candidates)),
+            'verified_equal_rows': verified_equal,
+            'rows_fetched': int(len(source_rows_df) + len(target_rows_df)),
+            'checksums_fetched': int(len(source_checksums) + len(target_checksums)),
+            'mismatch_log': mismatch_log,
+            'bisection': {
+                'levels': bisection_stats['levels'],
+                'segment_queries': bisection_stats['segment_queries'],
+                'segments_compared': bisection_stats['segments_compared'],
+                'differing_key_ranges': len(key_ranges)
+            } if bisection_stats else None
         },
         'detailed_mismatches': all_detailed_mismatches[:100],  # First 100 for immediate display
-        'total_detailed_mismatches': len(all_detailed_mismatches)
+        'total_detailed_mismatches': len(all_detailed_mismatches),
+        'pagination': {
+            'type': 'hash_summary',
+            'comparison_mode': comparison_mode,
+            'common_rows': common_rows,
+            'unique_to_source': unique_to_source_count,
+            'unique_to_target': unique_to_target_count,
+            'total_source_only': unique_to_source_count,
+            'total_target_only': unique_to_target_count,
+        }
     }
-
-    # Add pagination info if available
-    if mismatch_details and isinstance(mismatch_details, list) and len(mismatch_details) > 0:
-        # Extract pagination from old structure
-        for item in mismatch_details:
-            if isinstance(item, dict) and 'type' in item and item['type'] == 'hash_summary':
-                enhanced_mismatch_details['pagination'] = item
-                break
-
-    logger.info(f"Returning enhanced mismatch structure with {len(all_detailed_mismatches)} detailed mismatches")
-
     return common_rows, unique_to_source_count, unique_to_target_count, enhanced_mismatch_details
 
-
-def analyze_data_quality(source_df, target_df, selected_columns, common_cols, error_logger, session_id, source_info, target_info):
+def analyze_data_quality(source_df, target_df, selected_columns, common_cols, error_logger, session_id, source_info, target_info,
+                         normalization_cache=None):
     """Analyze data quality metrics with IMPROVED DUPLICATE COUNTING"""
     logger.info("Analyzing data quality metrics...")
     
@@ -3325,20 +6248,19 @@ def analyze_data_quality(source_df, target_df, selected_columns, common_cols, er
     target_columns = [get_target_column_name(col, common_cols) for col in selected_columns]
     
     # Create normalized versions for duplicate checking
-    def normalize_for_duplicates(df, columns):
-        """Create normalized DataFrame for duplicate checking"""
-        normalized_df = pd.DataFrame()
-        
-        for col in columns:
-            if col in df.columns:
-                # Apply normalization
-                normalized_series = df[col].apply(lambda x: smart_normalize_value(x, col))
-                normalized_df[col] = normalized_series
-        return normalized_df
+    def normalize_for_duplicates(df, columns, side):
+        """Create normalized DataFrame for duplicate checking (reuses columns already normalized for hashing)"""
+        present_columns = [col for col in columns if col in df.columns]
+        # A side rebuilt from a hash snapshot was never normalized - its row hashes identify duplicates
+        hashed_columns, row_hashes = (normalization_cache or {}).get('row_hashes', {}).get(side, (None, None))
+        if (hashed_columns == present_columns and present_columns
+                and (side, present_columns[0]) not in normalization_cache.get('columns', {})):
+            return pd.DataFrame({'row_hash': row_hashes})
+        return normalize_columns(df, present_columns, normalization_cache, side)
     
     # Create normalized DataFrames
-    source_norm_df = normalize_for_duplicates(source_df, selected_columns)
-    target_norm_df = normalize_for_duplicates(target_df, target_columns)
+    source_norm_df = normalize_for_duplicates(source_df, selected_columns, 'source')
+    target_norm_df = normalize_for_duplicates(target_df, target_columns, 'target')
     
     # Null values comparison
     source_nulls = source_df[selected_columns].isnull().sum().sum()
@@ -3362,12 +6284,12 @@ def analyze_data_quality(source_df, target_df, selected_columns, common_cols, er
     
     # Find duplicate samples
     if source_dups > 0:
-        dup_rows = source_df[source_norm_df.duplicated(keep=False)].index.tolist()[:3]
+        dup_rows = source_df[source_norm_df.duplicated(keep=False).to_numpy()].index.tolist()[:3]
         dup_samples = [f"Row {row + 2}" for row in dup_rows]
         logger.info(f"Source duplicate samples: {dup_samples}")
     
     if target_dups > 0:
-        dup_rows = target_df[target_norm_df.duplicated(keep=False)].index.tolist()[:3]
+        dup_rows = target_df[target_norm_df.duplicated(keep=False).to_numpy()].index.tolist()[:3]
         dup_samples = [f"Row {row + 2}" for row in dup_rows]
         logger.info(f"Target duplicate samples: {dup_samples}")
     
@@ -3590,6 +6512,8 @@ def generate_comparison_report(source_df, target_df, source_info, target_info, s
                 logger.info(f"   🔎 Source potential keys: {details['source_key_candidates'][:3]}...")
             if 'target_key_candidates' in details and details['target_key_candidates']:
                 logger.info(f"   🔎 Target potential keys: {details['target_key_candidates'][:3]}...")
+            if details.get('suggested_key_fields'):
+                logger.info(f"   💡 Suggested composite key: {' + '.join(details['suggested_key_fields'])} (pass as key_fields to join on it)")
             
         elif status == 'KEYS_MISSING':
             logger.info(f"   ❌ Status: Failed (key fields missing)")
@@ -3749,10 +6673,63 @@ def generate_comparison_report(source_df, target_df, source_info, target_info, s
         logger.info("ℹ️  Note: Strings trimmed and case-normalized")
         logger.info("ℹ️  Note: Phone numbers stripped to digits only, leading zeros removed")
     
-    common_rows, unique_to_source, unique_to_target, comparison_results  = advanced_data_comparison(
-    source_df, target_df, selected_columns, common_cols,
-    error_logger, session_id, str(source_info), str(target_info), str(source_info), str(target_info)
-    )
+    # Normalized columns are computed once and shared by the hash comparison and the quality analysis
+    normalization_cache = {}
+
+    # Keys found (or supplied) by the PK validation switch the comparison to key-join mode
+    join_key_pairs = get_join_key_pairs(pk_validation_results)
+    if join_key_pairs:
+        logger.info(f"Key-join reconciliation enabled on: {[src for src, _ in join_key_pairs]}")
+
+    partitioned_result = None
+    if should_use_checksum_pushdown(source_df, target_df, join_key_pairs, ui_data):
+        partitioned_result = checksum_pushdown_comparison(
+            source_df, target_df, selected_columns, common_cols, join_key_pairs,
+            error_logger, session_id, str(source_info), str(target_info),
+            normalization_cache=normalization_cache,
+            bisection=should_use_checksum_bisection(source_df, target_df, join_key_pairs, ui_data)
+        )
+
+    # Pushdown did not settle a comparison whose tables were never loaded: stream them, or load them when that is off
+    if (partitioned_result is None and (is_deferred_source(source_df) or is_deferred_source(target_df))
+            and not should_use_out_of_core(source_df, target_df, ui_data)):
+        source_df = load_deferred_source(source_df) if is_deferred_source(source_df) else source_df
+        target_df = load_deferred_source(target_df) if is_deferred_source(target_df) else target_df
+
+    if partitioned_result is None and should_use_out_of_core(source_df, target_df, ui_data):
+        # Keyed data needs the key-partitioned spill; plain hash matching streams into a hash -> count table
+        if not join_key_pairs and COMPARISON_SETTINGS.get('out_of_core_strategy', 'streaming') == 'streaming':
+            partitioned_result = streaming_data_comparison(
+                source_df, target_df, selected_columns, common_cols,
+                error_logger, session_id, str(source_info), str(target_info),
+                normalization_cache=normalization_cache
+            )
+        else:
+            partitioned_result = partitioned_data_comparison(
+                source_df, target_df, selected_columns, common_cols,
+                error_logger, session_id, str(source_info), str(target_info),
+                normalization_cache=normalization_cache, key_pairs=join_key_pairs
+            )
+        if partitioned_result is None:
+            logger.warning("⚠️ Out-of-core comparison unavailable - comparing the loaded rows in memory")
+
+    if partitioned_result is not None:
+        common_rows, unique_to_source, unique_to_target, comparison_results = partitioned_result
+        # Row counts of the FULL inputs replace the counts of the (truncated) loaded frames
+        if isinstance(comparison_results, dict) and 'source_rows' in comparison_results.get('summary', {}):
+            source_count = comparison_results['summary']['source_rows']
+            target_count = comparison_results['summary']['target_rows']
+            row_count_match = source_count == target_count
+            missing_in_target = max(0, source_count - target_count)
+            extra_in_target = max(0, target_count - source_count)
+            logger.info(f"Full row counts - Source: {source_count:,}, Target: {target_count:,}")
+    else:
+        common_rows, unique_to_source, unique_to_target, comparison_results  = advanced_data_comparison(
+        source_df, target_df, selected_columns, common_cols,
+        error_logger, session_id, str(source_info), str(target_info), str(source_info), str(target_info),
+        normalization_cache=normalization_cache, key_pairs=join_key_pairs,
+        incremental=should_use_hash_snapshots(ui_data), watermark_column=get_watermark_column(ui_data)
+        )
 
     # ===== FIX: Handle both old and new mismatch_details structure =====
     mismatch_details_list = []
@@ -3789,7 +6766,8 @@ def generate_comparison_report(source_df, target_df, source_info, target_info, s
         logger.info("\n6️⃣ DATA QUALITY ANALYSIS")
     data_quality_match = analyze_data_quality(
         source_df, target_df, selected_columns, common_cols,
-        error_logger, session_id, source_info, target_info
+        error_logger, session_id, source_info, target_info,
+        normalization_cache=normalization_cache
     )
     
     # Get errors from database
@@ -3863,14 +6841,14 @@ def generate_comparison_report(source_df, target_df, source_info, target_info, s
         'selected_columns': selected_columns,
         'column_structure_details': column_structure_details,  
         'source_stats': {
-            'rows': len(source_df),
-            'columns': len(source_df.columns),
-            'columns_list': list(source_df.columns)
+            'rows': source_count,
+            'columns': len(get_schema_columns(source_df)),
+            'columns_list': get_schema_columns(source_df)
         },
         'target_stats': {
-            'rows': len(target_df),
-            'columns': len(target_df.columns),
-            'columns_list': list(target_df.columns)
+            'rows': target_count,
+            'columns': len(get_schema_columns(target_df)),
+            'columns_list': get_schema_columns(target_df)
         },
         'mismatches': detailed_mismatches[:20] if detailed_mismatches else [],  # Renamed from mismatch_details
         'total_mismatches': len(detailed_mismatches) if detailed_mismatches else 0,
@@ -3878,6 +6856,9 @@ def generate_comparison_report(source_df, target_df, source_info, target_info, s
         # Add hash summary if available
         'hash_summary': hash_summary if hash_summary else {},
         
+        # Normalization work (distinct values vs rows) and cache hit rates
+        'normalization_stats': get_normalization_stats(normalization_cache),
+        
         # Add pagination info
         'pagination': {
             'current_page': 1,
@@ -3928,8 +6909,8 @@ def generate_comparison_report(source_df, target_df, source_info, target_info, s
                 'source_name': source_info,
                 'target_type': target_type, 
                 'target_name': target_info,
-                'source_row_count': len(source_df),
-                'target_row_count': len(target_df),
+                'source_row_count': source_count,
+                'target_row_count': target_count,
                 'common_row_count': common_rows,
                 'match_rate': match_rate,
                 'value_mismatch_count': value_mismatch_count,
@@ -3997,8 +6978,8 @@ def generate_comparison_report(source_df, target_df, source_info, target_info, s
         source_label, target_label = get_dynamic_labels(source_info, target_info)
 
         logger.info(f"Session ID: {session_id}")
-        logger.info(f"Source: {source_info} ({len(source_df):,} rows)")
-        logger.info(f"Target: {target_info} ({len(target_df):,} rows)")
+        logger.info(f"Source: {source_info} ({source_count:,} rows)")
+        logger.info(f"Target: {target_info} ({target_count:,} rows)")
         logger.info(f"Selected columns: {len(selected_columns)}")
         logger.info("-"*70)
         logger.info(f"1️⃣ Row count match: {'✅ Yes' if row_count_match else '❌ No'}")
@@ -4138,8 +7119,8 @@ def generate_comparison_report(source_df, target_df, source_info, target_info, s
             'target_name': target_info,
             'error_type': 'comparison_summary',
             'error_description': f"Comparison completed: DQ Score={match_percentage:.2f}%",
-            'actual_value': f"Source: {len(source_df):,} rows, Target: {len(target_df):,} rows, Hash matches: {common_rows:,}, Column mismatches: {value_mismatch_count}",
-            'expected_value': f"Perfect match: {len(source_df):,} rows",
+            'actual_value': f"Source: {source_count:,} rows, Target: {target_count:,} rows, Hash matches: {common_rows:,}, Column mismatches: {value_mismatch_count}",
+            'expected_value': f"Perfect match: {source_count:,} rows",
             'severity': 'low'
         })
         
@@ -4194,134 +7175,6 @@ def generate_comparison_report(source_df, target_df, source_info, target_info, s
 
     return results
 
-def get_paginated_rows_data(source_df, target_df, selected_columns, common_cols, 
-                           row_indices, row_type='source_only', page=1, page_size=50):
-    """
-    Get paginated row data with details
-    
-    Args:
-        source_df: Source DataFrame
-        target_df: Target DataFrame
-        selected_columns: Selected columns for comparison
-        common_cols: Common columns mapping
-        row_indices: List of row indices
-        row_type: 'source_only' or 'target_only'
-        page: Page number (1-based)
-        page_size: Number of rows per page
-        
-    Returns:
-        dict with paginated results
-    """
-    if not row_indices:
-        return {
-            'rows': [],
-            'page': page,
-            'page_size': page_size,
-            'total_pages': 0,
-            'total_rows': 0,
-            'start_index': 0,
-            'end_index': 0
-        }
-    
-    # Sort indices
-    sorted_indices = sorted(row_indices)
-    total_rows = len(sorted_indices)
-    total_pages = (total_rows + page_size - 1) // page_size
-    page = max(1, min(page, total_pages))
-    
-    start_index = (page - 1) * page_size
-    end_index = min(start_index + page_size, total_rows)
-    
-    # Get paginated indices
-    paginated_indices = sorted_indices[start_index:end_index]
-    
-    # Get detailed data for these indices
-    rows_data = []
-    
-    for row_idx in paginated_indices:
-        try:
-            if row_type == 'source_only':
-                # Get source row data
-                source_details = get_row_details(source_df, row_idx, selected_columns)
-                
-                # Get corresponding target data (if exists)
-                target_columns = [get_target_column_name(col, common_cols) for col in selected_columns]
-                target_details = get_row_details(target_df, row_idx, target_columns)
-                
-                row_info = {
-                    'excel_row': row_idx + 2,
-                    'dataframe_index': row_idx,
-                    'source_data': source_details['values'] if source_details else None,
-                    'target_data': target_details['values'] if target_details else None,
-                    'row_type': 'source_only',
-                    'description': f"Present in source, not in target"
-                }
-                
-            else:  # target_only
-                # Get target row data
-                target_columns = [get_target_column_name(col, common_cols) for col in selected_columns]
-                target_details = get_row_details(target_df, row_idx, target_columns)
-                
-                # Get corresponding source data (if exists)
-                source_details = get_row_details(source_df, row_idx, selected_columns)
-                
-                row_info = {
-                    'excel_row': row_idx + 2,
-                    'dataframe_index': row_idx,
-                    'source_data': source_details['values'] if source_details else None,
-                    'target_data': target_details['values'] if target_details else None,
-                    'row_type': 'target_only',
-                    'description': f"Present in target, not in source"
-                }
-            
-            rows_data.append(row_info)
-            
-        except Exception as e:
-            logger.warning(f"Error getting details for row {row_idx}: {e}")
-            continue
-    
-    return {
-        'rows': rows_data,
-        'page': page,
-        'page_size': page_size,
-        'total_pages': total_pages,
-        'total_rows': total_rows,
-        'start_index': start_index,
-        'end_index': end_index
-    }
-
-
-def get_row_details(df, row_idx, columns):
-    """Get detailed row data"""
-    try:
-        if row_idx < 0 or row_idx >= len(df):
-            return None
-        
-        row_data = df.iloc[row_idx]
-        details = {
-            'excel_row': row_idx + 2,
-            'dataframe_index': row_idx,
-            'values': {}
-        }
-        
-        for col in columns:
-            if col in df.columns:
-                value = row_data[col]
-                # Convert to string, handle NaN
-                if pd.isna(value):
-                    str_value = "NULL"
-                else:
-                    str_value = str(value)
-                    # Truncate very long values
-                    if len(str_value) > 100:
-                        str_value = str_value[:97] + "..."
-                details['values'][col] = str_value
-        
-        return details
-    except Exception as e:
-        logger.debug(f"Error getting row details for index {row_idx}: {e}")
-        return None
-
 # ============================================================================
 # NEW FUNCTIONS FOR UI MODE SUPPORT
 # ============================================================================
@@ -4343,8 +7196,19 @@ def run_comparison_analysis_ui(ui_data=None):
         
         logger.info("Starting comparison analysis in UI mode")
         
-        # Load source and target data
-        source_df, target_df, source_info, target_info, source_file, target_file = load_comparison_sources(ui_data)
+        # Let user select which columns to compare
+        columns_ui_data = None
+        if ui_data and 'columns' in ui_data:
+            columns_ui_data = ui_data['columns']
+        elif ui_data and 'selected_columns' in ui_data:
+            columns_ui_data = {'selected_columns': ui_data['selected_columns']}
+        elif ui_data:
+            # If no columns specified, use all common columns
+            columns_ui_data = {'selected_columns': 'all'}
+        
+        # Load source and target data (only the columns the comparison needs)
+        (source_df, target_df, source_info, target_info, source_file, target_file,
+         selected_columns, common_cols) = load_projected_comparison_sources(ui_data, columns_ui_data)
         
         if source_df is None or (hasattr(source_df, 'empty') and source_df.empty) or target_df is None or (hasattr(target_df, 'empty') and target_df.empty):
             error_msg = "Failed to load source or target data"
@@ -4358,18 +7222,6 @@ def run_comparison_analysis_ui(ui_data=None):
         logger.info(f"Source data loaded: {len(source_df)} rows, {len(source_df.columns)} columns")
         logger.info(f"Target data loaded: {len(target_df)} rows, {len(target_df.columns)} columns")
         
-        # Let user select which columns to compare
-        columns_ui_data = None
-        if ui_data and 'columns' in ui_data:
-            columns_ui_data = ui_data['columns']
-        elif ui_data and 'selected_columns' in ui_data:
-            columns_ui_data = {'selected_columns': ui_data['selected_columns']}
-        elif ui_data:
-            # If no columns specified, use all common columns
-            columns_ui_data = {'selected_columns': 'all'}
-        
-        selected_columns, common_cols = select_columns_for_comparison(source_df, target_df, columns_ui_data)
-        
         if not selected_columns:
             error_msg = "No columns selected for comparison"
             logger.error(error_msg)
@@ -4430,12 +7282,10 @@ def main(ui_data=None):
             return run_comparison_analysis_ui(ui_data)
         
         # CLI Mode (original behavior)
-        source_df, target_df, source_info, target_info, source_file, target_file = load_comparison_sources()
+        (source_df, target_df, source_info, target_info, source_file, target_file,
+         selected_columns, common_cols) = load_projected_comparison_sources()
         
         if source_df is not None and target_df is not None:
-            # Let user select which columns to compare
-            selected_columns, common_cols = select_columns_for_comparison(source_df, target_df)
-            
             if selected_columns:
                 results = generate_comparison_report(source_df, target_df, source_info, target_info, selected_columns, common_cols)
                 return results
@@ -2,13 +2,25 @@
 import mysql.connector
 from datetime import datetime
 import logging
-from db_config import MYSQL_CONFIG
+from db_config import MYSQL_CONFIG, PERFORMANCE_CONFIG
 import pandas as pd
 import os
 import json
+import time
 
 logger = logging.getLogger(__name__)
 
+MISMATCH_INSERT_QUERY = """
+INSERT INTO dq_error_logs (
+    session_id, check_type, source_name, target_name,
+    column_name, row_index, excel_row, 
+    actual_value, expected_value,
+    source_actual_value, target_actual_value,
+    error_type, error_description, check_timestamp,
+    severity, comparison_context, difference_summary
+) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+"""
+
 class ErrorLogger:
     def __init__(self, db_config=None):
         self.db_config = db_config or MYSQL_CONFIG
@@ -321,9 +333,80 @@ class ErrorLogger:
             except:
                 pass
     
+    def _build_mismatch_values(self, session_id, mismatch_data, source_name, target_name):
+        """INSERT values for one comparison mismatch (see MISMATCH_INSERT_QUERY) and its summary text"""
+        # Extract data from mismatch_data
+        row_index = mismatch_data.get('row_index', 0)
+        excel_row = mismatch_data.get('excel_row', row_index + 2)
+
+        mismatch_summary = mismatch_data.get('mismatch_summary')
+        if not mismatch_summary:
+            # Create a simple summary from differences
+            differences = mismatch_data.get('differences', [])
+            if differences:
+                # Take first difference only
+                diff = differences[0]
+                mismatch_summary = f"{diff['column']}: '{diff['source']}' ≠ '{diff['target']}'"
+                if len(differences) > 1:
+                    mismatch_summary += f" ... (+{len(differences)-1} more)"
+            else:
+                mismatch_summary = "No mismatch summary available"
+
+        # Convert source and target data to JSON strings
+        source_data_json = json.dumps(mismatch_data.get('source_data', {}), default=str)
+        target_data_json = json.dumps(mismatch_data.get('target_data', {}), default=str)
+
+        # Convert differences to JSON
+        differences_json = json.dumps(mismatch_data.get('differences', []), default=str)
+
+        # Format for actual_value field (like your screenshot's Mismatch Summary)
+        actual_value = f"Mismatch: {mismatch_summary}"
+
+        values = (
+            session_id,
+            'comparison',
+            source_name,
+            target_name,
+            'ALL_COLUMNS',
+            row_index,
+            excel_row,
+            actual_value,  # Mismatch summary
+            "Rows should match exactly",  # Expected value
+            source_data_json,  # Complete source row data as JSON
+            target_data_json,  # Complete target row data as JSON
+            'row_data_mismatch',
+            f"Row {excel_row}: Detailed data mismatch detected",
+            datetime.now(),
+            'high',
+            f"Row {excel_row} detailed comparison",
+            differences_json  # Which specific columns differ
+        )
+        return values, mismatch_summary
+
+    def _fallback_mismatch(self, session_id, mismatch_data, source_name, target_name, mismatch_summary):
+        """Log a mismatch that could not be inserted as a basic error (log_error falls back to CSV)"""
+        try:
+            self.log_error({
+                'session_id': session_id,
+                'check_type': 'comparison',
+                'source_name': source_name,
+                'target_name': target_name,
+                'column_name': 'ALL_COLUMNS',
+                'row_index': mismatch_data.get('row_index', 0),
+                'excel_row': mismatch_data.get('excel_row', 0),
+                'actual_value': f"Mismatch: {str(mismatch_summary)[:200]}",
+                'expected_value': "Rows should match exactly",
+                'error_type': 'row_data_mismatch',
+                'error_description': f"Row {mismatch_data.get('excel_row', '?')}: Data mismatch",
+                'severity': 'high'
+            })
+        except:
+            pass
+
     def log_comparison_mismatch_immediate(self, session_id, mismatch_data, source_name, target_name):
         """
         Log a single comparison mismatch immediately when found
+        (comparisons use create_mismatch_writer to insert mismatches in batches)
         
         Args:
             session_id: Session ID
@@ -334,6 +417,7 @@ class ErrorLogger:
         Returns:
             int: Error ID or None
         """
+        mismatch_summary = mismatch_data.get('mismatch_summary')
         try:
             conn = self._get_connection()
             if not conn:
@@ -341,71 +425,12 @@ class ErrorLogger:
                 return None
             
             cursor = conn.cursor()
-            
-            # Extract data from mismatch_data
-            row_index = mismatch_data.get('row_index', 0)
-            excel_row = mismatch_data.get('excel_row', row_index + 2)
-            
-            mismatch_summary = mismatch_data.get('mismatch_summary')
-            if not mismatch_summary:
-                # Create a simple summary from differences
-                differences = mismatch_data.get('differences', [])
-                if differences:
-                    # Take first difference only
-                    diff = differences[0]
-                    mismatch_summary = f"{diff['column']}: '{diff['source']}' ≠ '{diff['target']}'"
-                    if len(differences) > 1:
-                        mismatch_summary += f" ... (+{len(differences)-1} more)"
-                else:
-                    mismatch_summary = "No mismatch summary available"
-            
-            # Convert source and target data to JSON strings
-            import json
-            source_data_json = json.dumps(mismatch_data.get('source_data', {}), default=str)
-            target_data_json = json.dumps(mismatch_data.get('target_data', {}), default=str)
-            
-            # Convert differences to JSON
-            differences_json = json.dumps(mismatch_data.get('differences', []), default=str)
-            
-            # Format for actual_value field (like your screenshot's Mismatch Summary)
-            actual_value = f"Mismatch: {mismatch_summary}"
-            
-            query = """
-            INSERT INTO dq_error_logs (
-                session_id, check_type, source_name, target_name,
-                column_name, row_index, excel_row, 
-                actual_value, expected_value,
-                source_actual_value, target_actual_value,
-                error_type, error_description, check_timestamp,
-                severity, comparison_context, difference_summary
-            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            """
-            
-            values = (
-                session_id,
-                'comparison',
-                source_name,
-                target_name,
-                'ALL_COLUMNS',
-                row_index,
-                excel_row,
-                actual_value,  # Mismatch summary
-                "Rows should match exactly",  # Expected value
-                source_data_json,  # Complete source row data as JSON
-                target_data_json,  # Complete target row data as JSON
-                'row_data_mismatch',
-                f"Row {excel_row}: Detailed data mismatch detected",
-                datetime.now(),
-                'high',
-                f"Row {excel_row} detailed comparison",
-                differences_json  # Which specific columns differ
-            )
-            
-            cursor.execute(query, values)
+            values, mismatch_summary = self._build_mismatch_values(session_id, mismatch_data, source_name, target_name)
+            cursor.execute(MISMATCH_INSERT_QUERY, values)
             conn.commit()
             
             error_id = cursor.lastrowid
-            logger.debug(f"Logged detailed mismatch (ID: {error_id}) for row {excel_row}")
+            logger.debug(f"Logged detailed mismatch (ID: {error_id}) for row {values[6]}")
             
             cursor.close()
             conn.close()
@@ -416,25 +441,12 @@ class ErrorLogger:
             logger.error(f"Error logging immediate mismatch: {e}")
             
             # Fallback: Log basic error
-            try:
-                self.log_error({
-                    'session_id': session_id,
-                    'check_type': 'comparison',
-                    'source_name': source_name,
-                    'target_name': target_name,
-                    'column_name': 'ALL_COLUMNS',
-                    'row_index': mismatch_data.get('row_index', 0),
-                    'excel_row': mismatch_data.get('excel_row', 0),
-                    'actual_value': f"Mismatch: {mismatch_summary[:200]}",
-                    'expected_value': "Rows should match exactly",
-                    'error_type': 'row_data_mismatch',
-                    'error_description': f"Row {mismatch_data.get('excel_row', '?')}: Data mismatch",
-                    'severity': 'high'
-                })
-            except:
-                pass
-            
+            self._fallback_mismatch(session_id, mismatch_data, source_name, target_name, mismatch_summary)
             return None
+
+    def create_mismatch_writer(self, session_id, source_name, target_name):
+        """Buffered sink for the mismatches of one comparison (close() it at the end)"""
+        return BufferedMismatchWriter(self, session_id, source_name, target_name)
     
     def get_errors_by_session(self, session_id, limit=100):
         """Get errors for a specific session"""
@@ -780,4 +792,89 @@ class ErrorLogger:
                 try:
                     conn.close()
                 except:
-                    pass
\ No newline at end of file
+                    pass
+
+
+class BufferedMismatchWriter:
+    """
+    Collects comparison mismatches and inserts them with one multi-row INSERT per batch
+    instead of one connection + INSERT + COMMIT per mismatch.
+    A batch is flushed when it holds mismatch_log_batch_size records or when
+    mismatch_log_flush_seconds passed since the last flush, and on close().
+    Failed batches fall back record by record like log_comparison_mismatch_immediate.
+    """
+
+    def __init__(self, error_logger, session_id, source_name, target_name, batch_size=None, flush_seconds=None):
+        self.error_logger = error_logger
+        self.session_id = session_id
+        self.source_name = source_name
+        self.target_name = target_name
+        self.batch_size = batch_size or PERFORMANCE_CONFIG.get('mismatch_log_batch_size', 500)
+        self.flush_seconds = flush_seconds or PERFORMANCE_CONFIG.get('mismatch_log_flush_seconds', 5)
+        self.pending = []
+        self.last_flush = time.time()
+        self.stats = {'rows_inserted': 0, 'rows_failed': 0, 'batches': 0, 'insert_seconds': 0.0}
+
+    def add(self, mismatch_data):
+        """Queue one mismatch (from compare_rows_detailed); flushes when the batch is full or old enough"""
+        self.pending.append(mismatch_data)
+        if len(self.pending) >= self.batch_size or time.time() - self.last_flush >= self.flush_seconds:
+            self.flush()
+
+    def flush(self):
+        """Insert all queued mismatches with a single executemany (multi-row INSERT)"""
+        self.last_flush = time.time()
+        if not self.pending:
+            return 0
+        batch, self.pending = self.pending, []
+        start_time = time.time()
+
+        conn = self.error_logger._get_connection()
+        if not conn:
+            logger.error(f"Cannot connect to database for mismatch logging ({len(batch)} mismatches not logged)")
+            self.stats['rows_failed'] += len(batch)
+            return 0
+
+        cursor = None
+        rows = [self.error_logger._build_mismatch_values(self.session_id, mismatch, self.source_name, self.target_name)
+                for mismatch in batch]
+        try:
+            cursor = conn.cursor()
+            cursor.executemany(MISMATCH_INSERT_QUERY, [values for values, _ in rows])
+            conn.commit()
+            self.stats['rows_inserted'] += len(batch)
+            self.stats['batches'] += 1
+            logger.debug(f"Logged {len(batch)} mismatches in one batch")
+        except Exception as e:
+            logger.error(f"Error logging mismatch batch ({len(batch)} rows): {e}")
+            try:
+                conn.rollback()
+            except:
+                pass
+            # Fallback: Log basic errors one by one
+            for mismatch, (_, mismatch_summary) in zip(batch, rows):
+                self.error_logger._fallback_mismatch(self.session_id, mismatch, self.source_name, self.target_name, mismatch_summary)
+            self.stats['rows_failed'] += len(batch)
+        finally:
+            if cursor:
+                try:
+                    cursor.close()
+                except:
+                    pass
+            try:
+                conn.close()
+            except:
+                pass
+            self.stats['insert_seconds'] += time.time() - start_time
+        return len(batch)
+
+    def close(self):
+        """Flush what is left and return the write statistics (incl. inserted rows per second)"""
+        self.flush()
+        insert_seconds = self.stats['insert_seconds']
+        self.stats['insert_seconds'] = round(insert_seconds, 3)
+        self.stats['rows_per_second'] = round(self.stats['rows_inserted'] / insert_seconds, 1) if insert_seconds > 0 else 0.0
+        if self.stats['rows_inserted'] or self.stats['rows_failed']:
+            logger.info(f"Mismatch log: {self.stats['rows_inserted']:,} rows in {self.stats['batches']} batches "
+                        f"({self.stats['rows_per_second']:,} rows/s), {self.stats['rows_failed']:,} failed")
+        return dict(self.stats)
@@ -0,0 +1,300 @@
+# dq_file_cache.py
+"""
+Columnar cache of uploaded CSV / Excel files.
+
+Every analysis of an uploaded file used to parse it again. When a file is uploaded, or
+a load has read all of it, its rows are written to an uncompressed Feather (Arrow IPC)
+file keyed by the file's content hash; later loads memory-map that file instead of
+parsing, so an unchanged upload - under any name - loads in a fraction of a second.
+
+  CSV    on upload: converted by pyarrow's streaming reader (record batch by record
+         batch, constant memory) with pandas' default NA strings; floats are parsed
+         exactly, the C engine's default parser can differ in the last bit
+         after a full load: the frame that load parsed
+  Excel  the sheet a load has just read in full, or every sheet on upload
+
+Builds (including the content hash) run in a background thread. Lookups never hash:
+the content hash is found through a path record written by the build and only used
+while the file's size and mtime are unchanged.
+
+Files: <large_file_cache>/<content hash>.json (manifest: sheets, rows, columns)
+       <large_file_cache>/<content hash>[_<sheet digest>].feather
+       <large_file_cache>/paths/<path digest>.json (path, size, mtime -> content hash)
+Needs pyarrow; without it (or with APP_SETTINGS 'file_cache' off) files are parsed as before.
+"""
+
+import os
+import json
+import hashlib
+import logging
+import threading
+from datetime import datetime
+
+from app_config import APP_SETTINGS, FILE_PATHS
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.feather as pa_feather
+    import pyarrow.ipc as pa_ipc
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+# Setup logger
+logger = logging.getLogger(__name__)
+
+CACHE_VERSION = 1
+
+# (absolute path, size, mtime) -> content hash, so a file is hashed / looked up once per process
+_content_hashes = {}
+_manifest_lock = threading.Lock()
+_builds_in_progress = set()
+
+def is_file_cache_enabled():
+    return HAS_PYARROW and bool(APP_SETTINGS.get('file_cache', True))
+
+def get_cache_directory():
+    return FILE_PATHS.get('large_file_cache', 'temp/large_datasets')
+
+def _file_identity(file_path):
+    stat = os.stat(file_path)
+    return (os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
+
+def _path_record_path(absolute_path):
+    path_digest = hashlib.md5(absolute_path.encode('utf-8')).hexdigest()
+    return os.path.join(get_cache_directory(), 'paths', f"{path_digest}.json")
+
+def get_content_hash(file_path):
+    """
+    MD5 of the file's bytes - reads the whole file, so only cache builds call it.
+    The result is recorded for lookup_content_hash.
+    """
+    from dq_hash_snapshot import file_content_hash
+    identity = _file_identity(file_path)
+    if identity not in _content_hashes:
+        _content_hashes[identity] = file_content_hash(file_path)
+        record_path = _path_record_path(identity[0])
+        os.makedirs(os.path.dirname(record_path), exist_ok=True)
+        temporary_path = f"{record_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporary_path, 'w', encoding='utf-8') as handle:
+            json.dump({'path': identity[0], 'size': identity[1], 'mtime_ns': identity[2],
+                       'content_hash': _content_hashes[identity]}, handle)
+        os.replace(temporary_path, record_path)
+    return _content_hashes[identity]
+
+def lookup_content_hash(file_path):
+    """Content hash a cache build recorded for the file as it is now (same size and mtime), else None"""
+    identity = _file_identity(file_path)
+    if identity in _content_hashes:
+        return _content_hashes[identity]
+    try:
+        with open(_path_record_path(identity[0]), 'r', encoding='utf-8') as handle:
+            record = json.load(handle)
+    except (OSError, ValueError):
+        return None
+    if (record.get('path'), record.get('size'), record.get('mtime_ns')) != identity:
+        return None
+    _content_hashes[identity] = record['content_hash']
+    return record['content_hash']
+
+def _should_cache(file_path):
+    if not is_file_cache_enabled() or not isinstance(file_path, str) or not os.path.isfile(file_path):
+        return False
+    return os.path.getsize(file_path) >= APP_SETTINGS.get('file_cache_min_mb', 1) * 1024 * 1024
+
+def _manifest_path(content_hash):
+    return os.path.join(get_cache_directory(), f"{content_hash}.json")
+
+def _read_manifest(content_hash):
+    path = _manifest_path(content_hash)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as handle:
+            manifest = json.load(handle)
+    except (OSError, ValueError):
+        return None
+    return manifest if manifest.get('version') == CACHE_VERSION else None
+
+def _update_manifest(content_hash, file_type, sheet_names=None, entry_key=None, entry=None):
+    """Add an entry (and the sheet names) to a manifest, written atomically"""
+    with _manifest_lock:
+        manifest = _read_manifest(content_hash) or {
+            'version': CACHE_VERSION, 'file_type': file_type, 'sheets': None, 'entries': {}
+        }
+        if sheet_names:
+            manifest['sheets'] = list(sheet_names)
+        if entry_key is not None:
+            manifest['entries'][entry_key] = entry
+        path = _manifest_path(content_hash)
+        temporary_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporary_path, 'w', encoding='utf-8') as handle:
+            json.dump(manifest, handle)
+        os.replace(temporary_path, path)
+
+def _entry_key(sheet_name):
+    return '' if sheet_name is None else str(sheet_name)
+
+def _data_path(content_hash, sheet_name):
+    if sheet_name is None:
+        return os.path.abspath(os.path.join(get_cache_directory(), f"{content_hash}.feather"))
+    sheet_digest = hashlib.md5(str(sheet_name).encode('utf-8')).hexdigest()[:12]
+    return os.path.abspath(os.path.join(get_cache_directory(), f"{content_hash}_{sheet_digest}.feather"))
+
+def find_cached_file(file_path, sheet_name=None):
+    """
+    Cache entry of a CSV (sheet_name None) or of one Excel sheet, or None:
+    {'path', 'rows', 'columns', 'file_type'}
+    """
+    if not _should_cache(file_path):
+        return None
+    try:
+        content_hash = lookup_content_hash(file_path)
+    except OSError:
+        return None
+    manifest = _read_manifest(content_hash) if content_hash else None
+    if not manifest:
+        return None
+    entry = manifest['entries'].get(_entry_key(sheet_name))
+    if not entry or not os.path.exists(entry['path']):
+        return None
+    return dict(entry, file_type=manifest['file_type'])
+
+def get_cached_sheet_names(file_path):
+    """Sheet names of a cached workbook (None when not known) - spares opening the workbook"""
+    if not _should_cache(file_path):
+        return None
+    try:
+        content_hash = lookup_content_hash(file_path)
+    except OSError:
+        return None
+    manifest = _read_manifest(content_hash) if content_hash else None
+    return manifest.get('sheets') if manifest else None
+
+def read_cached_file(entry, max_rows=None, columns=None, engine=None):
+    """
+    Memory-map a cache entry and convert (the first max_rows rows of) `columns` to a
+    DataFrame. Text columns of CSV caches are string[pyarrow] when engine is 'pyarrow'.
+    """
+    from dq_unified import LargeDatasetHandler
+    columns = [str(col) for col in columns] if columns else None
+    table = pa_feather.read_table(entry['path'], columns=columns, memory_map=True)
+    if max_rows and table.num_rows > max_rows:
+        table = table.slice(0, max_rows)
+    if entry.get('file_type') == 'csv' and LargeDatasetHandler.get_csv_engine(engine) == 'pyarrow':
+        df = LargeDatasetHandler._arrow_to_pandas(table)
+    else:
+        df = table.to_pandas(split_blocks=True)
+    logger.info(f"⚡ Loaded {len(df):,} rows from file cache ({os.path.basename(entry['path'])})")
+    return df
+
+def _write_table(path, table_or_batches, schema=None):
+    """Write an uncompressed Feather file (memory-mappable) via a temporary file"""
+    temporary_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        if isinstance(table_or_batches, pa.Table):
+            pa_feather.write_feather(table_or_batches, temporary_path, compression='uncompressed')
+            rows = table_or_batches.num_rows
+        else:
+            rows = 0
+            with pa.OSFile(temporary_path, 'wb') as sink, pa_ipc.new_file(sink, schema) as writer:
+                for batch in table_or_batches:
+                    writer.write_batch(batch)
+                    rows += batch.num_rows
+        os.replace(temporary_path, path)
+        return rows
+    finally:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+
+def cache_dataframe(df, file_path, sheet_name=None, sheet_names=None, file_type='excel'):
+    """Cache a frame holding ALL rows of a file / sheet. Returns the entry or None."""
+    if not _should_cache(file_path) or df is None:
+        return None
+    try:
+        content_hash = get_content_hash(file_path)
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        os.makedirs(get_cache_directory(), exist_ok=True)
+        path = _data_path(content_hash, sheet_name)
+        rows = _write_table(path, table)
+        entry = {'path': path, 'rows': rows, 'columns': [str(col) for col in df.columns],
+                 'created_at': datetime.now().isoformat()}
+        _update_manifest(content_hash, file_type, sheet_names, _entry_key(sheet_name), entry)
+        logger.info(f"💾 Cached {rows:,} rows of {os.path.basename(file_path)} for faster reloads")
+        return entry
+    except (pa.ArrowException, ValueError, TypeError, OSError) as e:
+        # e.g. object columns mixing numbers and text have no Arrow type
+        logger.warning(f"Could not cache {os.path.basename(file_path)}: {str(e)}")
+        return None
+
+def cache_csv_file(file_path):
+    """Convert a CSV to the cache with pyarrow's streaming reader. Returns the entry or None."""
+    if not _should_cache(file_path):
+        return None
+    from dq_unified import LargeDatasetHandler
+    try:
+        content_hash = get_content_hash(file_path)
+        existing = find_cached_file(file_path)
+        if existing:
+            return existing
+        os.makedirs(get_cache_directory(), exist_ok=True)
+        read_options, convert_options = LargeDatasetHandler._arrow_csv_options(file_path)
+        path = _data_path(content_hash, None)
+        with pa_csv.open_csv(file_path, read_options=read_options, convert_options=convert_options) as reader:
+            schema = reader.schema
+            rows = _write_table(path, reader, schema)
+        entry = {'path': path, 'rows': rows, 'columns': schema.names, 'created_at': datetime.now().isoformat()}
+        _update_manifest(content_hash, 'csv', entry_key='', entry=entry)
+        logger.info(f"💾 Cached {rows:,} rows of {os.path.basename(file_path)} for faster reloads")
+        return entry
+    except (pa.ArrowException, OSError) as e:
+        # e.g. a column whose type changes after the first block
+        logger.warning(f"Could not cache {os.path.basename(file_path)}: {str(e)}")
+        return None
+
+def cache_excel_file(file_path):
+    """Read every sheet of a workbook and cache each of them"""
+    if not _should_cache(file_path):
+        return None
+    import pandas as pd
+    sheets = pd.read_excel(file_path, sheet_name=None, engine='openpyxl')
+    entries = {sheet_name: cache_dataframe(df, file_path, sheet_name, list(sheets)) for sheet_name, df in sheets.items()}
+    return entries
+
+def build_file_cache(file_path, file_type, background=True, df=None, sheet_name=None, sheet_names=None):
+    """
+    Cache an uploaded file, or - with df - the frame a load has just read ALL rows of
+    (sheet_name / sheet_names for Excel). By default in a background thread, one build per
+    file at a time; non-daemon, so a CLI run finishes writing before it exits.
+    """
+    if not _should_cache(file_path):
+        return None
+    if df is not None:
+        # Shallow copy: the caller may replace columns (dtype downcasts) while the thread converts
+        frame = df.copy(deep=False)
+
+        def builder(path):
+            return cache_dataframe(frame, path, sheet_name, sheet_names, file_type)
+    else:
+        builder = cache_csv_file if file_type == 'csv' else cache_excel_file
+    build_key = (os.path.abspath(file_path), _entry_key(sheet_name) if df is not None else None)
+
+    def run_build():
+        try:
+            return builder(file_path)
+        except Exception as e:
+            logger.warning(f"File cache build failed for {os.path.basename(file_path)}: {str(e)}")
+            return None
+        finally:
+            _builds_in_progress.discard(build_key)
+
+    with _manifest_lock:
+        if build_key in _builds_in_progress:
+            return None
+        _builds_in_progress.add(build_key)
+    if not background:
+        return run_build()
+    thread = threading.Thread(target=run_build, name=f"file-cache-{os.path.basename(file_path)}")
+    thread.start()
+    return thread
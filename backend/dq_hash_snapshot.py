@@ -0,0 +1,176 @@
+# dq_hash_snapshot.py
+"""
+Persisted row-hash snapshots for incremental re-comparison.
+
+A comparison that runs every night mostly sees unchanged rows. After a run the per-row
+hashes of each side are written to disk together with
+  - a source fingerprint: size, mtime and content hash for files, table plus
+    watermark column (MAX + COUNT) for databases
+  - one digest of the RAW values per row chunk
+  - the normalization plans of the hashed columns
+On the next run an unchanged fingerprint reuses every hash; otherwise only the chunks
+whose raw digest changed are normalized and hashed again.
+
+Files: <snapshot_directory>/<identity digest>.npy (uint64 hashes) + .json (metadata)
+Opt-in (COMPARISON_SETTINGS 'hash_snapshots'); only the 'snapshot_max_count' newest are kept.
+"""
+
+import os
+import json
+import hashlib
+import logging
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# Setup logger
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+
+def file_content_hash(path, block_size=1024 * 1024):
+    """MD5 of a file's bytes, read in blocks"""
+    digest = hashlib.md5()
+    with open(path, 'rb') as handle:
+        for block in iter(lambda: handle.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def get_source_identity(df):
+    """
+    What a loaded frame was read from (file path or database table), from the
+    comparison_source descriptor the loaders attach. None when unknown.
+    """
+    descriptor = df.attrs.get('comparison_source') or {}
+    if descriptor.get('type') in ('csv', 'excel') and descriptor.get('path'):
+        return {'type': descriptor['type'], 'path': os.path.abspath(descriptor['path'])}
+    if descriptor.get('type') == 'database' and descriptor.get('config'):
+        from dq_checksum import get_table_reference
+        config = descriptor['config']
+        return {
+            'type': 'database',
+            'db_type': config.get('type'),
+            'host': config.get('host') or config.get('file_path'),
+            'database': config.get('database'),
+            'table': get_table_reference(config)
+        }
+    return None
+
+def _database_watermark(config, watermark_column):
+    """(MAX(watermark), COUNT(*)) of a table, as strings"""
+    from dq_unified import normalize_db_schema
+    from dq_checksum import open_database_connection, get_table_reference, quote_identifier
+    config = normalize_db_schema(config.copy())
+    column = quote_identifier(config['type'], watermark_column)
+    conn = open_database_connection(config)
+    try:
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT MAX({column}), COUNT(*) FROM {get_table_reference(config)}")
+        watermark, row_count = cursor.fetchone()
+        cursor.close()
+    finally:
+        conn.close()
+    return str(watermark), int(row_count)
+
+def get_source_fingerprint(df, watermark_column=None):
+    """
+    Fingerprint proving the source did not change since the snapshot.
+    Files: size + mtime + content hash. Databases: table + MAX(watermark_column) + row count
+    (None without a watermark column - then only the chunk digests decide).
+    """
+    descriptor = df.attrs.get('comparison_source') or {}
+    try:
+        if descriptor.get('type') in ('csv', 'excel') and descriptor.get('path'):
+            path = descriptor['path']
+            stat = os.stat(path)
+            return {'size': stat.st_size, 'mtime': stat.st_mtime, 'content_hash': file_content_hash(path)}
+        if descriptor.get('type') == 'database' and descriptor.get('config') and watermark_column:
+            watermark, row_count = _database_watermark(descriptor['config'], watermark_column)
+            return {'watermark_column': watermark_column, 'watermark': watermark, 'row_count': row_count}
+    except Exception as e:
+        logger.warning(f"⚠️ Could not fingerprint source ({e})")
+    return None
+
+def get_chunk_digests(df, columns, chunk_rows):
+    """One MD5 per chunk of rows over the raw values (and dtypes) of the given columns"""
+    dtypes = '|'.join(f"{col}:{df[col].dtype}" for col in columns).encode('utf-8')
+    digests = []
+    for start in range(0, len(df), chunk_rows):
+        chunk = df[columns].iloc[start:start + chunk_rows]
+        digest = hashlib.md5(dtypes)
+        digest.update(pd.util.hash_pandas_object(chunk, index=False).to_numpy(dtype=np.uint64).tobytes())
+        digests.append(digest.hexdigest())
+    return digests
+
+def get_snapshot_path(directory, identity, columns):
+    """Base path (without extension) of the snapshot of one source and column list"""
+    key = json.dumps({'identity': identity, 'columns': list(columns)}, sort_keys=True, default=str)
+    return os.path.join(directory, hashlib.md5(key.encode('utf-8')).hexdigest())
+
+def load_hash_snapshot(directory, identity, columns):
+    """Snapshot metadata dict with 'row_hashes', or None when there is no usable snapshot"""
+    base_path = get_snapshot_path(directory, identity, columns)
+    if not (os.path.exists(base_path + '.json') and os.path.exists(base_path + '.npy')):
+        return None
+    try:
+        with open(base_path + '.json', 'r', encoding='utf-8') as handle:
+            snapshot = json.load(handle)
+        if snapshot.get('version') != SNAPSHOT_VERSION or snapshot.get('columns') != list(columns):
+            return None
+        snapshot['row_hashes'] = np.load(base_path + '.npy', allow_pickle=False)
+        if len(snapshot['row_hashes']) != snapshot.get('row_count'):
+            return None
+        return snapshot
+    except Exception as e:
+        logger.warning(f"⚠️ Ignoring unreadable hash snapshot {base_path} ({e})")
+        return None
+
+def prune_hash_snapshots(directory, max_snapshots):
+    """Delete all but the max_snapshots most recently written snapshots"""
+    try:
+        metadata_files = [os.path.join(directory, name) for name in os.listdir(directory)
+                          if name.endswith('.json') and not name.endswith('.tmp.json')]
+    except OSError:
+        return 0
+    metadata_files.sort(key=os.path.getmtime, reverse=True)
+    removed = 0
+    for metadata_file in metadata_files[max_snapshots:]:
+        base_path = metadata_file[:-len('.json')]
+        for path in (base_path + '.json', base_path + '.npy'):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        removed += 1
+    if removed:
+        logger.info(f"🧹 Removed {removed} old hash snapshot(s) from {directory}")
+    return removed
+
+def save_hash_snapshot(directory, identity, columns, row_hashes, fingerprint, chunk_digests, chunk_rows, plans,
+                       max_snapshots=None):
+    """Write (atomically replace) the snapshot of one source, keeping at most max_snapshots"""
+    os.makedirs(directory, exist_ok=True)
+    base_path = get_snapshot_path(directory, identity, columns)
+    try:
+        np.save(base_path + '.tmp.npy', np.asarray(row_hashes, dtype=np.uint64), allow_pickle=False)
+        with open(base_path + '.tmp.json', 'w', encoding='utf-8') as handle:
+            json.dump({
+                'version': SNAPSHOT_VERSION,
+                'identity': identity,
+                'columns': list(columns),
+                'row_count': int(len(row_hashes)),
+                'fingerprint': fingerprint,
+                'chunk_rows': int(chunk_rows),
+                'chunk_digests': chunk_digests,
+                'plans': plans,
+                'created_at': datetime.now().isoformat()
+            }, handle, default=str)
+        os.replace(base_path + '.tmp.npy', base_path + '.npy')
+        os.replace(base_path + '.tmp.json', base_path + '.json')
+        logger.info(f"💾 Saved hash snapshot of {len(row_hashes):,} rows to {base_path}")
+    except Exception as e:
+        logger.warning(f"⚠️ Could not save hash snapshot ({e})")
+        return
+    if max_snapshots:
+        prune_hash_snapshots(directory, max_snapshots)
@@ -0,0 +1,283 @@
+# dq_sketches.py
+"""
+Mergeable approximate sketches for profiling very large inputs.
+
+  HyperLogLog   distinct counts     relative standard error 1.04 / sqrt(2^precision)
+                                    (precision 14: 16 KB, ~0.8% - 99% of estimates within ~2.5%)
+  KLLSketch     quantiles           rank error ~1.65% at k=200 (99% confidence), memory O(k)
+  SpaceSaving   top-k frequencies   every reported count is an upper bound, too high by at
+                                    most its 'error'; an unreported value occurred at most
+                                    'floor' times (typically ~ rows / capacity)
+
+Every sketch is fed chunk by chunk with update() and combined with merge(), so chunked
+loads and parallel workers can each build a sketch and fold them together afterwards.
+Merging two sketches gives the same guarantees as one sketch fed with both inputs.
+"""
+
+import heapq
+import logging
+
+import numpy as np
+import pandas as pd
+
+from db_config import PERFORMANCE_CONFIG
+
+# Setup logger
+logger = logging.getLogger(__name__)
+
+def use_approximate_profiling(row_count, approximate=None):
+    """
+    Whether profiling should use sketches. An explicit True/False (or 'true'/'false')
+    wins; otherwise PERFORMANCE_CONFIG 'approximate_profiling' decides
+    ('auto' = inputs with at least approximate_min_rows rows, 'always', 'never').
+    """
+    if isinstance(approximate, str):
+        approximate = approximate.strip().lower() in ('true', '1', 'yes', 'y', 'on')
+    if approximate is not None:
+        return bool(approximate)
+    mode = str(PERFORMANCE_CONFIG.get('approximate_profiling', 'auto')).lower()
+    if mode == 'always':
+        return True
+    if mode == 'never':
+        return False
+    return row_count >= PERFORMANCE_CONFIG.get('approximate_min_rows', 2000000)
+
+def iter_chunks(values, chunk_rows=None):
+    """Consecutive slices of a Series / array, chunk_rows at a time"""
+    chunk_rows = chunk_rows or PERFORMANCE_CONFIG.get('sketch_chunk_rows', 500000)
+    for start in range(0, len(values), chunk_rows):
+        yield values[start:start + chunk_rows]
+
+def hash_values(values):
+    """64-bit hashes of the non-null values (same value -> same hash in every chunk)"""
+    series = values if isinstance(values, pd.Series) else pd.Series(values)
+    series = series.dropna()
+    if series.empty:
+        return np.empty(0, dtype=np.uint64)
+    return pd.util.hash_pandas_object(series, index=False, categorize=False).to_numpy(dtype=np.uint64)
+
+# ========== DISTINCT COUNTS ==========
+
+class HyperLogLog:
+    """
+    HyperLogLog distinct counter (Flajolet et al. 2007) with linear counting for
+    small cardinalities. 2^precision one-byte registers; merge = register-wise max.
+    """
+
+    def __init__(self, precision=14):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    @property
+    def relative_error(self):
+        """Relative standard error of estimate()"""
+        return 1.04 / np.sqrt(len(self.registers))
+
+    def update(self, values):
+        return self.update_hashes(hash_values(values))
+
+    def update_hashes(self, hashes):
+        """Fold in precomputed hash_values()"""
+        if not len(hashes):
+            return self
+        p = self.precision
+        buckets = (hashes >> np.uint64(64 - p)).astype(np.int64)
+        # Rank = leading zeros of the remaining 64 - p bits + 1. The top 53 bits convert
+        # to float exactly, so frexp's exponent gives the position of the highest set bit.
+        remaining = (hashes << np.uint64(p)) >> np.uint64(11)
+        exponents = np.frexp(remaining.astype(np.float64))[1]
+        ranks = np.where(remaining > 0, 54 - exponents, 64 - p + 1)
+        ranks = np.minimum(ranks, 64 - p + 1).astype(np.uint8)
+        np.maximum.at(self.registers, buckets, ranks)
+        return self
+
+    def merge(self, other):
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches of different precision")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def estimate(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            return float(m * np.log(m / zeros))
+        return float(raw)
+
+# ========== QUANTILES ==========
+
+class KLLSketch:
+    """
+    KLL quantile sketch (Karnin, Lang, Liberty 2016). Items live in compactors; an
+    over-full compactor sorts itself and promotes every other item (random offset)
+    to the next level, where each item stands for twice as many values. Capacities
+    shrink by 2/3 per level below the top, so memory stays O(k).
+    """
+
+    def __init__(self, k=200, seed=42):
+        self.k = k
+        self.levels = [np.empty(0, dtype=np.float64)]
+        self.count = 0
+        self.min_value = None
+        self.max_value = None
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(8, int(np.ceil(self.k * (2.0 / 3.0) ** depth)))
+
+    def _compress(self):
+        while True:
+            oversized = [level for level, items in enumerate(self.levels) if len(items) > self._capacity(level)]
+            if not oversized:
+                return
+            level = oversized[0]
+            if level + 1 == len(self.levels):
+                self.levels.append(np.empty(0, dtype=np.float64))
+            items = np.sort(self.levels[level])
+            # An odd item out stays at its level
+            keep = items[-1:] if len(items) % 2 else items[:0]
+            pairs = items[:len(items) - len(keep)]
+            promoted = pairs[int(self._rng.integers(2))::2]
+            self.levels[level] = keep
+            self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+
+    def _track(self, count, min_value, max_value):
+        self.count += count
+        self.min_value = min_value if self.min_value is None else min(self.min_value, min_value)
+        self.max_value = max_value if self.max_value is None else max(self.max_value, max_value)
+
+    def update(self, values):
+        values = pd.to_numeric(pd.Series(values), errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return self
+        self._track(len(values), float(values.min()), float(values.max()))
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+        return self
+
+    def merge(self, other):
+        if other.count == 0:
+            return self
+        self._track(other.count, other.min_value, other.max_value)
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0, dtype=np.float64))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self._compress()
+        return self
+
+    def quantiles(self, fractions):
+        """Approximate values at the given fractions (0 and 1 are the exact min / max)"""
+        if self.count == 0:
+            return [None for _ in fractions]
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level_items), 2 ** level, dtype=np.float64)
+                                  for level, level_items in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        items = items[order]
+        cumulative = np.cumsum(weights[order])
+        results = []
+        for fraction in fractions:
+            if fraction <= 0:
+                results.append(self.min_value)
+            elif fraction >= 1:
+                results.append(self.max_value)
+            else:
+                position = np.searchsorted(cumulative, fraction * cumulative[-1], side='left')
+                results.append(float(items[min(position, len(items) - 1)]))
+        return results
+
+# ========== FREQUENT VALUES ==========
+
+class SpaceSaving:
+    """
+    Space-Saving top-k summary (Metwally et al. 2005) in its mergeable form: counts of
+    two summaries are added (a value missing from one side is charged that side's
+    floor) and only the `capacity` largest counters are kept.
+    """
+
+    def __init__(self, capacity=100):
+        self.capacity = capacity
+        self.counts = {}
+        self.errors = {}
+        self.floor = 0
+        self.total = 0
+
+    def update(self, values, hashes=None):
+        """
+        Fold in one chunk. Values are counted exactly by their hash_values() (cheaper than
+        counting the values themselves); only the top hashes are mapped back to values.
+        """
+        series = (values if isinstance(values, pd.Series) else pd.Series(values)).dropna()
+        hashes = hash_values(series) if hashes is None else hashes
+        chunk_counts = pd.Series(hashes).value_counts()
+        top = chunk_counts.iloc[:self.capacity]
+        # First occurrence of every top hash
+        positions = np.flatnonzero(np.isin(hashes, top.index.to_numpy()))
+        top_hashes, first = np.unique(hashes[positions], return_index=True)
+        value_of = dict(zip(top_hashes.tolist(), series.iloc[positions[first]].tolist()))
+
+        chunk = SpaceSaving(self.capacity)
+        chunk.total = int(len(hashes))
+        chunk.counts = {value_of[hash_value]: count for hash_value, count in zip(top.index.tolist(), top.to_numpy().tolist())}
+        chunk.errors = dict.fromkeys(chunk.counts, 0)
+        chunk.floor = int(chunk_counts.iloc[self.capacity]) if len(chunk_counts) > self.capacity else 0
+        return self.merge(chunk)
+
+    def merge(self, other):
+        counts = {}
+        errors = {}
+        for value in set(self.counts) | set(other.counts):
+            counts[value] = self.counts.get(value, self.floor) + other.counts.get(value, other.floor)
+            errors[value] = self.errors.get(value, self.floor) + other.errors.get(value, other.floor)
+        kept = heapq.nlargest(self.capacity, counts, key=counts.get)
+        kept_values = set(kept)
+        dropped = max((count for value, count in counts.items() if value not in kept_values), default=0)
+        self.floor = max(self.floor + other.floor, dropped)
+        self.counts = {value: counts[value] for value in kept}
+        self.errors = {value: errors[value] for value in kept}
+        self.total += other.total
+        return self
+
+    def top_k(self, k=5):
+        """[(value, count, error)] of the k largest counters"""
+        values = heapq.nlargest(k, self.counts, key=self.counts.get)
+        return [(value, self.counts[value], self.errors[value]) for value in values]
+
+# ========== COLUMN PROFILES ==========
+
+def sketch_column(series, chunk_rows=None, quantiles=False, top_k_capacity=100):
+    """
+    Sketches of one column, built chunk by chunk:
+    {'distinct': HyperLogLog, 'top_values': SpaceSaving, 'quantiles': KLLSketch or None}
+    """
+    distinct = HyperLogLog()
+    top_values = SpaceSaving(top_k_capacity)
+    value_quantiles = KLLSketch() if quantiles else None
+    for chunk in iter_chunks(series, chunk_rows):
+        # One hashing pass per chunk feeds both sketches
+        chunk = chunk.dropna()
+        hashes = hash_values(chunk)
+        distinct.update_hashes(hashes)
+        top_values.update(chunk, hashes)
+        if value_quantiles is not None:
+            value_quantiles.update(chunk)
+    return {'distinct': distinct, 'top_values': top_values, 'quantiles': value_quantiles}
+
+def approximate_distinct_count(series, chunk_rows=None):
+    """HyperLogLog estimate of series.nunique()"""
+    distinct = HyperLogLog()
+    for chunk in iter_chunks(series, chunk_rows):
+        distinct.update(chunk)
+    return distinct.estimate()
+
+def approximate_quantiles(values, fractions, chunk_rows=None):
+    """KLL estimates of the given quantiles of a numeric Series / array"""
+    sketch = KLLSketch()
+    for chunk in iter_chunks(values, chunk_rows):
+        sketch.update(chunk)
+    return sketch.quantiles(fractions)
@@ -7,12 +7,15 @@ import psutil
 import warnings
 import json
 import re
+import zipfile
+from xml.etree import ElementTree
 warnings.filterwarnings('ignore')
 from db_config import MYSQL_CONFIG, POSTGRESQL_CONFIG, SQLSERVER_CONFIG, ORACLE_CONFIG, PERFORMANCE_CONFIG
 from app_config import APP_SETTINGS, QUALITY_THRESHOLDS
 from datetime import datetime
 # Add this line in the imports section (around line 20-30):
 from database_navigator import navigate_database
+from dq_file_cache import find_cached_file, read_cached_file, build_file_cache, get_cached_sheet_names
 
 # Global storage for single source sessions (for pagination)
 single_sessions = {}
@@ -25,6 +28,14 @@ except ImportError:
     HAS_INPUT_HANDLER = False
     logging.warning("Input handler not found. Running in CLI-only mode.")
 
+# Optional multithreaded CSV parser (PERFORMANCE_CONFIG 'csv_engine')
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
 # Setup logger
 logger = logging.getLogger(__name__)
 
@@ -55,6 +66,10 @@ def normalize_db_schema(db_config):
     
     return db_config
 
+# Strings pandas' read_csv reads as NaN by default (na_values), for pyarrow's CSV reader
+PANDAS_NA_VALUES = ['', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+                    '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null']
+
 class LargeDatasetHandler:
     """Handler for large datasets with memory optimization"""
     
@@ -86,8 +101,11 @@ class LargeDatasetHandler:
                 elif df[col].min() > -2147483648 and df[col].max() < 2147483647:
                     df[col] = df[col].astype('int32')
         
+        # float32 only where it round-trips: a rounded value no longer matches the other side
         for col in df.select_dtypes(include=['float64']).columns:
-            df[col] = df[col].astype('float32')
+            downcast = df[col].astype('float32')
+            if downcast.astype('float64').equals(df[col]):
+                df[col] = downcast
         
         for col in df.select_dtypes(include=['object']).columns:
             if len(df[col]) > 0 and df[col].nunique() / len(df) < 0.5:
@@ -102,7 +120,112 @@ class LargeDatasetHandler:
         return df
     
     @staticmethod
-    def load_large_csv(file_path, max_rows=None):
+    def count_csv_rows(file_path, block_size=8 * 1024 * 1024):
+        """Data rows of a CSV (lines minus the header) from a binary scan of newline bytes"""
+        lines = 0
+        last_byte = b'\n'
+        with open(file_path, 'rb') as f:
+            while True:
+                block = f.read(block_size)
+                if not block:
+                    break
+                lines += block.count(b'\n')
+                last_byte = block[-1:]
+        if last_byte != b'\n':
+            lines += 1  # Last line without a trailing newline
+        return max(lines - 1, 0)
+    
+    @staticmethod
+    def get_csv_engine(engine=None):
+        """'pyarrow' or 'c': the requested engine (PERFORMANCE_CONFIG 'csv_engine' by default), 'c' without pyarrow"""
+        engine = str(engine or PERFORMANCE_CONFIG.get('csv_engine', 'c')).lower()
+        if engine == 'auto':
+            return 'pyarrow' if HAS_PYARROW else 'c'
+        if engine == 'pyarrow' and not HAS_PYARROW:
+            logger.warning("pyarrow not installed, using the pandas C engine for CSV files")
+            return 'c'
+        return 'pyarrow' if engine == 'pyarrow' else 'c'
+    
+    @staticmethod
+    def _arrow_csv_options(file_path, columns=None):
+        """
+        pyarrow read / convert options close to pandas' read_csv: pandas' default NA strings
+        are nulls and date / time columns stay text (pyarrow would infer date32 / timestamps).
+        Floats are parsed exactly - pandas' default C parser can differ in the last bit.
+        """
+        block_size = int(PERFORMANCE_CONFIG.get('csv_block_size_mb', 16) * 1024 * 1024)
+        read_options = pa_csv.ReadOptions(use_threads=True, block_size=block_size)
+        convert_options = pa_csv.ConvertOptions(null_values=PANDAS_NA_VALUES, strings_can_be_null=True,
+                                                include_columns=list(columns or []))
+        
+        # Column types are inferred from the first block
+        with pa_csv.open_csv(file_path, read_options=read_options, convert_options=convert_options) as reader:
+            temporal = {field.name: pa.string() for field in reader.schema if pa.types.is_temporal(field.type)}
+        if temporal:
+            convert_options.column_types = temporal
+        return read_options, convert_options
+    
+    @staticmethod
+    def _arrow_to_pandas(table, start_row=0):
+        """Arrow table -> DataFrame with Arrow-backed text columns (string[pyarrow])"""
+        string_dtype = pd.StringDtype('pyarrow')
+        df = table.to_pandas(types_mapper={pa.string(): string_dtype, pa.large_string(): string_dtype}.get,
+                             split_blocks=True)
+        if start_row:
+            df.index = pd.RangeIndex(start_row, start_row + len(df))
+        return df
+    
+    @staticmethod
+    def _iter_arrow_csv_chunks(file_path, chunk_size, columns=None, max_rows=None):
+        """Stream a CSV as record batches, regrouped into DataFrames of chunk_size rows"""
+        read_options, convert_options = LargeDatasetHandler._arrow_csv_options(file_path, columns)
+        pending = None
+        rows_yielded = 0
+        
+        with pa_csv.open_csv(file_path, read_options=read_options, convert_options=convert_options) as reader:
+            for batch in reader:
+                batch_table = pa.Table.from_batches([batch])
+                pending = batch_table if pending is None else pa.concat_tables([pending, batch_table])
+                
+                while pending.num_rows >= chunk_size or (max_rows and rows_yielded + pending.num_rows >= max_rows):
+                    size = min(chunk_size, max_rows - rows_yielded) if max_rows else chunk_size
+                    yield LargeDatasetHandler._arrow_to_pandas(pending.slice(0, size), rows_yielded)
+                    rows_yielded += size
+                    pending = pending.slice(size)
+                    if max_rows and rows_yielded >= max_rows:
+                        return
+        
+        if pending is not None and pending.num_rows:
+            yield LargeDatasetHandler._arrow_to_pandas(pending, rows_yielded)
+    
+    @staticmethod
+    def iter_csv_chunks(file_path, chunk_size=50000, columns=None, max_rows=None, engine=None):
+        """
+        CSV chunks of chunk_size rows (at most max_rows) from the pandas C engine or pyarrow's
+        streaming reader. A file pyarrow cannot parse (e.g. a column whose type changes after
+        the first block) continues with the C engine from the first row not yet returned.
+        """
+        rows_loaded = 0
+        if LargeDatasetHandler.get_csv_engine(engine) == 'pyarrow':
+            try:
+                for chunk in LargeDatasetHandler._iter_arrow_csv_chunks(file_path, chunk_size, columns, max_rows):
+                    rows_loaded += len(chunk)
+                    yield chunk
+                return
+            except pa.ArrowInvalid as e:
+                logger.warning(f"pyarrow could not parse {os.path.basename(file_path)} ({e}), "
+                               f"continuing with the pandas C engine after {rows_loaded:,} rows")
+        
+        with pd.read_csv(file_path, chunksize=chunk_size, low_memory=False, usecols=columns,
+                         skiprows=range(1, rows_loaded + 1) if rows_loaded else None,
+                         nrows=max_rows - rows_loaded if max_rows else None) as reader:
+            for chunk in reader:
+                if rows_loaded:
+                    chunk.index = chunk.index + rows_loaded
+                yield chunk
+    
+    @staticmethod
+    def load_large_csv(file_path, max_rows=None, columns=None, engine=None):
         logger.info(f"Loading large CSV: {file_path}")
         
         if isinstance(file_path, dict):
@@ -121,38 +244,56 @@ class LargeDatasetHandler:
                         break
         
         try:
-            total_rows = 0
-            with open(file_path, 'r', encoding='utf-8') as f:
-                total_rows = sum(1 for _ in f) - 1
+            engine = LargeDatasetHandler.get_csv_engine(engine)
+            df = None
             
-            logger.info(f"CSV file has {total_rows:,} rows")
+            # Columnar cache of an earlier upload / load of the same content (dq_file_cache)
+            cache_entry = find_cached_file(file_path)
+            if cache_entry:
+                df = read_cached_file(cache_entry, max_rows=max_rows + 1 if max_rows else None, columns=columns, engine=engine)
             
-            if max_rows and total_rows > max_rows:
-                logger.info(f"Dataset large ({total_rows:,} > {max_rows:,}), loading in chunks")
+            if df is None and engine == 'pyarrow' and not max_rows:
+                # Whole file: pyarrow's multithreaded reader
+                try:
+                    read_options, convert_options = LargeDatasetHandler._arrow_csv_options(file_path, columns)
+                    table = pa_csv.read_csv(file_path, read_options=read_options, convert_options=convert_options)
+                    df = LargeDatasetHandler._arrow_to_pandas(table)
+                except pa.ArrowInvalid as e:
+                    logger.warning(f"pyarrow could not parse {os.path.basename(file_path)} ({e}), using the pandas C engine")
+                    engine = 'c'
+            
+            if df is None:
+                # Single pass: the file is parsed once, in chunks, and parsing stops after
+                # max_rows (+1 row to tell whether anything was left out). The row count is
+                # only needed for a truncated file and comes from a byte scan, not a parse.
                 chunks = []
                 rows_loaded = 0
-                chunk_size = min(50000, max_rows)
+                chunk_size = min(50000, max_rows) if max_rows else 100000
                 
-                for chunk in pd.read_csv(file_path, chunksize=chunk_size, low_memory=False):
+                for chunk in LargeDatasetHandler.iter_csv_chunks(file_path, chunk_size, columns,
+                                                                 max_rows=max_rows + 1 if max_rows else None, engine=engine):
                     chunks.append(chunk)
                     rows_loaded += len(chunk)
                     
                     if rows_loaded % 100000 == 0:
                         logger.info(f"Loaded {rows_loaded:,} rows")
-                    
-                    if rows_loaded >= max_rows:
-                        if rows_loaded > max_rows:
-                            excess = rows_loaded - max_rows
-                            chunks[-1] = chunk.iloc[:-excess]
-                        break
                 
-                df = pd.concat(chunks, ignore_index=True)
-                logger.info(f"Loaded {len(df):,} rows from CSV (chunked)")
-            else:
-                logger.info(f"Loading {total_rows:,} rows from CSV...")
-                df = pd.read_csv(file_path, low_memory=False)
-                logger.info(f"Loaded {len(df):,} rows from CSV")
+                if chunks:
+                    df = pd.concat(chunks, ignore_index=True) if len(chunks) > 1 else chunks[0]
+                else:
+                    df = pd.read_csv(file_path, nrows=0, usecols=columns)
+            
+            truncated = bool(max_rows and len(df) > max_rows)
+            if truncated:
+                total_rows = cache_entry['rows'] if cache_entry else LargeDatasetHandler.count_csv_rows(file_path)
+                logger.info(f"Dataset large ({total_rows:,} > {max_rows:,}), loaded first {max_rows:,} rows")
+                df = df.iloc[:max_rows]
             
+            if not cache_entry and not truncated and columns is None:
+                # Every row was just parsed: cache that frame (background thread, ready for the next load)
+                build_file_cache(file_path, 'csv', df=df)
+            
+            logger.info(f"Loaded {len(df):,} rows from CSV")
             return df
             
         except Exception as e:
@@ -160,42 +301,165 @@ class LargeDatasetHandler:
             raise
     
     @staticmethod
-    def load_large_excel(file_path, sheet_name=None, max_rows=None):
+    def is_streamable_excel(file_path):
+        """.xlsx / .xlsm workbooks can be streamed with openpyxl's read-only mode (.xls cannot)"""
+        return isinstance(file_path, str) and file_path.lower().endswith(('.xlsx', '.xlsm'))
+    
+    @staticmethod
+    def get_excel_sheet_names(file_path):
+        """Sheet names from the workbook index (xl/workbook.xml) - no cells or shared strings are read"""
+        if LargeDatasetHandler.is_streamable_excel(file_path):
+            try:
+                with zipfile.ZipFile(file_path) as archive:
+                    root = ElementTree.fromstring(archive.read('xl/workbook.xml'))
+                namespace = root.tag[:root.tag.index('}') + 1] if root.tag.startswith('{') else ''
+                return [sheet.get('name') for sheet in root.iter(f'{namespace}sheet')]
+            except (zipfile.BadZipFile, KeyError, ElementTree.ParseError):
+                pass
+        return pd.ExcelFile(file_path).sheet_names
+    
+    @staticmethod
+    def _excel_cell(value):
+        """Cell value as pd.read_excel's openpyxl reader passes it on (empty -> '', 3.0 -> 3)"""
+        if value is None:
+            return ''
+        if isinstance(value, float) and value.is_integer():
+            return int(value)
+        return value
+    
+    @staticmethod
+    def iter_excel_row_batches(file_path, sheet_name=None, chunk_size=50000, max_rows=None):
+        """
+        Stream the cell values of an .xlsx / .xlsm sheet (first sheet by default) with
+        openpyxl's read-only mode. Yields (header, rows, start_row) with at most chunk_size
+        rows per batch and max_rows in total; reading stops after max_rows.
+        """
+        import openpyxl
+        
+        workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True, keep_links=False)
+        try:
+            worksheet = workbook[sheet_name] if sheet_name is not None else workbook.worksheets[0]
+            worksheet.reset_dimensions()  # Stored dimensions can be wrong - read every row
+            rows = worksheet.iter_rows(values_only=True)
+            
+            header = [LargeDatasetHandler._excel_cell(value) for value in next(rows, ())]
+            while header and header[-1] == '':
+                header.pop()
+            if not header:
+                return
+            width = len(header)
+            
+            batch = []
+            blank_rows = []  # Held back: trailing blank rows are not data
+            rows_loaded = 0
+            for values in rows:
+                row = [LargeDatasetHandler._excel_cell(value) for value in values[:width]]
+                row += [''] * (width - len(row))
+                if all(value == '' for value in row):
+                    blank_rows.append(row)
+                    continue
+                batch.extend(blank_rows)
+                blank_rows = []
+                batch.append(row)
+                
+                if max_rows and rows_loaded + len(batch) >= max_rows:
+                    yield header, batch[:max_rows - rows_loaded], rows_loaded
+                    return
+                if len(batch) >= chunk_size:
+                    yield header, batch[:chunk_size], rows_loaded
+                    rows_loaded += chunk_size
+                    batch = batch[chunk_size:]
+            
+            if batch or not rows_loaded:
+                yield header, batch, rows_loaded
+        finally:
+            workbook.close()
+    
+    @staticmethod
+    def _excel_rows_to_frame(header, rows, columns=None, start_row=0):
+        """Convert cell values with the parser pd.read_excel uses (same dtype inference)"""
+        from pandas.io.parsers import TextParser
+        df = TextParser([header] + rows, header=0, skip_blank_lines=False, usecols=columns).read()
+        df.index = pd.RangeIndex(start_row, start_row + len(df))
+        return df
+    
+    @staticmethod
+    def iter_excel_chunks(file_path, sheet_name=None, chunk_size=50000, max_rows=None, columns=None):
+        """
+        Stream an .xlsx / .xlsm sheet in DataFrames of chunk_size rows, at most max_rows,
+        holding one chunk of rows at a time. Like CSV chunks, each chunk infers its own
+        dtypes (an integer column with a blank cell is float in that chunk only) - use
+        read_excel_rows for one frame that matches pd.read_excel.
+        """
+        for header, rows, start_row in LargeDatasetHandler.iter_excel_row_batches(file_path, sheet_name, chunk_size, max_rows):
+            yield LargeDatasetHandler._excel_rows_to_frame(header, rows, columns, start_row)
+    
+    @staticmethod
+    def read_excel_rows(file_path, sheet_name=None, max_rows=None, columns=None, chunk_size=50000):
+        """
+        First max_rows rows of an .xlsx / .xlsm sheet as one DataFrame. Rows are streamed
+        (reading stops after max_rows) and parsed once as a whole, so dtypes match
+        pd.read_excel(..., nrows=max_rows) however many batches were read.
+        """
+        header, all_rows = None, []
+        batches = LargeDatasetHandler.iter_excel_row_batches(file_path, sheet_name, chunk_size, max_rows)
+        for batch_number, (header, rows, _) in enumerate(batches, 1):
+            all_rows.extend(rows)
+            if batch_number % 4 == 0:
+                logger.info(f"Read {len(all_rows):,} rows")
+        if header is None:
+            return pd.DataFrame()
+        return LargeDatasetHandler._excel_rows_to_frame(header, all_rows, columns)
+    
+    @staticmethod
+    def load_large_excel(file_path, sheet_name=None, max_rows=None, columns=None):
         logger.info(f"Loading large Excel: {file_path}")
         
         try:
-            excel_file = pd.ExcelFile(file_path)
+            # Sheet names of a cached workbook spare opening it
+            sheet_names = get_cached_sheet_names(file_path) or LargeDatasetHandler.get_excel_sheet_names(file_path)
             
             if sheet_name is None:
-                if len(excel_file.sheet_names) > 1:
-                    logger.info(f"Available sheets: {excel_file.sheet_names}")
+                if len(sheet_names) > 1:
+                    logger.info(f"Available sheets: {sheet_names}")
                     if HAS_INPUT_HANDLER:
                         sheet_name = get_input(
                             prompt="Enter sheet name (or press Enter for first sheet)",
                             field_name="sheet_name",
-                            default=excel_file.sheet_names[0],
+                            default=sheet_names[0],
                             required=False
                         ).strip()
                         if not sheet_name:
-                            sheet_name = excel_file.sheet_names[0]
+                            sheet_name = sheet_names[0]
                     else:
                         sheet_name = input("Enter sheet name (or press Enter for first sheet): ").strip()
                         if not sheet_name:
-                            sheet_name = excel_file.sheet_names[0]
+                            sheet_name = sheet_names[0]
                 else:
-                    sheet_name = excel_file.sheet_names[0]
+                    sheet_name = sheet_names[0]
             
             file_size_mb = os.path.getsize(file_path) / (1024 * 1024)
             if file_size_mb > 50:
                 logger.warning(f"Large Excel file: {file_size_mb:.1f}MB")
             
+            cache_entry = find_cached_file(file_path, sheet_name)
+            if cache_entry:
+                return read_cached_file(cache_entry, max_rows=max_rows, columns=columns), sheet_name
+            
             logger.info(f"Loading Excel file...")
-            df = pd.read_excel(file_path, sheet_name=sheet_name, engine='openpyxl')
+            if LargeDatasetHandler.is_streamable_excel(file_path):
+                # Streamed; stops after max_rows (+1 row to tell whether anything was left out)
+                df = LargeDatasetHandler.read_excel_rows(file_path, sheet_name, max_rows=max_rows + 1 if max_rows else None,
+                                                         columns=columns)
+            else:
+                df = pd.read_excel(file_path, sheet_name=sheet_name, usecols=columns)
             
             logger.info(f"Loaded {len(df):,} rows from Excel")
+            if columns is None and not (max_rows and len(df) > max_rows):
+                build_file_cache(file_path, 'excel', df=df, sheet_name=sheet_name, sheet_names=sheet_names)
             
             if max_rows and len(df) > max_rows:
-                logger.warning(f"Dataset too large ({len(df):,} > {max_rows:,}), sampling...")
+                logger.warning(f"Dataset too large (more than {max_rows:,} rows), keeping the first {max_rows:,}...")
                 df = df.head(max_rows)
             
             return df, sheet_name
@@ -204,6 +468,15 @@ class LargeDatasetHandler:
             logger.error(f"Error loading large Excel: {str(e)}", exc_info=True)
             raise
     
+    @staticmethod
+    def get_select_list(db_config):
+        """'*' or the quoted db_config['columns'] (column-projected loads)"""
+        columns = db_config.get('columns')
+        if not columns:
+            return '*'
+        from dq_checksum import quote_identifier
+        return ', '.join(quote_identifier(db_config['type'], col) for col in columns)
+    
     @staticmethod
     def load_large_database(db_config, max_rows=None):
         logger.info(f"Loading large database table: {db_config['table']}")
@@ -262,7 +535,8 @@ class LargeDatasetHandler:
                 logger.warning("Table is empty")
                 return pd.DataFrame()
             
-            query = f"SELECT * FROM {full_table_name}"
+            select_list = LargeDatasetHandler.get_select_list(db_config)
+            query = f"SELECT {select_list} FROM {full_table_name}"
             if max_rows and total_rows > max_rows:
                 logger.info(f"Table large ({total_rows:,} > {max_rows:,}), limiting query")
                 query += f" LIMIT {max_rows}"
@@ -307,6 +581,33 @@ class LargeDatasetHandler:
         finally:
             conn.close()
     
+    @staticmethod
+    def _concat_record_chunks(chunks):
+        """
+        Concatenate frames built batch by batch with DataFrame.from_records. A batch in which
+        a column is entirely NULL infers object for it; such batches take the dtype the
+        batches holding values agree on (numbers -> float64, datetimes -> their dtype), as one
+        from_records over all rows (read_sql_query) would infer.
+        """
+        if len(chunks) == 1:
+            return chunks[0]
+        for col in chunks[0].columns:
+            all_null = [bool(chunk[col].isna().all()) for chunk in chunks]
+            value_dtypes = [chunk[col].dtype for chunk, empty in zip(chunks, all_null) if not empty]
+            if not any(all_null) or not value_dtypes:
+                continue
+            kinds = {dtype.kind for dtype in value_dtypes}
+            if kinds <= set('iuf'):
+                fill_dtype = 'float64'
+            elif kinds == {'M'} and len(set(value_dtypes)) == 1:
+                fill_dtype = value_dtypes[0]
+            else:
+                continue
+            for chunk, empty in zip(chunks, all_null):
+                if empty:
+                    chunk[col] = chunk[col].astype(fill_dtype)
+        return pd.concat(chunks, ignore_index=True)
+    
     @staticmethod
     def _load_large_mysql(db_config, max_rows):
         import mysql.connector
@@ -337,7 +638,8 @@ class LargeDatasetHandler:
                 logger.warning("Table is empty")
                 return pd.DataFrame()
             
-            query = f"SELECT * FROM {table}"
+            select_list = LargeDatasetHandler.get_select_list(db_config)
+            query = f"SELECT {select_list} FROM {table}"
             if max_rows and total_rows > max_rows:
                 logger.info(f"Table large ({total_rows:,} > {max_rows:,}), limiting query")
                 query += f" LIMIT {max_rows}"
@@ -345,7 +647,42 @@ class LargeDatasetHandler:
             rows_to_load = min(total_rows, max_rows) if max_rows else total_rows
             logger.info(f"Loading {rows_to_load:,} rows from MySQL...")
             
-            df = pd.read_sql_query(query, conn)
+            chunk_size = PERFORMANCE_CONFIG.get('default_batch_size', 50000)
+            if rows_to_load > chunk_size:
+                # Unbuffered cursor: rows stream from the server and only one batch of
+                # tuples exists at a time - each batch becomes a columnar chunk right away
+                cursor = conn.cursor(buffered=False)
+                try:
+                    cursor.execute(query)
+                    colnames = [desc[0] for desc in cursor.description]
+                    
+                    chunks = []
+                    rows_loaded = 0
+                    while True:
+                        rows = cursor.fetchmany(chunk_size)
+                        if not rows:
+                            break
+                        
+                        # coerce_float as read_sql_query does (DECIMAL -> float)
+                        chunks.append(pd.DataFrame.from_records(rows, columns=colnames, coerce_float=True))
+                        rows_loaded += len(rows)
+                        del rows
+                        
+                        if rows_loaded % 100000 < chunk_size:
+                            logger.info(f"Loaded {rows_loaded:,} rows")
+                finally:
+                    try:
+                        cursor.close()
+                    except Exception as e:
+                        # An unbuffered cursor that failed mid-stream may not close cleanly - keep the original error
+                        logger.debug(f"Could not close MySQL cursor: {e}")
+                
+                if chunks:
+                    df = LargeDatasetHandler._concat_record_chunks(chunks)
+                else:
+                    df = pd.DataFrame(columns=colnames)
+            else:
+                df = pd.read_sql_query(query, conn)
             logger.info(f"Loaded {len(df):,} rows from MySQL")
             return df
             
@@ -396,10 +733,11 @@ class LargeDatasetHandler:
                 logger.warning("Table is empty")
                 return pd.DataFrame()
             
-            query = f"SELECT * FROM {full_table_name}"
+            select_list = LargeDatasetHandler.get_select_list(db_config)
+            query = f"SELECT {select_list} FROM {full_table_name}"
             if max_rows and total_rows > max_rows:
                 logger.info(f"Table large ({total_rows:,} > {max_rows:,}), limiting query")
-                query = f"SELECT * FROM (SELECT * FROM {full_table_name}) WHERE ROWNUM <= {max_rows}"
+                query = f"SELECT * FROM (SELECT {select_list} FROM {full_table_name}) WHERE ROWNUM <= {max_rows}"
             
             rows_to_load = min(total_rows, max_rows) if max_rows else total_rows
             logger.info(f"Loading {rows_to_load:,} rows from Oracle...")
@@ -473,11 +811,12 @@ class LargeDatasetHandler:
                 logger.warning("Table is empty")
                 return pd.DataFrame()
             
+            select_list = LargeDatasetHandler.get_select_list(db_config)
             if max_rows and total_rows > max_rows:
                 logger.info(f"Table large ({total_rows:,} > {max_rows:,}), limiting query")
-                query = f"SELECT TOP {max_rows} * FROM {full_table_name}"
+                query = f"SELECT TOP {max_rows} {select_list} FROM {full_table_name}"
             else:
-                query = f"SELECT * FROM {full_table_name}"
+                query = f"SELECT {select_list} FROM {full_table_name}"
             
             rows_to_load = min(total_rows, max_rows) if max_rows else total_rows
             logger.info(f"Loading {rows_to_load:,} rows from SQL Server...")
@@ -516,7 +855,8 @@ class LargeDatasetHandler:
                 logger.warning("Table is empty")
                 return pd.DataFrame()
             
-            query = f"SELECT * FROM {table}"
+            select_list = LargeDatasetHandler.get_select_list(db_config)
+            query = f"SELECT {select_list} FROM {table}"
             if max_rows and total_rows > max_rows:
                 logger.info(f"Table large ({total_rows:,} > {max_rows:,}), limiting query")
                 query += f" LIMIT {max_rows}"
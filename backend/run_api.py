@@ -109,9 +109,10 @@ try:
     
     # Import other modules with fallbacks
     try:
-        from dq_comparison import run_comparison_analysis_ui
+        from dq_comparison import run_comparison_analysis_ui, get_mismatch_details_page
     except ImportError:
         run_comparison_analysis_ui = None
+        get_mismatch_details_page = None
         logger.warning("Comparison module not available")
     
     try:
@@ -128,6 +129,7 @@ try:
        
     from dq_error_log import ErrorLogger
     from dq_audit import DataQualityAudit
+    from dq_file_cache import build_file_cache
     from db_config import MYSQL_CONFIG
 
     # Import app_config safely
@@ -2333,6 +2335,10 @@ def upload_file():
         
         logger.info(f"File uploaded: {filename} ({file_type})")
         
+        # Columnar cache built in the background, so analyses skip parsing the file
+        if HAS_DQ_MODULES:
+            build_file_cache(filepath, file_type)
+        
         return jsonify({
             'status': 200,
             'message': 'File uploaded successfully',
@@ -2874,6 +2880,40 @@ def get_comparison_mismatches(session_id):
         
         offset = (page - 1) * page_size
         
+        # Comparison still held in memory: diff only the requested page
+        details_page = get_mismatch_details_page(session_id, page, page_size) if get_mismatch_details_page else None
+        if details_page is not None:
+            processed_mismatches = []
+            for mismatch in details_page['mismatches']:
+                processed_mismatches.append({
+                    'row': mismatch.get('excel_row', mismatch.get('row_index', 0) + 2),
+                    'row_index': mismatch.get('row_index'),
+                    'differences_count': mismatch.get('differences_count', 0),
+                    'mismatch_summary': mismatch.get('mismatch_summary', ''),
+                    'source_data': mismatch.get('source_data', {}),
+                    'target_data': mismatch.get('target_data', {}),
+                    'differences': mismatch.get('differences', []),
+                    'row_type': mismatch.get('row_type', 'unknown')
+                })
+            
+            return jsonify({
+                'status': 200,
+                'message': 'Mismatches retrieved (computed on demand)',
+                'data': {
+                    'session_id': session_id,
+                    'mismatches': processed_mismatches,
+                    'pagination': {
+                        'page': details_page['page'],
+                        'page_size': details_page['page_size'],
+                        'total_pages': details_page['total_pages'],
+                        'total_rows': details_page['total_rows'],
+                        'total_mismatches': details_page['total_mismatches'],
+                        'has_next': details_page['page'] < details_page['total_pages'],
+                        'has_previous': details_page['page'] > 1
+                    }
+                }
+            }), 200
+        
         if error_logger:
             conn = error_logger._get_connection()
             cursor = conn.cursor(dictionary=True)